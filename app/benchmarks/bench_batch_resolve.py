@@ -0,0 +1,63 @@
+# Benchmarks resolving every due game at once, in-process vs on the adjudication pool
+#
+# python -m app.benchmarks.bench_batch_resolve --games 200 --phases 10
+
+import argparse
+import os
+import random
+from app.game.game_manager import GameManager
+from app.game.adjudication import adjudication_pool
+from app.benchmarks.common import new_game, play_phases, random_orders, timed, quiet
+
+
+def setup(games: int, phases: int, seed: int):
+    """
+    Games played to the same mid-game position, with random orders in for the next phase
+    """
+    manager = GameManager()
+    game_ids = [f"game-{i}" for i in range(games)]
+    for i, game_id in enumerate(game_ids):
+        new_game(manager, game_id)
+        play_phases(manager, game_id, phases, random.Random(seed + i))
+        game = manager._get_game_object(game_id)
+        rng = random.Random(seed + i)
+        with quiet():
+            for player_id, player in manager._get_game_data(game_id)["players"].items():
+                manager.submit_orders(game_id, player_id, random_orders(game, player["power"], rng))
+    return manager, game_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch phase resolution benchmark")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--phases", type=int, default=10, help="phases played before the measured one")
+    parser.add_argument("--workers", type=int, nargs="*", help="pool sizes to try, defaults to 1..cores")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    pool_sizes = args.workers or sorted({1, max(1, cores // 2), cores})
+
+    print(f"{args.games} games resolved at once, {cores} cores")
+
+    manager, game_ids = setup(args.games, args.phases, args.seed)
+    with quiet():
+        _, elapsed = timed(manager.resolve_games, game_ids)
+    baseline = args.games / elapsed
+    print(f"in-process:         {baseline:8.1f} games/s")
+
+    for workers in pool_sizes:
+        manager, game_ids = setup(args.games, args.phases, args.seed)
+        pool = adjudication_pool(workers)
+        # start the workers before timing, spawning them is a one-off cost
+        list(pool.map(abs, range(workers)))
+        with quiet():
+            results, elapsed = timed(manager.resolve_games, game_ids, pool)
+        pool.shutdown()
+        failed = sum(1 for result in results.values() if not result["success"])
+        rate = args.games / elapsed
+        print(f"pool of {workers:2d} workers: {rate:8.1f} games/s ({rate / baseline:.2f}x){f', {failed} failed' if failed else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Benchmarks a bot turn (orders for every dummy power of a game) per policy
+#
+# python -m app.benchmarks.bench_bots --phases 40
+
+import argparse
+import random
+import time
+from app.game.game_manager import GameManager
+from app.game.bots import POLICIES
+from app.benchmarks.common import new_game, percentile, quiet
+
+
+def old_bot_turn(game, powers, rng):
+    # what _create_bot_orders did before: move generation per dummy power, one random order each
+    orders = {}
+    for power in powers:
+        possible_orders = game.get_all_possible_orders()
+        legal = [order for loc in game.get_orderable_locations(power) for order in possible_orders[loc]]
+        if legal:
+            orders[power] = [rng.choice(legal)]
+    return orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot order generation benchmark")
+    parser.add_argument("--phases", type=int, default=40, help="phases played per policy, all 7 powers are bots")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for name in POLICIES:
+        manager = GameManager(bot_policy=name)
+        manager.bots.rng = random.Random(args.seed)
+        new_game(manager, name, players=0)
+        game = manager._get_game_object(name)
+        powers = manager.get_unassigned_powers(name)
+
+        old_times, turn_times, pass_times = [], [], []
+        ordered = units = 0
+        with quiet():
+            for _ in range(args.phases):
+                if game.is_game_done:
+                    break
+                start = time.perf_counter()
+                old_orders = old_bot_turn(game, powers, random.Random(args.seed))
+                old_times.append(time.perf_counter() - start)
+
+                # a bot turn from scratch: the phase's index is built, then one pass for every power
+                start = time.perf_counter()
+                index = manager._get_order_index(name)
+                bot_orders = manager.bots.create_orders(game, index, powers)
+                turn_times.append(time.perf_counter() - start)
+
+                # the pass alone, once the index exists (e.g. it was built for valid-orders or validation)
+                start = time.perf_counter()
+                manager.bots.create_orders(game, index, powers)
+                pass_times.append(time.perf_counter() - start)
+
+                if game.get_current_phase()[-1] != "A":
+                    units += sum(len(index.unit_orders(power)) for power in powers)
+                    ordered += sum(len(orders) for orders in bot_orders.values())
+                for power, orders in bot_orders.items():
+                    game.set_orders(power, orders, expand=False, replace=True)
+                manager.resolve_game_phase(name)
+
+        centers = {power.name: len(power.centers) for power in game.powers.values()}
+        print(f"{name} policy, {len(turn_times)} phases, reached {game.get_current_phase()}:")
+        print(f"  old per-power generation: p50 {percentile(old_times, 50) * 1e3:.2f}ms per turn, 1 order per power")
+        print(
+            f"  bot turn incl. index:     p50 {percentile(turn_times, 50) * 1e3:.2f}ms, "
+            f"p99 {percentile(turn_times, 99) * 1e3:.2f}ms, {ordered}/{units} units ordered"
+        )
+        print(f"  pass on a built index:    p50 {percentile(pass_times, 50) * 1e6:.0f}us")
+        print(f"  centers: {centers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Benchmarks the cold start of an API process, with and without the warm-up
+#
+# Every run is a fresh interpreter: import app.main, run the lifespan, then the first
+# requests a client makes (create a game, register, read the state). Time to first
+# request is from the start of the import to the first create_game response. With the
+# warm-up, the create waits for /ready, the way a load balancer would.
+#
+# python -m app.benchmarks.bench_cold_start --runs 5
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from app.benchmarks.common import percentile
+
+
+def child():
+    # runs in the fresh interpreter, prints its timings as JSON
+    start = time.perf_counter()
+    import httpx
+    from app.main import app, warmup
+    timings = {"import": time.perf_counter() - start}
+
+    async def first_requests():
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                while (await client.get("/ready")).status_code != 200:
+                    await asyncio.sleep(0.005)
+                timings["ready"] = time.perf_counter() - start
+                mark = time.perf_counter()
+                response = await client.post("/game/create", json={"game_name": "bench", "creator_id": "bench"})
+                timings["first_create"] = time.perf_counter() - mark
+                timings["time_to_first_request"] = time.perf_counter() - start
+                game_id = response.json()["game_id"]
+                mark = time.perf_counter()
+                await client.post("/game/register", json={
+                    "game_id": game_id, "player_id": "p1", "player_name": "p1", "power": "FRANCE"
+                })
+                await client.get(f"/game/{game_id}/valid-orders", params={"power": "FRANCE"})
+                await client.get(f"/game/{game_id}/state")
+                timings["next_requests"] = time.perf_counter() - mark
+                timings["warmup"] = warmup.timings.get("total", 0.0)
+
+    asyncio.run(first_requests())
+    print(json.dumps(timings))
+
+
+def run(warmup: bool):
+    env = dict(os.environ, GAME_STORE_PATH="", WARMUP="1" if warmup else "0", LOG_LEVEL="WARNING")
+    result = subprocess.run(
+        [sys.executable, "-m", "app.benchmarks.bench_cold_start", "--child"],
+        capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    steps = ("import", "warmup", "ready", "first_create", "time_to_first_request", "next_requests")
+    print(f"{'p50 ms':<10}" + "".join(f"{step:>{len(step) + 3}}" for step in steps))
+    for mode, warmup in (("cold", False), ("warm-up", True)):
+        runs = [run(warmup) for _ in range(args.runs)]
+        print(f"{mode:<10}" + "".join(f"{percentile([r[step] for r in runs], 50) * 1e3:>{len(step) + 3}.1f}" for step in steps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Throughput of GameManager calls from many threads, on one game vs spread over many games
+#
+# python -m app.benchmarks.bench_concurrency --threads 1 2 4 8
+
+import argparse
+import random
+import threading
+import time
+from app.game.game_manager import GameManager, DIPLOMACY_POWERS
+from app.benchmarks.common import new_game, random_orders, quiet
+
+
+def worker(manager: GameManager, game_id: str, seed: int, ops: int):
+    rng = random.Random(seed)
+    for i in range(ops):
+        power = rng.choice(DIPLOMACY_POWERS)
+        if i % 10 == 9:
+            manager.resolve_game_phase(game_id)
+        elif i % 2:
+            with manager._game_lock(game_id):
+                orders = random_orders(manager._get_game_object(game_id), power, rng)
+            manager.submit_orders(game_id, f"{game_id}-{power}", orders)
+        else:
+            manager.get_game_state(game_id)
+
+
+def run(threads: int, shared: bool, ops: int):
+    manager = GameManager()
+    game_ids = ["game"] if shared else [f"game-{i}" for i in range(threads)]
+    for game_id in game_ids:
+        new_game(manager, game_id)
+
+    workers = [
+        threading.Thread(target=worker, args=(manager, game_ids[0] if shared else game_ids[i], i, ops))
+        for i in range(threads)
+    ]
+    with quiet():
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    return threads * ops / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-game locking throughput benchmark")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=300, help="calls per thread")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8}{'one game ops/s':>18}{'game per thread ops/s':>24}")
+    for threads in args.threads:
+        print(f"{threads:>8}{run(threads, True, args.ops):>18.0f}{run(threads, False, args.ops):>24.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Fan-out cost of the event bus with many subscribers on one process
+#
+# python -m app.benchmarks.bench_events --subscribers 10000
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from app.services.events import EventBus
+
+
+async def run(subscribers: int, games: int, events: int):
+    bus = EventBus()
+    tracemalloc.start()
+    subs = [bus.subscribe(f"game-{i % games}") for i in range(subscribers)]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # one reader task per subscriber, like one streaming response per connection
+    received = 0
+
+    async def reader(subscriber):
+        nonlocal received
+        while True:
+            await subscriber.get()
+            received += 1
+
+    tasks = [asyncio.create_task(reader(sub)) for sub in subs]
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for i in range(events):
+        bus.publish(f"game-{i % games}", "orders_submitted", {"power": "FRANCE", "revision": i})
+    expected = events * (subscribers // games)
+    while received < expected:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    for task in tasks:
+        task.cancel()
+    return memory, elapsed, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event bus fan-out benchmark")
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    memory, elapsed, delivered = asyncio.run(run(args.subscribers, args.games, args.events))
+    print(f"{args.subscribers} subscribers over {args.games} games")
+    print(f"subscriber memory: {memory / args.subscribers:.0f} bytes each, {memory / 1e6:.1f}MB total")
+    print(f"{args.events} events -> {delivered} deliveries in {elapsed:.2f}s ({delivered / elapsed:.0f} deliveries/s)")
+
+
+if __name__ == "__main__":
+    main()
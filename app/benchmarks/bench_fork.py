@@ -0,0 +1,68 @@
+# Benchmarks forking a long game: GameManager.fork_game against a deep copy of the game
+#
+# Each method runs in a fresh process (rss never shrinks), plays the same seeded game,
+# then forks it over and over, keeping every fork.
+#
+# python -m app.benchmarks.bench_fork --phases 50 --forks 1000
+
+import argparse
+import copy
+import gc
+import multiprocessing
+import random
+import time
+from app.game.game_manager import GameManager
+from app.benchmarks.common import new_game, play_phases, percentile, quiet
+from app.benchmarks.bench_hibernation import rss
+
+
+def measure(method: str, phases: int, forks: int, seed: int):
+    manager = GameManager()
+    new_game(manager, "parent")
+    play_phases(manager, "parent", phases, random.Random(seed))
+    game = manager._get_game_object("parent")
+    played = len(game.state_history)
+    manager.get_phase_history("parent")  # built once, forks share it
+
+    kept = []
+    samples = []
+    gc.collect()
+    baseline = rss()
+    with quiet():
+        for i in range(forks):
+            start = time.perf_counter()
+            if method == "fork_game":
+                manager.fork_game("parent", f"fork-{i}", "bench")
+            else:
+                kept.append(copy.deepcopy(game))
+            samples.append(time.perf_counter() - start)
+    gc.collect()
+    return played, samples, rss() - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game fork benchmark")
+    parser.add_argument("--phases", type=int, default=50, help="phases played before forking")
+    parser.add_argument("--forks", type=int, default=1000)
+    parser.add_argument("--deepcopies", type=int, default=200, help="deep copies to compare against, they're slow")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for method, count in (("fork_game", args.forks), ("deepcopy", args.deepcopies)):
+        with context.Pool(1) as pool:
+            results[method] = (count,) + pool.apply(measure, (method, args.phases, count, args.seed))
+
+    played = results["fork_game"][1]
+    print(f"game with {played} phases played")
+    print(f"{'method':<12}{'copies':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}{'MiB':>9}{'KiB/copy':>10}")
+    for method, (count, _, samples, grown) in results.items():
+        print(
+            f"{method:<12}{count:>8}{percentile(samples, 50) * 1e3:>10.3f}{percentile(samples, 95) * 1e3:>10.3f}"
+            f"{percentile(samples, 99) * 1e3:>10.3f}{sum(samples):>10.2f}{grown / 2**20:>9.1f}{grown / count / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
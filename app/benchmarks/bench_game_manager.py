@@ -0,0 +1,195 @@
+# Benchmarks the GameManager hot paths on early, mid and late game boards
+#
+# The boards come from one scripted game (seeded random orders for all 7 powers), so
+# every run times the same positions. Results are written as JSON so runs on different
+# commits can be compared:
+#
+# python -m app.benchmarks.bench_game_manager --output before.json
+# python -m app.benchmarks.bench_game_manager --compare before.json
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from importlib.metadata import version
+from app.game.game_manager import GameManager, DIPLOMACY_POWERS
+from app.game.snapshot import encode_game, decode_game
+from app.benchmarks.common import new_game, add_game, random_orders, percentile, quiet
+
+STAGES = {"early": 1, "mid": 20, "late": 50}  # stage -> phases played before it
+POWER = "FRANCE"  # power the per-power calls are made for
+
+
+def script_stages(stages: dict, seed: int):
+    """
+    Plays the scripted game once, snapshotting the board at every stage
+
+    Returns: stage -> (snapshot, orders every power submits there)
+    """
+    manager = GameManager()
+    rng = random.Random(seed)
+    new_game(manager, "script")
+    data = manager._get_game_data("script")
+    game = manager._get_game_object("script")
+
+    boards = {}
+    played = 0
+    with quiet():
+        for stage, phases in sorted(stages.items(), key=lambda item: item[1]):
+            while played < phases and not game.is_game_done:
+                for player_id, player in data["players"].items():
+                    manager.submit_orders("script", player_id, random_orders(game, player["power"], rng))
+                manager.resolve_game_phase("script")
+                played += 1
+            orders = {player["power"]: random_orders(game, player["power"], rng) for player in data["players"].values()}
+            boards[stage] = (encode_game(game), orders)
+    return boards
+
+
+def summarize(name: str, stage: str, phase: str, samples: list):
+    return {
+        "name": name,
+        "stage": stage,
+        "phase": phase,
+        "n": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1e3, 4),
+        "p50_ms": round(percentile(samples, 50) * 1e3, 4),
+        "p95_ms": round(percentile(samples, 95) * 1e3, 4),
+        "min_ms": round(min(samples) * 1e3, 4),
+    }
+
+
+def timed_calls(fn, calls):
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_new_games(repeat: int):
+    manager = GameManager()
+    with quiet():
+        create = timed_calls(manager.create_game, [(f"new-{i}", f"new-{i}", "bench") for i in range(repeat)])
+        register = timed_calls(
+            manager.register_player,
+            [(f"new-{i}", f"new-{i}-{power}", power, power) for i in range(repeat) for power in DIPLOMACY_POWERS],
+        )
+    return [summarize("create_game", "new", "S1901M", create), summarize("register_player", "new", "S1901M", register)]
+
+
+def bench_stage(stage: str, blob: bytes, orders: dict, repeat: int):
+    """
+    Times every call on `repeat` copies of the stage's board. Calls that cache (order index,
+    render, preview) are timed cold, on each copy's first call, and warm, repeated on one copy.
+    """
+    manager = GameManager()
+    players = {f"{stage}-{power}": power for power in DIPLOMACY_POWERS}
+    game_ids = [f"{stage}-{i}" for i in range(repeat)]
+    for game_id in game_ids:
+        add_game(manager, game_id, decode_game(blob), players)
+    phase = manager._get_game_object(game_ids[0]).get_current_phase()
+    first = game_ids[0]
+
+    results = []
+
+    def record(name, fn, calls):
+        results.append(summarize(name, stage, phase, timed_calls(fn, calls)))
+
+    with quiet():
+        record("get_game_state", manager.get_game_state, [(first,)] * repeat)
+        record("_get_power_orders[cold]", manager._get_power_orders, [(game_id, POWER) for game_id in game_ids])
+        record("_get_power_orders", manager._get_power_orders, [(first, POWER)] * repeat)
+        record("render_game[cold]", manager.render_game, [(game_id,) for game_id in game_ids])
+        record("render_game", manager.render_game, [(first,)] * repeat)
+        record(
+            "submit_orders",
+            manager.submit_orders,
+            [(game_id, player_id, orders[power]) for game_id in game_ids for player_id, power in players.items()],
+        )
+        record("preview_phase[cold]", manager.preview_phase, [(game_id,) for game_id in game_ids])
+        record("preview_phase", manager.preview_phase, [(first,)] * repeat)
+        record("resolve_game_phase", manager.resolve_game_phase, [(game_id,) for game_id in game_ids])
+    return results
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "diplomacy": version("diplomacy"),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "stages": STAGES,
+    }
+
+
+def compare(results: list, baseline_path: str, threshold: float, min_delta_ms: float):
+    """
+    Prints the change of every p50 against a previous run, returns the regressions.
+    Calls that take microseconds jitter by more than the threshold, so a regression
+    also has to be slower by at least min_delta_ms.
+    """
+    with open(baseline_path) as f:
+        baseline = {(row["name"], row["stage"]): row for row in json.load(f)["results"]}
+    regressions = []
+    print(f"\nvs {baseline_path}", file=sys.stderr)
+    for row in results:
+        old = baseline.get((row["name"], row["stage"]))
+        if old is None or not old["p50_ms"]:
+            continue
+        ratio = row["p50_ms"] / old["p50_ms"]
+        flag = ""
+        if ratio > threshold and row["p50_ms"] - old["p50_ms"] >= min_delta_ms:
+            flag = "  REGRESSION"
+            regressions.append(row)
+        print(f"  {row['name']:<26}{row['stage']:<7}{old['p50_ms']:>10.3f} -> {row['p50_ms']:>10.3f} ms  x{ratio:.2f}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GameManager hot path benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="calls (or games) timed per operation and stage")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50 ratio that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="smallest p50 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    results = bench_new_games(args.repeat)
+    for stage, (blob, orders) in script_stages(STAGES, args.seed).items():
+        results.extend(bench_stage(stage, blob, orders, args.repeat))
+
+    # table for people on stderr, JSON for tools on stdout
+    print(f"{'call':<26}{'stage':<7}{'phase':<8}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}", file=sys.stderr)
+    for row in results:
+        print(
+            f"{row['name']:<26}{row['stage']:<7}{row['phase']:<8}{row['n']:>5}"
+            f"{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['mean_ms']:>10.3f}",
+            file=sys.stderr,
+        )
+
+    report = {"meta": metadata(args), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare and compare(results, args.compare, args.threshold, args.min_delta_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
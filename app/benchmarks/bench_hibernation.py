@@ -0,0 +1,82 @@
+# Benchmarks idle game hibernation: memory held per game and the cost of waking one up
+#
+# PYTHONPATH=. python app/benchmarks/bench_hibernation.py --games 60 --phases 20 --budget 10
+
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import time
+from app.game.game_manager import GameManager
+from app.benchmarks.common import new_game, play_phases, percentile
+
+
+def rss():
+    """
+    Resident set size of this process in bytes
+    """
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def build(games: int, phases: int, budget: int, seed: int):
+    """
+    Plays the games and returns the manager with the memory it grew the process by
+    """
+    gc.collect()
+    baseline = rss()
+    manager = GameManager(max_resident_games=budget)
+    manager.bots.rng = random.Random(seed)
+    for i in range(games):
+        game_id = f"game-{i}"
+        new_game(manager, game_id)
+        play_phases(manager, game_id, phases, random.Random(seed + i))
+    gc.collect()
+    return manager, rss() - baseline
+
+
+def measure(games: int, phases: int, budget: int, seed: int):
+    # rss never shrinks, so every configuration gets a fresh process
+    return build(games, phases, budget, seed)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game hibernation benchmark")
+    parser.add_argument("--games", type=int, default=60)
+    parser.add_argument("--phases", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=10, help="resident games")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        resident_bytes = pool.apply(measure, (args.games, args.phases, None, args.seed))
+    manager, hibernated_bytes = build(args.games, args.phases, args.budget, args.seed)
+    metrics = manager.get_hibernation_metrics()
+
+    # waking games in random order, each one evicts another
+    rng = random.Random(args.seed)
+    samples = []
+    for _ in range(200):
+        game_id = f"game-{rng.randrange(args.games)}"
+        start = time.perf_counter()
+        manager._get_game_object(game_id)
+        samples.append(time.perf_counter() - start)
+    woken = manager.get_hibernation_metrics()
+
+    print(f"{args.games} games, {args.phases} phases each, budget {args.budget} resident games")
+    print(f"  everything resident: {resident_bytes / 2**20:8.1f} MiB ({resident_bytes / args.games / 1024:.0f} KiB per game)")
+    print(f"  with hibernation:    {hibernated_bytes / 2**20:8.1f} MiB")
+    print(
+        f"  blobs: {metrics['hibernated']} games, {metrics['blob_bytes'] / 2**20:.2f} MiB "
+        f"({metrics['blob_bytes'] / max(metrics['hibernated'], 1) / 1024:.1f} KiB per game)"
+    )
+    print(f"  evictions while playing: {metrics['evictions']}, rehydrations: {metrics['rehydrations']}")
+    print(
+        f"  access after idle: p50 {percentile(samples, 50) * 1e3:.2f}ms, p99 {percentile(samples, 99) * 1e3:.2f}ms "
+        f"(rehydrate p50 {woken['rehydrate_ms']['p50']:.2f}ms, p99 {woken['rehydrate_ms']['p99']:.2f}ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# Load test for the game routes, in-process through the ASGI app (no sockets, no server)
+#
+# Every game gets seven clients that register, poll the state, fetch their valid orders,
+# submit, and wait for the phase to resolve, the way the frontend does. One client per
+# game resolves once everyone submitted. Reports throughput and latency per route.
+#
+# python -m app.benchmarks.bench_http --games 20 --phases 5
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+import httpx
+from app.game.game_manager import DIPLOMACY_POWERS
+from app.benchmarks.common import percentile, quiet
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # route -> seconds
+        self.errors = defaultdict(int)  # route -> 4xx/5xx responses
+
+    async def call(self, client: httpx.AsyncClient, method: str, route: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[f"{method} {route}"].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[f"{method} {route}"] += 1
+        return response
+
+    def report(self, elapsed: float):
+        rows = []
+        for route, samples in sorted(self.latencies.items(), key=lambda item: -len(item[1])):
+            rows.append({
+                "route": route,
+                "requests": len(samples),
+                "errors": self.errors[route],
+                "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(percentile(samples, 50) * 1e3, 3),
+                "p95_ms": round(percentile(samples, 95) * 1e3, 3),
+                "p99_ms": round(percentile(samples, 99) * 1e3, 3),
+                "max_ms": round(max(samples) * 1e3, 3),
+            })
+        return rows
+
+
+class GameScript:
+    """
+    What the clients of one game share: who submitted this phase, and how many phases were resolved
+    """
+    def __init__(self, game_id: str):
+        self.game_id = game_id
+        self.submitted = 0
+        self.all_submitted = asyncio.Event()
+        self.resolved = 0
+
+
+async def client(http, stats: Stats, script: GameScript, power: str, phases: int, polls: int, poll_interval: float, rng):
+    game_id = script.game_id
+    player_id = f"{game_id}-{power}"
+    await stats.call(http, "POST", "/game/register", "/game/register", json={
+        "game_id": game_id, "player_id": player_id, "player_name": power, "power": power,
+    })
+
+    revision, epoch = None, None
+    for phase in range(phases):
+        # look at the board a few times before deciding
+        for _ in range(polls):
+            params = {"since": revision, "epoch": epoch} if revision is not None else {}
+            response = await stats.call(http, "GET", "/game/{game_id}/state", f"/game/{game_id}/state", params=params)
+            if response.status_code == 200:
+                revision, epoch = response.json()["revision"], response.json()["state"]["epoch"]
+            await asyncio.sleep(poll_interval)
+
+        response = await stats.call(
+            http, "GET", "/game/{game_id}/valid-orders", f"/game/{game_id}/valid-orders", params={"power": power, "by_unit": True}
+        )
+        unit_orders = response.json()["data"]["unit_orders"] if response.status_code == 200 else {}
+        # adjustments are left to civil disorder, a pick per build location would go over the allowed builds
+        adjusting = any(order.endswith((" B", " D")) for options in unit_orders.values() for order in options)
+        orders = [] if adjusting else [rng.choice(options) for options in unit_orders.values() if options]
+        await stats.call(http, "POST", "/game/{game_id}/orders", f"/game/{game_id}/orders", json={"player_id": player_id, "orders": orders})
+
+        script.submitted += 1
+        if script.submitted == len(DIPLOMACY_POWERS):
+            script.all_submitted.set()
+
+        if power == DIPLOMACY_POWERS[0]:
+            await script.all_submitted.wait()
+            await stats.call(http, "POST", "/game/{game_id}/resolve", f"/game/{game_id}/resolve")
+            script.submitted = 0
+            script.all_submitted.clear()
+            script.resolved += 1
+        else:
+            # keep polling until the phase moved on
+            while script.resolved <= phase:
+                params = {"since": revision, "epoch": epoch} if revision is not None else {}
+                response = await stats.call(http, "GET", "/game/{game_id}/state", f"/game/{game_id}/state", params=params)
+                if response.status_code == 200:
+                    revision, epoch = response.json()["revision"], response.json()["state"]["epoch"]
+                await asyncio.sleep(poll_interval)
+
+
+async def run(app, games: int, phases: int, polls: int, poll_interval: float, seed: int):
+    stats = Stats()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        start = time.perf_counter()
+        scripts = []
+        for i in range(games):
+            response = await stats.call(http, "POST", "/game/create", "/game/create", json={"game_name": f"load-{i}", "creator_id": "bench"})
+            scripts.append(GameScript(response.json()["game_id"]))
+
+        rng = random.Random(seed)
+        await asyncio.gather(*(
+            client(http, stats, script, power, phases, polls, poll_interval, random.Random(rng.random()))
+            for script in scripts
+            for power in DIPLOMACY_POWERS
+        ))
+        await stats.call(http, "GET", "/game/list", "/game/list")
+        elapsed = time.perf_counter() - start
+    return stats, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process HTTP load test")
+    parser.add_argument("--games", type=int, default=20, help="concurrent games, seven clients each")
+    parser.add_argument("--phases", type=int, default=5, help="phases every game plays")
+    parser.add_argument("--polls", type=int, default=3, help="state polls per client before it orders")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="seconds between a client's polls")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    # in memory unless a store is asked for, the load test shouldn't leave games in saves/
+    os.environ.setdefault("GAME_STORE_PATH", "")
+    from app.main import app
+
+    with quiet():
+        stats, elapsed = asyncio.run(run(app, args.games, args.phases, args.polls, args.poll_interval, args.seed))
+    rows = stats.report(elapsed)
+    total = sum(row["requests"] for row in rows)
+
+    if args.json:
+        print(json.dumps({"games": args.games, "clients": args.games * len(DIPLOMACY_POWERS), "phases": args.phases,
+                          "seconds": round(elapsed, 3), "requests": total, "routes": rows}, indent=2))
+        return
+
+    print(f"{args.games} games x {len(DIPLOMACY_POWERS)} clients, {args.phases} phases: "
+          f"{total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    print(f"{'route':<34}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for row in rows:
+        print(f"{row['route']:<34}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9.1f}"
+              f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}")
+    if any(row["errors"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Benchmarks the lobby list: the old full walk vs an indexed page
+#
+# python -m app.benchmarks.bench_listing --games 50000
+#
+# Listing never looks at the board, so the games share a few Game objects to keep
+# memory down; everything the list reads is per game.
+
+import argparse
+import random
+import time
+from diplomacy.engine.game import Game
+from app.game.game_manager import GameManager, DIPLOMACY_POWERS
+from app.game.revisions import RevisionLog
+from app.benchmarks.common import percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game listing benchmark")
+    parser.add_argument("--games", type=int, default=50000)
+    parser.add_argument("--creators", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    boards = {status: Game() for status in ("forming", "active", "completed")}
+    for status, game in boards.items():
+        game.set_status(status)
+
+    manager = GameManager()
+    start = time.perf_counter()
+    for i in range(args.games):
+        game_id = f"game-{i}"
+        status = rng.choice(("forming", "active", "active", "completed"))
+        seats = rng.randint(0, 7) if status == "forming" else 7
+        manager.games[game_id] = {
+            "game": boards[status],
+            "players": {f"player-{rng.randrange(args.games)}": {"power": power, "name": "p"} for power in DIPLOMACY_POWERS[:seats]},
+            "game_name": game_id,
+            "creator_id": f"creator-{rng.randrange(args.creators)}",
+            "revisions": None,
+        }
+        manager._index_game(game_id)
+    index_cost = (time.perf_counter() - start) / args.games
+
+    def measure(fn):
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        return f"p50 {percentile(samples, 50) * 1e3:8.3f}ms  p99 {percentile(samples, 99) * 1e3:8.3f}ms"
+
+    some_player = next(iter(manager.games["game-0"]["players"]), "player-0")
+    print(f"{args.games} games, index upkeep {index_cost * 1e6:.1f}us per game update")
+    print(f"  old get_all_games (every game):        {measure(manager.get_all_games)}")
+    print(f"  first page, no filter:                 {measure(lambda: manager.list_games(limit=args.limit))}")
+    page = manager.list_games(limit=args.limit)
+    for _ in range(100):
+        page = manager.list_games(limit=args.limit, cursor=page["next_cursor"])
+    print(f"  101st page:                            {measure(lambda: manager.list_games(limit=args.limit, cursor=page['next_cursor']))}")
+    print(f"  by creator:                            {measure(lambda: manager.list_games(limit=args.limit, creator_id='creator-7'))}")
+    print(f"  by player:                             {measure(lambda: manager.list_games(limit=args.limit, player_id=some_player))}")
+    print(f"  open seats + forming:                  {measure(lambda: manager.list_games(limit=args.limit, status='forming', open_seats=True))}")
+
+
+if __name__ == "__main__":
+    main()
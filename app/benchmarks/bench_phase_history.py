@@ -0,0 +1,116 @@
+# Benchmarks random access to past phases on long games
+#
+# Plays seeded games of 100+ phases, then asks for random past phases (board, orders,
+# results) through the phase history, for a few keyframe intervals, against the ways to
+# get the same thing without it: walking the engine's phase history, and rebuilding a
+# hibernated game from its snapshot.
+#
+# python -m app.benchmarks.bench_phase_history --phases 120 --intervals 1 4 8 16
+
+import argparse
+import json
+import random
+import time
+from app.game import phase_history
+from app.game.game_manager import GameManager
+from app.game.phase_history import PhaseHistory
+from app.game.snapshot import encode_game, decode_game
+from app.benchmarks.common import new_game, play_phases, percentile
+
+
+def engine_walk(game, phase: str):
+    # every phase as GamePhaseData, what to_saved_game_format goes through
+    for phase_data in game.get_phase_history():
+        if phase_data.name == phase:
+            return phase_data
+    return None
+
+
+def thaw_lookup(blob: bytes, phase: str):
+    game = decode_game(blob)
+    for key in game.state_history.keys():
+        if str(key) == phase:
+            return game.state_history[key], game.order_history[key], game.result_history[key]
+    return None
+
+
+def sample(fn, calls):
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def row(name: str, samples: list, size: int = None):
+    return {
+        "name": name,
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1e3, 4),
+        "p95_ms": round(percentile(samples, 95) * 1e3, 4),
+        "p99_ms": round(percentile(samples, 99) * 1e3, 4),
+        "max_ms": round(max(samples) * 1e3, 4),
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase history random access benchmark")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--phases", type=int, default=120, help="phases played per game")
+    parser.add_argument("--lookups", type=int, default=300, help="random phases asked for per method")
+    parser.add_argument("--intervals", type=int, nargs="+", default=[1, 4, 8, 16], help="keyframe intervals to compare")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    manager = GameManager()
+    rng = random.Random(args.seed)
+    games = []
+    for i in range(args.games):
+        game_id = f"long-{i}"
+        new_game(manager, game_id)
+        play_phases(manager, game_id, args.phases, rng)
+        games.append(manager._get_game_object(game_id))
+    phases = {id(game): [str(phase) for phase in game.state_history.keys()] for game in games}
+    lookups = [(game, rng.choice(phases[id(game)])) for game in (rng.choice(games) for _ in range(args.lookups))]
+
+    results = []
+    for interval in args.intervals:
+        histories = {id(game): PhaseHistory.from_game(game, interval) for game in games}
+        size = sum(history.size() for history in histories.values()) // len(games)
+
+        def cold(game, phase):
+            phase_history._segments.clear()
+            histories[id(game)].get(phase)
+
+        def warm(game, phase):
+            histories[id(game)].get(phase)
+
+        results.append(row(f"history[{interval}] cold", sample(cold, lookups), size))
+        sample(warm, lookups)  # fills the segment cache
+        results.append(row(f"history[{interval}] warm", sample(warm, lookups), size))
+
+    blobs = {id(game): encode_game(game) for game in games}
+    few = lookups[:max(1, args.lookups // 10)]  # these take milliseconds, a few are enough
+    results.append(row("engine get_phase_history", sample(engine_walk, few)))
+    results.append(row(
+        "thaw hibernated game", sample(lambda game, phase: thaw_lookup(blobs[id(game)], phase), few),
+        sum(len(blob) for blob in blobs.values()) // len(games),
+    ))
+
+    played = [len(phases[id(game)]) for game in games]
+    if args.json:
+        print(json.dumps({"games": args.games, "phases": played, "results": results}, indent=2))
+        return
+
+    print(f"{args.games} games, {min(played)}-{max(played)} phases each, {args.lookups} random lookups")
+    print(f"{'method':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'bytes/game':>12}")
+    for r in results:
+        size = f"{r['bytes']:>12}" if r["bytes"] is not None else f"{'':>12}"
+        print(f"{r['name']:<28}{r['n']:>6}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}{size}")
+
+
+if __name__ == "__main__":
+    main()
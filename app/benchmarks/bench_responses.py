@@ -0,0 +1,81 @@
+# Benchmarks building the /state, /orders and /list/{game_id} response bodies
+#
+# The pydantic path is what the routes did before: get the dict, build the response
+# model and let FastAPI encode it. The encoded path is the response cache, which encodes
+# once per revision. Polls are spread over games in the middle of a game, one revision
+# each, like clients polling between submissions.
+#
+# python -m app.benchmarks.bench_responses --games 20 --phases 10 --polls 2000
+
+import argparse
+import random
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.game.game_manager import GameManager
+from app.game.models.pydantic import GameStateResponse, GameSummaryResponse, SuccessResponse
+from app.benchmarks.common import new_game, play_phases, percentile
+
+
+def pydantic_state(manager: GameManager, game_id: str):
+    state = manager.get_game_state(game_id)
+    return JSONResponse(jsonable_encoder(GameStateResponse(game_id=game_id, state=state, revision=state.get("revision")))).body
+
+
+def pydantic_orders(manager: GameManager, game_id: str):
+    orders = manager.get_orders(game_id)
+    return JSONResponse(jsonable_encoder(SuccessResponse(message=f"Orders for game: {game_id}", data={"orders": orders}))).body
+
+
+def pydantic_summary(manager: GameManager, game_id: str):
+    return JSONResponse(jsonable_encoder(GameSummaryResponse(**manager.get_game(game_id)))).body
+
+
+def sample(fn, calls):
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response encoding benchmark")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--phases", type=int, default=10, help="phases played in every game")
+    parser.add_argument("--polls", type=int, default=2000, help="calls per route and path")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    manager = GameManager()
+    rng = random.Random(args.seed)
+    game_ids = [f"game-{i}" for i in range(args.games)]
+    for game_id in game_ids:
+        new_game(manager, game_id)
+        play_phases(manager, game_id, args.phases, rng)
+    calls = [(manager, rng.choice(game_ids)) for _ in range(args.polls)]
+
+    gzip_state = lambda manager, game_id: manager.get_state_response(game_id).variant("gzip")
+    rows = [
+        ("state", "pydantic", pydantic_state),
+        ("state", "encoded", lambda manager, game_id: manager.get_state_response(game_id).body),
+        ("state", "encoded gzip", gzip_state),
+        ("orders", "pydantic", pydantic_orders),
+        ("orders", "encoded", lambda manager, game_id: manager.get_orders_response(game_id).body),
+        ("summary", "pydantic", pydantic_summary),
+        ("summary", "encoded", lambda manager, game_id: manager.get_game_response(game_id).body),
+    ]
+    body = manager.get_state_response(game_ids[0])
+    print(f"state body {len(body.body)} bytes, {len(body.variant('gzip')[1])} gzipped")
+    print(f"{'route':<10}{'path':<14}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'calls/s':>11}")
+    for route, path, fn in rows:
+        samples = sample(fn, calls)
+        print(
+            f"{route:<10}{path:<14}{percentile(samples, 50) * 1e6:>10.1f}{percentile(samples, 95) * 1e6:>10.1f}"
+            f"{percentile(samples, 99) * 1e6:>10.1f}{len(samples) / sum(samples):>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Benchmarks the phase scheduler overhead with many concurrent games
+#
+# python -m app.benchmarks.bench_scheduler --games 10000 --spread 2
+
+import argparse
+import threading
+import time
+from app.game.scheduler import PhaseScheduler
+from app.benchmarks.common import percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase scheduler benchmark")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--spread", type=float, default=2.0, help="deadlines are spread over this many seconds")
+    args = parser.parse_args()
+
+    due_at = {}
+    lateness = []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def on_due(game_id):
+        late = time.monotonic() - due_at[game_id]
+        with lock:
+            lateness.append(late)
+            if len(lateness) == args.games:
+                done.set()
+
+    scheduler = PhaseScheduler(on_due)
+
+    start = time.perf_counter()
+    for i in range(args.games):
+        delay = 0.5 + args.spread * i / args.games
+        due_at[f"game-{i}"] = time.monotonic() + delay
+        scheduler.schedule(f"game-{i}", delay)
+    schedule_cost = (time.perf_counter() - start) / args.games
+
+    # cancelling and re-adding a deadline, what /stop and /start cost
+    start = time.perf_counter()
+    for i in range(0, args.games, 10):
+        scheduler.cancel(f"game-{i}")
+        due_at[f"game-{i}"] = time.monotonic() + 0.5 + args.spread
+        scheduler.schedule(f"game-{i}", 0.5 + args.spread)
+    reschedule_cost = (time.perf_counter() - start) / len(range(0, args.games, 10))
+
+    done.wait(args.spread + 30)
+    threads = threading.active_count()
+    scheduler.shutdown()
+
+    print(f"{args.games} games, deadlines spread over {args.spread}s")
+    print(f"threads in process: {threads} (thread-per-game would need {args.games})")
+    print(f"schedule(): {schedule_cost * 1e6:.1f}us per game, cancel+schedule: {reschedule_cost * 1e6:.1f}us")
+    print(f"fired: {len(lateness)}/{args.games}")
+    print(
+        f"lateness p50 {percentile(lateness, 50) * 1e3:.2f}ms, "
+        f"p99 {percentile(lateness, 99) * 1e3:.2f}ms, max {max(lateness) * 1e3:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Benchmarks binary game snapshots against the saved-game JSON format
+#
+# Encode/decode go all the way from and back to an engine game. The codec-only columns
+# leave the engine out (to_saved_game_format / from_saved_game_format) and time just
+# turning the same payload into bytes and back.
+#
+# python -m app.benchmarks.bench_snapshot --lengths 0 10 40 100
+
+import argparse
+import json
+import random
+import time
+import zlib
+from diplomacy.utils.export import to_saved_game_format, from_saved_game_format
+from app.game import snapshot
+from app.game.adjudication import power_orders, engine_fields
+from app.game.game_manager import GameManager
+from app.benchmarks.common import new_game, play_phases
+
+
+def json_encode(game):
+    return json.dumps(to_saved_game_format(game)).encode("utf-8")
+
+
+def json_decode(blob):
+    return from_saved_game_format(json.loads(blob))
+
+
+def formats():
+    """
+    name -> (encode game, decode game, encode payload, decode payload)
+    """
+    found = {
+        "json": (json_encode, json_decode, lambda value: json.dumps(value).encode("utf-8"), json.loads),
+        "json+zlib": (
+            lambda game: zlib.compress(json_encode(game)),
+            lambda blob: json_decode(zlib.decompress(blob)),
+            lambda value: zlib.compress(json.dumps(value).encode("utf-8")),
+            lambda blob: json.loads(zlib.decompress(blob)),
+        ),
+    }
+    for compression in ("none", "zlib", "zstd"):
+        if compression == "zstd" and snapshot.zstandard is None:
+            continue
+        found[f"snapshot/{compression}"] = (
+            lambda game, c=compression: snapshot.encode_game(game, c),
+            snapshot.decode_game,
+            lambda value, c=compression: snapshot.dumps(value, c),
+            snapshot.loads,
+        )
+    return found
+
+
+def best_of(fn, arg, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game snapshot benchmark")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[0, 10, 40, 100], help="phases played")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    manager = GameManager()
+    manager.bots.rng = random.Random(args.seed)
+    print(f"{'format':<16}{'phases':>7}{'bytes':>10}{'encode ms':>11}{'decode ms':>11}{'codec enc ms':>14}{'codec dec ms':>14}")
+    for length in args.lengths:
+        game_id = f"game-{length}"
+        new_game(manager, game_id)
+        play_phases(manager, game_id, length, random.Random(args.seed))
+        game = manager._get_game_object(game_id)
+        phases = len(game.state_history)
+        payload = {"saved_game": to_saved_game_format(game), "orders": power_orders(game), "engine": engine_fields(game)}
+
+        for name, (encode, decode, dumps, loads) in formats().items():
+            blob = encode(game)
+            raw = dumps(payload)
+            print(
+                f"{name:<16}{phases:>7}{len(blob):>10}"
+                f"{best_of(encode, game, args.repeat) * 1e3:>11.2f}{best_of(decode, blob, args.repeat) * 1e3:>11.2f}"
+                f"{best_of(dumps, payload, args.repeat) * 1e3:>14.2f}{best_of(loads, raw, args.repeat) * 1e3:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
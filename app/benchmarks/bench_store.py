@@ -0,0 +1,98 @@
+# Benchmarks the game store: saves per second, and the latency each save adds to a call
+#
+# python -m app.benchmarks.bench_store --games 50 --phases 20
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from app.game.game_manager import GameManager
+from app.game.store import GameStore
+from app.benchmarks.common import new_game, random_orders, percentile, quiet
+
+CALLS = ("register_player", "submit_orders", "resolve_game_phase")
+
+
+def run(manager: GameManager, games: int, phases: int, seed: int):
+    """
+    Plays the same scripted games through the manager and times every call
+    """
+    rng = random.Random(seed)
+    timings = {name: [] for name in CALLS}
+
+    with quiet():
+        for i in range(games):
+            game_id = f"bench-{i}"
+            manager.create_game(game_id=game_id, game_name=game_id, creator_id="bench")
+            for power in ("ENGLAND", "FRANCE", "GERMANY"):
+                start = time.perf_counter()
+                manager.register_player(game_id, f"{game_id}-{power}", power, power)
+                timings["register_player"].append(time.perf_counter() - start)
+
+        for _ in range(phases):
+            for i in range(games):
+                game_id = f"bench-{i}"
+                game = manager._get_game_object(game_id)
+                for player_id, player in manager._get_game_data(game_id)["players"].items():
+                    orders = random_orders(game, player["power"], rng)
+                    start = time.perf_counter()
+                    manager.submit_orders(game_id, player_id, orders)
+                    timings["submit_orders"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                manager.resolve_game_phase(game_id)
+                timings["resolve_game_phase"].append(time.perf_counter() - start)
+
+    return timings
+
+
+def throughput(manager: GameManager, rounds: int):
+    """
+    Saves every game in the manager over and over, and times until the writer caught up
+    """
+    store = manager.store
+    before = store.records_written
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for game_id in manager.games:
+            manager._save_game_to_db(game_id)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    return (store.records_written - before) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game store benchmark")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--phases", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    baseline = run(GameManager(), args.games, args.phases, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GameStore(os.path.join(tmp, "games.db"))
+        manager = GameManager(store=store)
+        stored = run(manager, args.games, args.phases, args.seed)
+        store.flush()
+        saves_per_second = throughput(manager, rounds=10)
+        records = store.records_written
+        batches = store.batches_written
+        store.close()
+
+    print(f"{args.games} games x {args.phases} phases")
+    print(f"saves written: {records} in {batches} batches")
+    print(f"store throughput: {saves_per_second:.0f} saves/s")
+    print(f"{'call':<20}{'p50 base':>12}{'p50 store':>12}{'p99 base':>12}{'p99 store':>12}{'p99 added':>12}")
+    for name in CALLS:
+        p50_base, p50_store = percentile(baseline[name], 50), percentile(stored[name], 50)
+        p99_base, p99_store = percentile(baseline[name], 99), percentile(stored[name], 99)
+        print(
+            f"{name:<20}{p50_base * 1e6:>10.0f}us{p50_store * 1e6:>10.0f}us"
+            f"{p99_base * 1e6:>10.0f}us{p99_store * 1e6:>10.0f}us{(p99_store - p99_base) * 1e6:>10.0f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Benchmarks order validation on submit, engine move generation vs the compiled validator
+#
+# python -m app.benchmarks.bench_validation --phases 0 10 30
+
+import argparse
+import random
+import time
+from app.game.game_manager import GameManager
+from app.game.order_index import build_order_index
+from app.benchmarks.common import new_game, play_phases, random_orders, percentile
+
+
+def engine_validate(game, power, orders):
+    # what validation cost before the order index: full move generation on every submission
+    possible_orders = game.get_all_possible_orders()
+    legal = {order for loc in game.get_orderable_locations(power) for order in possible_orders[loc]}
+    return [order in legal for order in orders]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order validation benchmark")
+    parser.add_argument("--phases", type=int, nargs="*", default=[0, 10, 30], help="phases played before measuring")
+    parser.add_argument("--submissions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for phases in args.phases:
+        manager = GameManager()
+        game_id = f"game-{phases}"
+        new_game(manager, game_id)
+        play_phases(manager, game_id, phases, random.Random(args.seed))
+        game = manager._get_game_object(game_id)
+        rng = random.Random(args.seed)
+
+        # legal orders, plus an illegal one in some submissions
+        powers = [power for power in game.powers if game.get_orderable_locations(power)]
+        submissions = []
+        for _ in range(args.submissions):
+            power = rng.choice(powers)
+            orders = random_orders(game, power, rng)
+            if rng.random() < 0.2:
+                orders.append("A PAR - MOS")
+            submissions.append((power, orders))
+
+        samples = []
+        for power, orders in submissions[:200]:
+            start = time.perf_counter()
+            engine_validate(game, power, orders)
+            samples.append(time.perf_counter() - start)
+        engine_p50 = percentile(samples, 50)
+
+        start = time.perf_counter()
+        index = build_order_index(game)
+        for power in powers:
+            index.validator(power)
+        compile_cost = time.perf_counter() - start
+
+        print(f"{game.get_current_phase()} ({phases} phases played):")
+        print(f"  engine move generation: p50 {engine_p50 * 1e6:8.1f}us per submission")
+        print(f"  compile index + validators: {compile_cost * 1e3:.2f}ms once per phase")
+
+        loose = [(power, [order.lower().replace(" - ", "-") for order in orders]) for power, orders in submissions]
+        for notation, batch in (("engine notation", submissions), ("loose notation", loose)):
+            samples = []
+            total_orders = 0
+            for power, orders in batch:
+                validator = index.validator(power)
+                start = time.perf_counter()
+                validator.check(orders)
+                samples.append(time.perf_counter() - start)
+                total_orders += len(orders)
+            print(
+                f"  validator, {notation}: p50 {percentile(samples, 50) * 1e6:.1f}us, "
+                f"p99 {percentile(samples, 99) * 1e6:.1f}us per submission, {sum(samples) / total_orders * 1e6:.2f}us per order"
+            )
+
+
+if __name__ == "__main__":
+    main()
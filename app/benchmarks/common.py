@@ -0,0 +1,44 @@
+# Shared helpers for the benchmark scripts
+
+import time
+from app.game.game_manager import GameManager
+from app.game.revisions import RevisionLog
+# game setup and random play are shared with the tests
+from app.tests.helpers import new_game, play_phases, quiet, random_orders
+
+
+def add_game(manager: GameManager, game_id: str, game, players: dict):
+    """
+    Puts an engine game (e.g. a decoded snapshot) into the manager, the way load_games restores one.
+    players: player_id -> power
+    """
+    data = {
+        "players": {player_id: {"power": power, "name": power} for player_id, power in players.items()},
+        "game_name": game_id,
+        "creator_id": "bench",
+    }
+    manager._restore_meta(game, data)
+    data.update({"game": game, "revisions": RevisionLog(game)})
+    manager.games[game_id] = data
+    manager.hibernation.touch(game_id)
+    manager._index_game(game_id)
+
+
+def percentile(samples, pct: float):
+    """
+    Nearest-rank percentile of a list of samples
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def timed(fn, *args, **kwargs):
+    """
+    Calls fn and returns (result, elapsed seconds)
+    """
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,192 @@
+# Adjudicates phases away from the live game object
+#
+# game.process() is CPU-bound pure python, so resolving many games in one process is
+# serialized by the GIL. A phase only needs the current state and orders, so the
+# manager ships those to a process pool, the worker rebuilds the board and processes
+# it, and the result is merged back into the live game.
+
+import copy
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from diplomacy.engine.game import Game
+from diplomacy.utils.game_phase_data import GamePhaseData
+from diplomacy.utils.sorted_dict import SortedDict
+
+
+# The engine's histories are SortedDicts keyed by phase. put() (and copy(), which puts every
+# key again) bisects the sorted key list, and every comparison of two phases goes through
+# the map's phase parser, so rebuilding a long history costs far more than the data. Phases
+# that are already in order (a snapshot's history, a copy of another history) are appended
+# to the SortedDict's private key list and value dict directly instead. That skips put()'s
+# ordering and value type checks, and relies on the name-mangled fields of diplomacy 1.1.2,
+# checked once here so an engine upgrade that changes them fails on import, not on a game.
+_KEYS, _KEY_LIST, _VALUES = "_SortedDict__keys", "_SortedSet__list", "_SortedDict__couples"
+_probe = SortedDict(int, int)
+if not (hasattr(_probe, _VALUES) and hasattr(getattr(_probe, _KEYS, None), _KEY_LIST)):
+    raise ImportError("diplomacy's SortedDict internals changed, see adjudication.extend_sorted")
+del _probe
+
+
+def extend_sorted(history: SortedDict, items):
+    """
+    Appends (key, value) pairs to a SortedDict without put(). The keys have to be in order,
+    after the last key already in it, and the values of its value type, neither is checked.
+    """
+    keys = getattr(getattr(history, _KEYS), _KEY_LIST)
+    values = getattr(history, _VALUES)
+    for key, value in items:
+        keys.append(key)
+        values[key] = value
+
+
+def power_orders(game: Game):
+    """
+    Each power's raw order containers, exactly as the engine holds them.
+    Going through get_orders()/set_orders() would drop WAIVE and VOID entries, which change the results.
+    """
+    return {
+        power.name: {
+            "orders": dict(power.orders),
+            "adjust": list(power.adjust),
+            "order_is_set": power.order_is_set,
+            "wait": power.wait,
+        }
+        for power in game.powers.values()
+    }
+
+
+def set_power_orders(game: Game, orders: dict):
+    """
+    Puts back order containers taken with power_orders()
+    """
+    for power_name, power_orders in orders.items():
+        power = game.get_power(power_name)
+        power.orders = dict(power_orders["orders"])
+        power.adjust = list(power_orders["adjust"])
+        power.order_is_set = power_orders["order_is_set"]
+        power.wait = power_orders["wait"]
+
+
+# carried between phases on the game object, but not part of get_state()
+# (e.g. dislodged units found during movement are needed to resolve retreats,
+# and a completed game keeps the phase type of its last phase)
+ENGINE_FIELDS = ("dislodged", "popped", "lost", "phase_type")
+
+
+def engine_fields(game: Game):
+    fields = {field: copy.copy(getattr(game, field)) for field in ENGINE_FIELDS}
+    # lost maps centers to Power objects, which don't pickle, ship the names instead
+    fields["lost"] = {center: power.name for center, power in game.lost.items()}
+    return fields
+
+
+def set_engine_fields(game: Game, fields: dict):
+    for field, value in fields.items():
+        setattr(game, field, copy.copy(value))
+    game.lost = {center: game.get_power(power_name) for center, power_name in fields["lost"].items()}
+
+
+def set_board(game: Game, state: dict):
+    """
+    Same result as Game.set_state(state, clear_history=False) for a state taken from get_state().
+    set_state moves units in one at a time, checking every other unit for conflicts. The
+    state is already a consistent board, so it's assigned directly and the hash rebuilt once.
+    """
+    game.note = state["note"]
+    game.set_current_phase(state["name"])
+    for power in game.powers.values():
+        units = state["units"].get(power.name, [])
+        retreats = state["retreats"].get(power.name, {})
+        power.units = [unit for unit in units if unit[0] != "*"]
+        power.retreats = {unit[1:]: list(retreats.get(unit[1:], [])) for unit in units if unit[0] == "*"}
+        power.centers = list(state["centers"].get(power.name, []))
+        power.homes = list(state["homes"].get(power.name, game.map.homes[power.name]))
+        power.influence = list(state["influence"].get(power.name, []))
+        power.civil_disorder = state["civil_disorder"].get(power.name, power.civil_disorder)
+    game.rebuild_hash()
+    game.build_caches()
+
+
+def adjudication_payload(game: Game):
+    """
+    Everything needed to process the current phase of a game somewhere else
+    """
+    return {
+        "map_name": game.map_name,
+        "rules": list(game.rules),
+        "state": game.get_state(),
+        "orders": power_orders(game),
+        "engine": engine_fields(game),
+    }
+
+
+def scratch_game(payload: dict):
+    """
+    Rebuilds a history-free copy of the board with its orders from a payload
+    """
+    game = Game(map_name=payload["map_name"], rules=payload["rules"])
+    set_board(game, payload["state"])
+    set_engine_fields(game, payload["engine"])
+    set_power_orders(game, payload["orders"])
+    return game
+
+
+def adjudicate(payload: dict):
+    """
+    Processes the phase described by a payload. Runs in worker processes.
+
+    Returns: the processed phase (GamePhaseData as a dict), and the resulting state and outcome
+    """
+    game = scratch_game(payload)
+    processed = game.process()
+    return {
+        "processed": processed.to_dict(),
+        "state": game.get_state(),
+        "engine": engine_fields(game),
+        "outcome": list(game.outcome),
+        "status": game.status,
+    }
+
+
+def apply_adjudication(game: Game, result: dict):
+    """
+    Merges an adjudication result into the live game, the same way game.process() would leave it:
+    the processed phase goes into history, orders and messages are cleared, and the new state is set.
+    """
+    processed = GamePhaseData.from_dict(result["processed"])
+    # the worker never saw the phase's messages, they come from the live game
+    processed.messages = game.messages.copy()
+
+    Game.clear_vote(game)
+    Game.clear_orders(game)
+    game.messages.clear()
+    Game.extend_phase_history(game, processed)
+    set_board(game, result["state"])
+    set_engine_fields(game, result["engine"])
+    game.outcome = list(result["outcome"])
+    if game.is_game_done:
+        game.set_status(result["status"])
+    else:
+        # same as process(): powers with nothing to order don't need to submit
+        for power_name, locs in game.get_orderable_locations().items():
+            if not locs and not game.get_power(power_name).is_eliminated():
+                game.set_orders(power_name, [])
+                game.set_wait(power_name, False)
+    return processed
+
+
+def _warm_up():
+    # loads and caches the standard map in the worker
+    Game()
+
+
+def adjudication_pool(workers: int = None):
+    """
+    Process pool for adjudicate(), sized to the cores
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up,
+    )
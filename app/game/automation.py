@@ -1,61 +1,119 @@
 # controls game loop, phase resolution, bots, etc
 
-import time
-from threading import Thread 
+import logging
+import threading
 from .game_manager import GameManager
+from .scheduler import PhaseScheduler
+
+log = logging.getLogger(__name__)
 
 class GameAutomation:
-    def __init__(self, manager: GameManager):
+    def __init__(self, manager: GameManager, scheduler: PhaseScheduler = None, executor=None):
+        """
+        With an executor (see adjudication.adjudication_pool), games that are due at the same
+        time are resolved together across its worker processes.
+        """
         self.manager = manager
-        self.running_games = {}
-        self.stop_flags = {}
-        
+        self.executor = executor
+        if scheduler is None:
+            batch_callback = self._run_phases if executor is not None else None
+            scheduler = PhaseScheduler(self._run_phase, batch_callback=batch_callback)
+        self.scheduler = scheduler
+        self.running_games = {}  # game_id -> phase interval in seconds
+        self._lock = threading.Lock()
+
     def start_automation(self, game_id: str, interval: int = 60):
-        if game_id in self.running_games:
-            print(f"Automation already running for {game_id}")
-            return 
-        
-        self.stop_flags[game_id] = False
-        thread = Thread(target=self._run_loop, args=(game_id, interval), daemon=True)
-        self.running_games[game_id] = thread
-        thread.start()
-        
+        """
+        Resolves the game's phase every interval seconds until stopped or the game ends.
+        """
+        with self._lock:
+            if game_id in self.running_games:
+                log.info("automation already running", extra={"game_id": game_id})
+                return
+            self.running_games[game_id] = interval
+            self.scheduler.schedule(game_id, interval)
+        log.info("automation started", extra={"game_id": game_id, "interval": interval})
+
     def stop_automation(self, game_id: str):
-        if game_id in self.running_games:
-            self.stop_flags[game_id] = True
-            print(f"[{game_id}] stop signal sent to automation.")
-        else: 
-            print(f"[{game_id}] No running automation to stop.")
-        
-    def _run_loop(self, game_id: str, interval: int):
-        print(f"[{game_id}] Automation started.")
-        while not self.stop_flags.get(game_id, True): 
-            try:
-                game_state = self.manager.get_game_state(game_id)
-                if not game_state["success"]:
-                    print(f"[{game_id}] Error: {game_state['error']}")
-                    break
-                
+        """
+        Stops automation right away, the next deadline is dropped.
+        """
+        with self._lock:
+            interval = self.running_games.pop(game_id, None)
+            self.scheduler.cancel(game_id)
+        if interval is not None:
+            log.info("automation stopped", extra={"game_id": game_id})
+        else:
+            log.info("no running automation to stop", extra={"game_id": game_id})
+
+    def _run_phase(self, game_id: str):
+        """
+        Called by the scheduler when a game's phase deadline is due.
+        Submits bot orders, resolves the phase and schedules the next deadline.
+        """
+        if game_id not in self.running_games:
+            return  # stopped after it became due
+
+        try:
+            # bot orders and resolution happen together, no player can slip orders in between
+            with self.manager._game_lock(game_id):
                 game = self.manager._get_game_object(game_id)
-                if game.is_game_done:
-                    print(f"[{game_id}] Game finished.")
-                    break
-                
-                # submit bot orders 
-                self.manager._create_bot_orders(game_id)
-                
-                # Check if all players have submitted orders 
-                
-                # advance phase 
-                self.manager.resolve_game_phase(game_id)
-                
-                # wait for next tick 
-                time.sleep(interval)
-                
-            except Exception as e:
-                print(f"[{game_id}] Automation error: {e}")
-                break
-            
-        print(f"[{game_id}] Automation stopped.")
-        self.running_games.pop(game_id, None)
-        self.stop_flags.pop(game_id, None)
\ No newline at end of file
+                if not game.is_game_done:
+                    # submit bot orders
+                    self.manager._create_bot_orders(game_id)
+
+                    # advance phase
+                    self.manager.resolve_game_phase(game_id)
+        except Exception:
+            log.exception("automation error", extra={"game_id": game_id})
+            self._finish(game_id)
+            return
+
+        self._schedule_next(game_id, game)
+
+    def _run_phases(self, game_ids):
+        """
+        Called by the scheduler with every game that is due at the same time.
+        Bot orders are submitted per game, then all phases are resolved in one batch.
+        """
+        ready = []
+        games = {}
+        for game_id in game_ids:
+            if game_id not in self.running_games:
+                continue
+            try:
+                with self.manager._game_lock(game_id):
+                    game = self.manager._get_game_object(game_id)
+                    if not game.is_game_done:
+                        self.manager._create_bot_orders(game_id)
+                        ready.append(game_id)
+                games[game_id] = game
+            except Exception:
+                log.exception("automation error", extra={"game_id": game_id})
+                self._finish(game_id)
+
+        results = self.manager.resolve_games(ready, self.executor)
+        for game_id, game in games.items():
+            result = results.get(game_id)
+            if result is not None and not result.get("success"):
+                log.error("automation error: %s", result.get("error"), extra={"game_id": game_id})
+                self._finish(game_id)
+                continue
+            self._schedule_next(game_id, self.manager._get_game_object(game_id))
+
+    def _schedule_next(self, game_id: str, game):
+        if game.is_game_done:
+            log.info("game finished", extra={"game_id": game_id})
+            self._finish(game_id)
+            return
+
+        with self._lock:
+            interval = self.running_games.get(game_id)
+            if interval is not None:
+                self.scheduler.schedule(game_id, interval)
+
+    def _finish(self, game_id: str):
+        with self._lock:
+            self.running_games.pop(game_id, None)
+            self.scheduler.cancel(game_id)
+        log.info("automation stopped", extra={"game_id": game_id})
@@ -0,0 +1,136 @@
+# Order generation for dummy powers (powers without a player)
+#
+# Works off the phase's order index, so the engine's move generation runs once per
+# phase no matter how many dummy powers there are. Every unit of every dummy power
+# gets exactly one order in a single pass, the policy decides which.
+
+import random
+from diplomacy.engine.game import Game
+from .order_index import OrderIndex
+
+
+class Board:
+    """
+    What the policies need to know about the board, computed once per pass
+    """
+    def __init__(self, game: Game):
+        self.phase_type = game.get_current_phase()[-1]
+        self.scs = set(game.map.scs)
+        self.owners = {center: power.name for power in game.powers.values() for center in power.centers}
+
+
+def _destination(order: str):
+    """
+    Province an order moves (or retreats, or supports a move) into, None for anything else
+    """
+    words = order.split()
+    if len(words) >= 4 and words[2] in ("-", "R"):
+        return words[3][:3]
+    if len(words) >= 7 and words[2] == "S" and words[5] == "-":
+        return words[6][:3]
+    return None
+
+
+class RandomPolicy:
+    name = "random"
+
+    def choose(self, orders, power: str, board: Board, claimed: set, rng: random.Random):
+        return rng.choice(orders)
+
+
+class HoldBiasedPolicy:
+    """
+    Mostly holds, moves now and then. Keeps the dummy powers from wandering off their centers.
+    """
+    name = "hold"
+
+    def __init__(self, hold_probability: float = 0.8):
+        self.hold_probability = hold_probability
+
+    def choose(self, orders, power: str, board: Board, claimed: set, rng: random.Random):
+        holds = [order for order in orders if order.endswith(" H")]
+        if holds and rng.random() < self.hold_probability:
+            return holds[0]
+        others = [order for order in orders if not order.endswith(" H")] or orders
+        return rng.choice(others)
+
+
+class SupplyCenterGreedyPolicy:
+    """
+    Goes for supply centers it doesn't own, then supports into them, then holds its own.
+    Two units of the same power are never sent to the same province.
+    """
+    name = "greedy"
+
+    def choose(self, orders, power: str, board: Board, claimed: set, rng: random.Random):
+        best, best_score = [], None
+        for order in orders:
+            score = self._score(order, power, board, claimed)
+            if best_score is None or score > best_score:
+                best, best_score = [order], score
+            elif score == best_score:
+                best.append(order)
+        return rng.choice(best)
+
+    def _score(self, order: str, power: str, board: Board, claimed: set):
+        if order == "WAIVE":
+            return -1
+        words = order.split()
+        verb = words[2] if len(words) > 2 else None
+        destination = _destination(order)
+        if verb in ("-", "R"):
+            if destination in claimed:
+                return -1
+            if destination in board.scs:
+                return 4 if board.owners.get(destination) != power else 1
+            return 0
+        if verb == "S" and destination in board.scs and board.owners.get(destination) != power:
+            return 3
+        if verb == "H" and board.owners.get(words[1][:3]) == power:
+            return 2  # sitting on its own center keeps it
+        if verb == "B":
+            return 1
+        return 0
+
+
+POLICIES = {policy.name: policy for policy in (RandomPolicy, HoldBiasedPolicy, SupplyCenterGreedyPolicy)}
+
+
+class BotEngine:
+    def __init__(self, policy="random", rng: random.Random = None):
+        """
+        policy: a policy object with choose(), or the name of one in POLICIES
+        """
+        self.policy = POLICIES[policy]() if isinstance(policy, str) else policy
+        self.rng = rng or random.Random()
+
+    def create_orders(self, game: Game, index: OrderIndex, powers):
+        """
+        One order for every unit of each power, all powers in one pass.
+        During adjustments, only as many builds or disbands as the power is allowed.
+
+        Returns: dict of power -> list of orders, powers with nothing to order are left out
+        """
+        board = Board(game)
+        bot_orders = {}
+        for power_name in powers:
+            unit_orders = index.unit_orders(power_name)
+            if not unit_orders:
+                continue
+            units = list(unit_orders)
+            if board.phase_type == "A":
+                power = game.get_power(power_name)
+                # builds go to some of the free home centers, disbands to some of the units
+                self.rng.shuffle(units)
+                units = units[:abs(len(power.centers) - len(power.units))]
+
+            claimed = set()
+            orders = []
+            for unit in units:
+                order = self.policy.choose(unit_orders[unit], power_name, board, claimed, self.rng)
+                destination = _destination(order)
+                if destination is not None and order.split()[2] != "S":
+                    claimed.add(destination)
+                orders.append(order)
+            bot_orders[power_name] = orders
+        return bot_orders
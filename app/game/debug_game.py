@@ -123,8 +123,8 @@ while True:
         pp.pprint(manager.get_game_state(game_id))
         
     elif choice == "13":
-        print(manager.render_game(game_id))
-        print("Game rendered")
+        svg = manager.render_game(game_id)
+        print(f"Game rendered ({len(svg)} bytes)")
         
     elif choice == "14":
         manager.save_game(game_id)
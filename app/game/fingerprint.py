@@ -0,0 +1,26 @@
+# Cheap fingerprints of a game's board and submitted orders, used as cache keys
+
+import hashlib
+from diplomacy.engine.game import Game
+
+
+def orders_digest(game: Game):
+    """
+    Stable hash of every order submitted for the current phase
+    """
+    orders = game.get_orders()
+    digest = hashlib.sha1()
+    for power in sorted(orders):
+        digest.update(power.encode())
+        for order in sorted(orders[power]):
+            digest.update(b"\0")
+            digest.update(order.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def board_key(game_id: str, game: Game):
+    """
+    (game_id, phase, board hash, orders hash), changes whenever the board or the orders do
+    """
+    return (game_id, game.get_current_phase(), game.get_hash(), orders_digest(game))
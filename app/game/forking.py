@@ -0,0 +1,44 @@
+# Forks of a game, for what-if branches
+#
+# A fork starts at its parent's current phase. Played phases never change, so the
+# fork's history containers point at the parent's phase states, orders, results and
+# messages instead of copying them, and the map is the engine's cached one. Only the
+# board of the current phase, its orders and messages are copied, the fork then plays
+# on without touching the parent. Copying the whole game (copy.deepcopy) costs time
+# and memory in proportion to the number of phases played.
+
+from diplomacy.engine.game import Game
+from diplomacy.utils.sorted_dict import SortedDict
+from .adjudication import power_orders, set_power_orders, engine_fields, set_engine_fields, set_board, extend_sorted
+
+HISTORIES = ("state_history", "order_history", "result_history", "message_history")
+
+
+def _share(history: SortedDict):
+    """
+    A new SortedDict with the same keys and values. New phases go into the copy only,
+    the values themselves are shared. The keys are in order already, so they're appended
+    rather than re-inserted by SortedDict.copy(), see adjudication.extend_sorted.
+    """
+    shared = SortedDict(history.key_type, history.val_type)
+    extend_sorted(shared, history.items())
+    return shared
+
+
+def fork_game(game: Game, game_id: str):
+    """
+    A new game at the same phase as game, with its history, board, orders and messages.
+    Controllers and status aren't copied, see GameManager.fork_game.
+    """
+    fork = Game(game_id=game_id, map_name=game.map_name, rules=list(game.rules))
+    # the parent's phase keys go into the fork's histories, they have to be the same type
+    fork._phase_wrapper_type = game._phase_wrapper_type
+    for name in HISTORIES:
+        setattr(fork, name, _share(getattr(game, name)))
+    fork.messages = _share(game.messages)
+
+    set_board(fork, game.get_state())
+    set_engine_fields(fork, engine_fields(game))
+    set_power_orders(fork, power_orders(game))
+    fork.outcome = list(game.outcome)
+    return fork
@@ -0,0 +1,93 @@
+# Secondary indexes over the games for the lobby list
+#
+# Every game gets a sequence number when it's first indexed. Each index keeps the
+# sequence numbers of its games in a sorted list, so a page is a bisect to the cursor
+# and a slice, newest games first, instead of a walk over every game.
+
+import itertools
+import threading
+from bisect import bisect_left, insort
+
+FIELDS = ("creator_id", "player_id", "status", "open_seats")
+PAGE_SIZE = 100  # games per page when no limit is given
+MAX_PAGE_SIZE = 1000
+
+
+class GameIndex:
+    def __init__(self):
+        self._seq = itertools.count(1)
+        self._seqs = {}  # game_id -> seq
+        self._game_ids = {}  # seq -> game_id
+        self._keys = {}  # game_id -> set of (field, value) it is indexed under
+        self._index = {}  # (field, value) -> sorted list of seqs
+        self._all = []  # every seq, sorted
+        self._lock = threading.Lock()  # games are updated under their own locks, this covers the shared lists
+
+    def __len__(self):
+        return len(self._seqs)
+
+    def update(self, game_id: str, creator_id: str, player_ids, status: str, open_seats: int):
+        """
+        Adds a game, or moves it to the right indexes after it changed
+        """
+        keys = {("creator_id", creator_id), ("status", status), ("open_seats", open_seats > 0)}
+        keys.update(("player_id", player_id) for player_id in player_ids)
+        with self._lock:
+            self._update(game_id, keys)
+
+    def _update(self, game_id: str, keys: set):
+        seq = self._seqs.get(game_id)
+        if seq is None:
+            seq = self._seqs[game_id] = next(self._seq)
+            self._game_ids[seq] = game_id
+            self._all.append(seq)
+
+        old_keys = self._keys.get(game_id, set())
+        for key in old_keys - keys:
+            entries = self._index[key]
+            del entries[bisect_left(entries, seq)]
+            if not entries:
+                del self._index[key]
+        for key in keys - old_keys:
+            insort(self._index.setdefault(key, []), seq)
+        self._keys[game_id] = keys
+
+    def query(self, limit: int, cursor: str = None, **filters):
+        """
+        One page of game ids matching every filter given (creator_id, player_id, status, open_seats),
+        newest first. cursor is the next_cursor of the previous page.
+
+        Returns: (game_ids, next_cursor), next_cursor is None on the last page
+        """
+        keys = [(field, bool(value) if field == "open_seats" else value) for field, value in filters.items() if value is not None]
+        for field, _ in keys:
+            if field not in FIELDS:
+                raise ValueError(f"Unknown filter '{field}'")
+
+        with self._lock:
+            return self._query(keys, limit, cursor)
+
+    def _query(self, keys: list, limit: int, cursor: str):
+        # walk the smallest index and check the others per game
+        candidates = [self._index.get(key, []) for key in keys] or [self._all]
+        entries = min(candidates, key=len)
+        others = [key for key in keys if self._index.get(key, []) is not entries]
+
+        end = len(entries)
+        if cursor:
+            try:
+                end = bisect_left(entries, int(cursor))
+            except ValueError:
+                raise ValueError(f"Invalid cursor '{cursor}'")
+
+        game_ids = []
+        position = end - 1
+        while position >= 0 and len(game_ids) < limit:
+            seq = entries[position]
+            game_id = self._game_ids[seq]
+            if all(key in self._keys[game_id] for key in others):
+                game_ids.append(game_id)
+            position -= 1
+
+        next_cursor = str(entries[position + 1]) if position >= 0 else None
+        return game_ids, next_cursor
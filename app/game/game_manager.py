@@ -1,20 +1,100 @@
 # Wraps the Diplomacy game engine 
 
+import functools
+import logging
 import random 
+import threading
+import time
+import weakref
 from datetime import datetime, timezone
 from diplomacy.engine.game import Game
-from diplomacy.utils.export import to_saved_game_format
+from diplomacy.utils.export import to_saved_game_format, from_saved_game_format
+from .order_index import build_order_index
+from .fingerprint import board_key
+from .render_cache import RenderCache, render_etag
+from .render_pool import render_payload
+from .revisions import RevisionLog
+from .adjudication import adjudicate, adjudication_payload, apply_adjudication, scratch_game
+from .bots import BotEngine
+from .game_index import GameIndex, PAGE_SIZE
+from .hibernation import Hibernation, freeze, freeze_saved_game, thaw
+from .phase_history import PhaseHistory
+from .forking import fork_game
+from .preview import PreviewCache, summarize
+from .response_cache import ResponseCache
+from app.services.metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+METHOD_LATENCY = REGISTRY.histogram(
+    "game_manager_call_duration_seconds", "GameManager call time, waiting for the game's lock included", ("method",)
+)
+ORDER_SUBMISSIONS = REGISTRY.counter("diplomacy_order_submissions_total", "Order submissions, by outcome", ("outcome",))
+ORDERS = REGISTRY.counter("diplomacy_orders_total", "Orders accepted")
+RESOLUTIONS = REGISTRY.counter("diplomacy_phases_resolved_total", "Phases resolved")
+GAMES_ENDED = REGISTRY.counter("diplomacy_games_ended_total", "Games that reached an outcome")
+RENDERS = REGISTRY.counter("diplomacy_renders_total", "Board render requests, by render cache result", ("cache",))
+PREVIEWS = REGISTRY.counter("diplomacy_previews_total", "Adjudication previews, by preview cache result", ("cache",))
+RESPONSES = REGISTRY.counter("diplomacy_encoded_responses_total", "Pre-encoded responses, by response cache result", ("cache",))
 
 # the standard diplomacy powers 
 DIPLOMACY_POWERS = ["AUSTRIA", "ENGLAND", "FRANCE", "GERMANY", "ITALY", "RUSSIA", "TURKEY"]
 
+def timed(method):
+    """
+    Records the call time of the method in the game_manager_call_duration_seconds histogram
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            METHOD_LATENCY.observe(time.perf_counter() - start, name)
+    return wrapper
+
+def per_game(method):
+    """
+    Runs the method while holding the game's lock. 
+    Calls on the same game run one at a time, different games run in parallel.
+    The call is timed, see timed.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        game_id = kwargs["game_id"] if "game_id" in kwargs else args[0]
+        start = time.perf_counter()
+        try:
+            with self._game_lock(game_id):
+                return method(self, *args, **kwargs)
+        finally:
+            METHOD_LATENCY.observe(time.perf_counter() - start, name)
+    return wrapper
+
 class GameManager:
-    def __init__(self):
+    def __init__(self, store=None, render_cache: RenderCache = None, strict_orders: bool = True, bot_policy="random",
+                 max_resident_games: int = None):
         self.games = {} 
-        
+        self.hibernation = Hibernation(max_resident_games)  # idle games beyond the budget are kept as blobs
+        self.bots = BotEngine(bot_policy)  # orders for powers without a player, see bots.POLICIES
+        self.index = GameIndex()  # lobby indexes, see list_games
+        self.strict_orders = strict_orders  # reject submissions with illegal orders, see check_orders
+        self.store = store  # optional GameStore, games are only kept in memory without one
+        self.render_cache = render_cache or RenderCache()
+        self.preview_cache = PreviewCache()  # adjudication previews by board and orders, see preview_phase
+        self.response_cache = ResponseCache()  # encoded state, orders and summary bodies, see get_state_response
+        self._order_indexes = {}  # game_id -> OrderIndex for the current phase
+        self._locks = weakref.WeakValueDictionary()  # game_id -> RLock while someone holds or waits for it, see per_game
+        self.listeners = []  # listener(game_id, event, data), called after every game event
+        self._locks_lock = threading.Lock()
+        
+    @timed
     def get_all_games(self):
         game_list = []
-        for game_id, game_data in self.games.items():
+        for game_id, game_data in list(self.games.items()):
             game_list.append({
                 "game_id": game_id,
                 "players": game_data["players"],
@@ -22,7 +102,33 @@ class GameManager:
                 "creator_id": game_data["creator_id"]
             })
         return game_list
+
+    @timed
+    def list_games(self, limit: int = PAGE_SIZE, cursor: str = None, creator_id: str = None,
+                   player_id: str = None, status: str = None, open_seats: bool = None):
+        """
+        One page of the lobby list, newest games first, filtered through the secondary indexes.
+        Pass next_cursor back as cursor to get the following page.
+        
+        Returns: {"games": [game summaries], "next_cursor": str, or None on the last page}
+        """
+        game_ids, next_cursor = self.index.query(
+            limit, cursor, creator_id=creator_id, player_id=player_id, status=status, open_seats=open_seats
+        )
+        games = []
+        for game_id in game_ids:
+            game_data = self.games[game_id]
+            games.append({
+                "game_id": game_id,
+                "players": game_data["players"],
+                "game_name": game_data["game_name"],
+                "creator_id": game_data["creator_id"],
+                "status": self._game_status(game_data),
+                "open_seats": len(DIPLOMACY_POWERS) - len(game_data["players"])
+            })
+        return {"games": games, "next_cursor": next_cursor}
     
+    @per_game
     def get_game(self, game_id: str):
         if game_id in self.games:
             game_data = self.games[game_id]
@@ -36,6 +142,7 @@ class GameManager:
         return None
             
         
+    @per_game
     def create_game(self, game_id: str, game_name: str, creator_id: str, rules: dict = None):
         """
         Creates a new game with 7 dummies for all powers.
@@ -61,13 +168,49 @@ class GameManager:
             "game": game,
             "players": {},
             "game_name": game_name,
-            "creator_id": creator_id
+            "creator_id": creator_id,
+            "revisions": RevisionLog(game)
         }
-        self._save_game_to_db(game_id) # stub
-        print(self.games)
+        self._index_game(game_id)
+        self._save_game_to_db(game_id)
+        self._mark_used(game_id)
+        log.info("game created", extra={"game_id": game_id, "creator_id": creator_id})
         
         return {"success": True, "game_id": game_id, "rules": rules}
             
+    @per_game
+    def fork_game(self, game_id: str, fork_id: str, creator_id: str, game_name: str = None, keep_players: bool = False):
+        """
+        Branches a game at its current phase into a new game, for playing out alternatives.
+        The fork shares the parent's played phases, only the current board and orders are copied.
+        keep_players: the parent's players keep their powers in the fork, otherwise every seat is open.
+        """
+        if fork_id in self.games:
+            return {"success": False, "error": f"Game with ID '{fork_id}' already exists."}
+        try:
+            data = self._get_game_data(game_id)
+            game = self._get_game_object(game_id)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+        players = {player_id: dict(player) for player_id, player in data["players"].items()} if keep_players else {}
+        fork = self._restore_meta(fork_game(game, fork_id), {"players": players, "status": game.status})
+        self.games[fork_id] = {
+            "game": fork,
+            "players": players,
+            "game_name": game_name or f"{data['game_name']} (fork)",
+            "creator_id": creator_id,
+            "revisions": RevisionLog(fork),
+            "history": self._get_phase_history(game_id).fork(),
+        }
+        self._index_game(fork_id)
+        self._save_game_to_db(fork_id)
+        self._mark_used(fork_id)
+        log.info("game forked", extra={"game_id": fork_id, "parent_id": game_id, "creator_id": creator_id})
+
+        return {"success": True, "game_id": fork_id, "parent_id": game_id, "phase": fork.get_current_phase()}
+
+    @per_game
     def register_player(self, game_id: str, player_id: str, player_name: str, power: str = None): 
         """
         Registers a new player, with ID and power. 
@@ -108,10 +251,12 @@ class GameManager:
         # set as controlled by player
         power_object.set_controlled(player_id)
         
-        self._save_game_to_db(game_id) #stub
+        self._index_game(game_id)
+        self._save_game_to_db(game_id)
         
         return {"success": True, "player_id": player_id, "player_name": player_name, "power": power}
             
+    @per_game
     def start_game(self, game_id: str):
         """
         Starts the game (set status to active).
@@ -128,10 +273,12 @@ class GameManager:
            
         # game.process() #advance to first phase
         game.set_status("active")
-        self._save_game_to_db(game_id) #stub 
+        self._index_game(game_id)
+        self._save_game_to_db(game_id)
         
         return {"success": True, "status": "active", "message": "Game started successfully."}
         
+    @per_game
     def submit_orders(self, game_id: str, player_id: str, orders: list):
         """
         Submits orders for a specific power. 
@@ -149,28 +296,53 @@ class GameManager:
             return {"success": False, "error": f"Player '{player_id}' is not registered."} 
            
         power = players[player_id]['power']
-        # validate orders with helper func 
-        # validated_orders = self.validate_orders(game_id=game_id, orders=orders, power=power)
-        
-        # if not validated_orders:
-        #     return {"success": False, "error": "No valid orders submitted."}
-        
+        # validate orders, nothing is submitted if any of them is illegal
+        results = None
+        if self.strict_orders:
+            results = self.check_orders(game_id, power, orders)
+            rejected = [result for result in results if not result["valid"]]
+            if rejected:
+                ORDER_SUBMISSIONS.inc("rejected")
+                return {
+                    "success": False,
+                    "error": f"{len(rejected)} of {len(orders)} orders are invalid.",
+                    "results": results
+                }
+            orders = [result["normalized"] for result in results]
+
+        if game.phase_type == "A":
+            # the engine only replaces builds at the exact same location (STP, not STP/SC),
+            # so a resubmission would add to the earlier builds instead of replacing them
+            game.set_orders(power, [])
         game.set_orders(power, orders, expand=False, replace=True)
+        revision = self._game_changed(game_id)
+        self._publish(game_id, "orders_submitted", {"power": power, "revision": revision})
         
-        print(f"All submitted orders: {game.get_orders()}")
+        ORDER_SUBMISSIONS.inc("accepted")
+        ORDERS.inc(amount=len(orders))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("orders submitted", extra={"game_id": game_id, "power": power, "orders": orders})
         
-        return {"success": True, "power": power, "orders_submitted": orders}
+        return {"success": True, "power": power, "orders_submitted": orders, "results": results}
         
+    @per_game
     def validate_orders(self, game_id: str, orders, power):
         """
         Returns a list of valid orders, validated against game.get_all_possible_orders(), filtered by power
         """
-        valid_power_orders = self._get_power_orders(game_id=game_id, power=power)
-            
-        # check validity and return 
-        valid_orders = [order for order in orders if order in valid_power_orders]
-        return valid_orders
+        return [result["normalized"] for result in self.check_orders(game_id, power, orders) if result["valid"]]
+
+    @per_game
+    def check_orders(self, game_id: str, power, orders):
+        """
+        Checks orders against the legal orders of the current phase.
+        Orders are normalized first (case, whitespace, coasts), so "a par-bur" passes as "A PAR - BUR".
+        
+        Returns: one {"order", "normalized", "valid", "reason"} dict per order
+        """
+        return self._get_order_index(game_id).validator(power).check(orders)
     
+    @per_game
     def get_orders(self, game_id: str):
         """
         Returns all submitted orders for the current phase
@@ -179,6 +351,7 @@ class GameManager:
         orders = game.get_orders()
         return orders
         
+    @per_game
     def resolve_game_phase(self, game_id: str):
         """
         Resolves the current phase by processing all orders and updating the game state.
@@ -199,18 +372,10 @@ class GameManager:
         # if phase_type not in ["M", "R"]:
         #     return {"success": False, "error": f"Cannot resolve during '{current_phase}' phase"}
         
-        all_powers = game.get_map_power_names()  # all powers   
-        
         # self._create_bot_orders(game_id)     
 
         # For unsubmitted powers, fill in HOLD orders
-        for power in all_powers:
-            if not game.get_orders(power):
-                units = game.get_units(power)
-                hold_orders = [f"{unit} H" for unit in units]
-                print(f"[AUTO] Submitting HOLD orders for power '{power}': {hold_orders}")
-                game.set_orders(power, hold_orders)
-        
+        self._fill_hold_orders(game)
         
         # process the orders for the current phase
         game.process()
@@ -218,9 +383,120 @@ class GameManager:
         # Clear submitted orders after processing (BROKEN)
         # data["submitted_orders"].clear()
         
-        self._save_game_to_db(game_id) # stub 
+        return self._phase_resolved(game_id, current_phase)
+
+    @timed
+    def resolve_games(self, game_ids, executor=None):
+        """
+        Resolves the current phase of many games at once, e.g. every game whose deadline is due.
+        With an executor (see adjudication.adjudication_pool) the phases are adjudicated in
+        parallel on worker processes and merged back into the live games.
+
+        Returns: dict of game_id -> the same result as resolve_game_phase, with already_resolved=True
+        for games whose phase was resolved by someone else while it was being adjudicated
+        """
+        if executor is None:
+            return {game_id: self.resolve_game_phase(game_id) for game_id in game_ids}
+
+        results = {}
+        jobs = {}
+        for game_id in game_ids:
+            with self._game_lock(game_id):
+                try:
+                    data = self._get_game_data(game_id)
+                    game = self._get_game_object(game_id)
+                except ValueError as e:
+                    results[game_id] = {"success": False, "error": str(e)}
+                    continue
+                self._fill_hold_orders(game)
+                payload = adjudication_payload(game)
+                jobs[game_id] = (data["revisions"].revision, game.get_current_phase(), executor.submit(adjudicate, payload))
+
+        for game_id, (revision, phase, future) in jobs.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                results[game_id] = {"success": False, "error": f"Adjudication failed: {e}"}
+                continue
+            with self._game_lock(game_id):
+                try:
+                    data = self._get_game_data(game_id)
+                    game = self._get_game_object(game_id)
+                except ValueError as e:
+                    results[game_id] = {"success": False, "error": str(e)}
+                    continue
+                current_phase = game.get_current_phase()
+                if current_phase != phase:
+                    # someone else resolved the phase while it was out, the pool's result is stale
+                    results[game_id] = {
+                        "success": True,
+                        "phase": phase,
+                        "status": "complete" if game.is_game_done else "active",
+                        "next_phase": current_phase,
+                        "already_resolved": True
+                    }
+                    continue
+                if data["revisions"].revision != revision:
+                    # orders changed while the phase was out, resolve again with the latest ones
+                    results[game_id] = self.resolve_game_phase(game_id)
+                    continue
+                apply_adjudication(game, result)
+                results[game_id] = self._phase_resolved(game_id, current_phase)
+        return results
+
+    @per_game
+    def preview_phase(self, game_id: str):
+        """
+        What resolving the current phase right now would do, with HOLDs for powers that haven't ordered.
+        Adjudicated on a scratch copy, the game itself doesn't change. The same board and orders
+        are only adjudicated once.
+
+        Returns: {"success", "phase", "next_phase", "orders", "results", "bounces", "dislodged", "units", "centers"}
+        """
+        try:
+            game = self._get_game_object(game_id)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        if game.is_game_done:
+            return {"success": False, "error": f"Game '{game_id}' is over."}
+
+        key = board_key(game_id, game)
+        preview = self.preview_cache.get(key)
+        PREVIEWS.inc("hit" if preview is not None else "miss")
+        if preview is None:
+            scratch = scratch_game(adjudication_payload(game))
+            self._fill_hold_orders(scratch)
+            phase = scratch.get_current_phase()
+            preview = summarize(scratch, phase, scratch.process())
+            self.preview_cache.put(key, preview)
+        return {"success": True, **preview}
+
+    def _fill_hold_orders(self, game):
+        for power in game.get_map_power_names():
+            if not game.get_orders(power):
+                units = game.get_units(power)
+                hold_orders = [f"{unit} H" for unit in units]
+                log.debug("holding units without orders", extra={"game_id": game.game_id, "power": power, "units": len(units)})
+                game.set_orders(power, hold_orders)
+
+    def _phase_resolved(self, game_id: str, current_phase: str):
+        """
+        Bookkeeping once a phase has been processed: revision, events, game end
+        """
+        game = self._get_game_object(game_id)
+        self._order_indexes.pop(game_id, None)
+        self._get_phase_history(game_id).sync(game)
+        RESOLUTIONS.inc()
+        
+        revision = self._game_changed(game_id)
+        self._publish(game_id, "phase_resolved", {
+            "phase": current_phase,
+            "next_phase": game.get_current_phase(),
+            "revision": revision
+        })
         
         status = "complete" if game.is_game_done else "active"
+        self._index_game(game_id)
         
         # check if the game is done after processing orders 
         if game.is_game_done:
@@ -233,6 +509,7 @@ class GameManager:
             "next_phase": game.get_current_phase()
         }
             
+    @per_game
     def get_phase_type(self, game_id: str):
         """
         returns the phase type 
@@ -245,34 +522,277 @@ class GameManager:
         Handles the end of the game (e.g., declare winner, cleanup).
         """
         
-        print(f"Game '{game_id}' has ended.")
+        GAMES_ENDED.inc()
+        log.info("game ended", extra={"game_id": game_id})
+        self._publish(game_id, "game_over", {"outcome": list(self._get_game_object(game_id).outcome)})
         # add additional logic here 
         self._save_game_to_db(game_id) # save final state of the game
     
-    def get_game_state(self, game_id: str) -> dict:
+    @per_game
+    def get_game_state(self, game_id: str, since: int = None, epoch: str = None) -> dict:
+        """
+        Returns the game state, its revision and the revision epoch (see revisions.py).
+        With since and the epoch it came with, only returns what changed after that revision,
+        or changed=False if nothing did. Unknown revisions and other epochs get the full state.
+        """
         try:
+            data = self._get_game_data(game_id)
             game = self._get_game_object(game_id)
-            return {"success": True, "state": game.get_state()}
         except ValueError as e:
             return {"success": False, "error": str(e)}
+        
+        revisions = data["revisions"]
+        if since is not None:
+            changes = revisions.changes_since(since, epoch)
+            if changes == {}:
+                return {"success": True, "revision": revisions.revision, "epoch": revisions.epoch, "changed": False}
+            if changes is not None:
+                return {
+                    "success": True, "revision": revisions.revision, "epoch": revisions.epoch,
+                    "since": since, "changed": True, "changes": changes
+                }
+            
+        return {"success": True, "revision": revisions.revision, "epoch": revisions.epoch, "state": game.get_state()}
+    
+    @per_game
+    def get_state_response(self, game_id: str):
+        """
+        The /state response body for the current revision, encoded once per revision.
+        A hibernated game is only woken up when its revision isn't cached.
+
+        Returns: response_cache.Encoded, or None for an unknown game
+        """
+        data = self.games.get(game_id)
+        if data is None:
+            return None
+        key = ("state", game_id)
+        if data["revisions"] is not None:
+            encoded = self._cached_response(key, self._revision_version(data))
+            if encoded is not None:
+                return encoded
+        game = self._get_game_object(game_id)
+        revisions = data["revisions"]
+        state = {"success": True, "revision": revisions.revision, "epoch": revisions.epoch, "state": game.get_state()}
+        # same shape as GameStateResponse
+        body = {"game_id": game_id, "state": state, "revision": revisions.revision}
+        return self.response_cache.put(key, body, self._revision_version(data))
+
+    @per_game
+    def get_orders_response(self, game_id: str):
+        """
+        The /orders response body for the current revision, encoded once per revision
+        """
+        data = self._get_game_data(game_id)
+        key = ("orders", game_id)
+        if data["revisions"] is not None:
+            encoded = self._cached_response(key, self._revision_version(data))
+            if encoded is not None:
+                return encoded
+        orders = self.get_orders(game_id)
+        # same shape as SuccessResponse
+        body = {"message": f"Orders for game: {game_id}", "data": {"orders": orders}}
+        return self.response_cache.put(key, body, self._revision_version(data))
+
+    @per_game
+    def get_game_response(self, game_id: str):
+        """
+        The /list/{game_id} response body, encoded again only when the players change (see _index_game)
+
+        Returns: response_cache.Encoded, or None for an unknown game
+        """
+        key = ("summary", game_id)
+        encoded = self._cached_response(key)
+        if encoded is not None:
+            return encoded
+        summary = self.get_game(game_id)
+        if summary is None:
+            return None
+        # same shape as GameSummaryResponse, which the single game lookup leaves status and open_seats out of
+        players = {player_id: {"power": player["power"], "name": player["name"]} for player_id, player in summary["players"].items()}
+        return self.response_cache.put(key, {**summary, "players": players, "status": None, "open_seats": None})
+
+    def _revision_version(self, data: dict):
+        # a new revision log (restart, rehydrated game) starts at revision 0 again
+        return data["revisions"].epoch, data["revisions"].revision
+
+    def _cached_response(self, key: tuple, version=None):
+        encoded = self.response_cache.get(key, version)
+        RESPONSES.inc("hit" if encoded is not None else "miss")
+        return encoded
+
+    @per_game
+    def get_phase_history(self, game_id: str):
+        """
+        Names of the resolved phases, oldest first
+        """
+        try:
+            history = self._get_phase_history(game_id)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True, "phases": list(history.phases)}
+
+    @per_game
+    def get_history_phase(self, game_id: str, phase: str):
+        """
+        The board at the start of a resolved phase, the orders played in it and their results.
+        Hibernated games aren't woken up once their history is built.
+
+        Returns: {"success", "phase", "index", "state", "orders", "results"}
+        """
+        try:
+            history = self._get_phase_history(game_id)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        entry = history.get(phase)
+        if entry is None:
+            return {"success": False, "error": f"Phase '{phase}' is not in the history of game '{game_id}'."}
+        return {"success": True, **entry}
+
+    def _get_phase_history(self, game_id: str):
+        """
+        Gets the game's phase history, building it from the engine's history on first use
+        """
+        data = self._get_game_data(game_id)
+        history = data.get("history")
+        if history is None:
+            history = data["history"] = PhaseHistory.from_game(self._get_game_object(game_id))
+        return history
     
     def render_game(self, game_id: str):
         """
-        Renders the game with the built in engine render
+        Renders the game with the built in engine render, straight to an SVG string.
+        Renders are cached until the board or the orders change.
         Probably not good enough for prod, but nice for MVP
         """
+        svg, _ = self.render_game_with_etag(game_id)
+        return svg
+    
+    @per_game
+    def render_game_with_etag(self, game_id: str):
+        """
+        Same as render_game, also returns the ETag of the render
+        
+        Returns: (svg, etag)
+        """
+        game = self._get_game_object(game_id)
+        key = board_key(game_id, game)
+        svg = self.render_cache.get(key)
+        RENDERS.inc("hit" if svg is not None else "miss")
+        if svg is None:
+            svg = game.render(incl_orders=True, incl_abbrev=False, output_format='svg')
+            self.render_cache.put(key, svg)
+        return svg, render_etag(key)
+    
+    @per_game
+    def prepare_render(self, game_id: str):
+        """
+        Looks the game up in the render cache. On a miss, also builds the payload
+        a render worker needs, so the render itself can happen off the event loop.
+        
+        Returns: (key, etag, cached svg or None, payload or None)
+        """
+        game = self._get_game_object(game_id)
+        key = board_key(game_id, game)
+        svg = self.render_cache.get(key)
+        RENDERS.inc("hit" if svg is not None else "miss")
+        payload = render_payload(game) if svg is None else None
+        return key, render_etag(key), svg, payload
+    
+    @per_game
+    def get_render_etag(self, game_id: str):
+        """
+        ETag the next render of this game would have, without rendering
+        """
         game = self._get_game_object(game_id)
-        output_path = f"/tmp/{game_id}.svg"
-        game.render(incl_orders=True, incl_abbrev=False, output_format='svg', output_path=output_path)
-        return output_path
+        return render_etag(board_key(game_id, game))
         
+    @per_game
     def save_game(self, game_id: str):
         """
-        Saves the game into the app/saves folder. 
-        TODO: Return values. 
+        Saves the game to the store and waits until it is on disk.
         """
-        # STUB
+        try:
+            self._get_game_data(game_id)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
         
+        if self.store is None:
+            return {"success": False, "error": "No game store configured."}
+        
+        self._save_game_to_db(game_id)
+        self.store.flush()
+        return {"success": True, "game_id": game_id}
+    
+    def load_games(self):
+        """
+        Restores every game from the store into memory. 
+        Returns the number of games loaded.
+        """
+        if self.store is None:
+            return 0
+        
+        loaded = 0
+        for game_id, meta, saved_game in self.store.load_all():
+            if game_id in self.games:
+                continue
+            data = {
+                "players": meta["players"],
+                "game_name": meta["game_name"],
+                "creator_id": meta["creator_id"],
+            }
+            if self.hibernation.has_room():
+                game = self._restore_game(saved_game, meta)
+                data.update({"game": game, "revisions": RevisionLog(game)})
+                self.games[game_id] = data
+                self.hibernation.touch(game_id)
+            else:
+                # past the memory budget, the rest stay hibernated until someone opens them
+                blob = freeze_saved_game(saved_game)
+                data.update({"blob": blob, "status": meta.get("status"), "revisions": None})
+                self.games[game_id] = data
+                self.hibernation.stored(game_id, len(blob), evicted=False)
+            self._index_game(game_id)
+            loaded += 1
+        return loaded
+    
+    def _restore_game(self, saved_game: dict, meta: dict):
+        """
+        Rebuilds a game object from the saved game format.
+        The saved format drops controllers and status, so they are put back from the game metadata.
+        """
+        return self._restore_meta(from_saved_game_format(saved_game), meta)
+    
+    def _restore_meta(self, game, meta: dict):
+        for player_id, player in meta["players"].items():
+            game.get_power(player["power"]).set_controlled(player_id)
+        if meta.get("status"):
+            game.set_status(meta["status"])
+        return game
+    
+    def _index_game(self, game_id: str):
+        data = self.games[game_id]
+        self.response_cache.discard(("summary", game_id))
+        self.index.update(
+            game_id,
+            data["creator_id"],
+            data["players"],
+            self._game_status(data),
+            len(DIPLOMACY_POWERS) - len(data["players"])
+        )
+    
+    def _game_meta(self, game_id: str):
+        """
+        Everything about a game that the engine's saved format doesn't keep
+        """
+        data = self.games[game_id]
+        return {
+            "players": {player_id: dict(player) for player_id, player in data["players"].items()},
+            "game_name": data["game_name"],
+            "creator_id": data["creator_id"],
+            "status": self._game_status(data)
+        }
+        
+    @per_game
     def _get_power_orders(self, game_id: str, power):
         """
         Gets all valid moves for a specific power 
@@ -281,19 +801,30 @@ class GameManager:
         
         Returns: A list of valid orders
         """
-        game = self._get_game_object(game_id)
-        valid_orders_dict = game.get_all_possible_orders()
-        power_units = game.get_units(power)
-        
-        # flatten orders dict into a set 
-        valid_order_set = set()
-        for loc_orders in valid_orders_dict.values():
-            valid_order_set.update(loc_orders)
-            
-        matching_orders = [order for order in valid_order_set if any(unit in order for unit in power_units)]
+        return self._get_order_index(game_id).power_orders(power)
+    
+    @per_game
+    def get_power_unit_orders(self, game_id: str, power):
+        """
+        Gets all valid moves for a specific power, grouped by unit
         
-        return matching_orders
+        Returns: dict of unit -> list of valid orders
+        """
+        return self._get_order_index(game_id).unit_orders(power)
+    
+    def _get_order_index(self, game_id: str):
+        """
+        Returns the legal order index for the current phase, building it on first use.
+        A phase change makes the cached index stale, so it is rebuilt then.
+        """
+        game = self._get_game_object(game_id)
+        index = self._order_indexes.get(game_id)
+        if index is None or index.phase != game.get_current_phase():
+            index = build_order_index(game)
+            self._order_indexes[game_id] = index
+        return index
     
+    @per_game
     def get_power_units(self, game_id: str, power):
         """
         Gets all units belonging to a power
@@ -304,6 +835,7 @@ class GameManager:
         power_units = game.get_units(power)
         return power_units
     
+    @per_game
     def get_build_orders(self, game_id: str, power):
         """
         Gets possible build orders for a power 
@@ -311,7 +843,7 @@ class GameManager:
         game = self._get_game_object(game_id)
         power_obj = game.get_power(power)
         
-        print(power_obj.adjust)
+        log.debug("adjustments", extra={"game_id": game_id, "power": power, "adjust": power_obj.adjust})
         
     
     def _remove_character(text, char):
@@ -324,6 +856,17 @@ class GameManager:
         return text.replace(char, "")
     
         
+    def _game_lock(self, game_id: str):
+        """
+        Gets the lock that serializes calls on a game, creating it on first use.
+        Locks are only kept while referenced, so lookups of unknown ids don't pile up locks.
+        """
+        lock = self._locks.get(game_id)
+        if lock is None:
+            with self._locks_lock:
+                lock = self._locks.setdefault(game_id, threading.RLock())
+        return lock
+    
     def _get_game_data(self, game_id: str):
         """
         Deprecated: moving to _get_game_object()
@@ -332,23 +875,111 @@ class GameManager:
             raise ValueError(f"Game '{game_id}' not found.")
         return self.games[game_id]
         
+    def _game_changed(self, game_id: str):
+        """
+        Called after every mutation of a game's board or orders. 
+        Bumps the revision and saves the game.
+        """
+        game = self._get_game_object(game_id)
+        revision = self.games[game_id]["revisions"].bump(game)
+        self._save_game_to_db(game_id)
+        return revision
+    
+    def add_listener(self, listener):
+        """
+        Registers listener(game_id, event, data), called on orders_submitted, phase_resolved and game_over.
+        Listeners run while the game is locked, so they must not block.
+        """
+        self.listeners.append(listener)
+        
+    def _publish(self, game_id: str, event: str, data: dict):
+        for listener in self.listeners:
+            try:
+                listener(game_id, event, data)
+            except Exception:
+                log.exception("event listener failed", extra={"game_id": game_id, "event": event})
+        
     def _save_game_to_db(self, game_id: str):
-        """ Placeholder for saving to DB. Will pickle and persist later. """
-        print(f"Game '{game_id}' would be saved here.")
+        """
+        Queues the game for saving. The store writes in the background, so this never waits on disk.
+        """
+        if self.store is None:
+            return
+        self.store.save(game_id, self._get_game_object(game_id), self._game_meta(game_id))
         
     def _get_game_object(self, game_id: str):
         """
-        Gets the game object for the game with relevant game_id
+        Gets the game object for the game with relevant game_id.
+        Hibernated games are rebuilt on the way.
         """
         if game_id not in self.games:
             raise ValueError(f"Game '{game_id}' not found.")
         data = self.games[game_id]
-        return data["game"]
+        game = data.get("game")
+        if game is None:
+            game = self._rehydrate(game_id)
+        self._mark_used(game_id)
+        return game
+    
+    def _mark_used(self, game_id: str):
+        """
+        Moves a game to the front of the LRU, and hibernates the idle end if over the memory budget
+        """
+        self.hibernation.touch(game_id)
+        if not self.hibernation.over_budget():
+            return
+        for idle_game_id in self.hibernation.idle_games():
+            if idle_game_id == game_id:
+                continue
+            lock = self._game_lock(idle_game_id)
+            # never wait on a game that's in use, it's just not idle
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                self._hibernate(idle_game_id)
+            finally:
+                lock.release()
+    
+    def _hibernate(self, game_id: str):
+        data = self.games[game_id]
+        game = data.get("game")
+        if game is None:
+            return
+        blob = freeze(game)
+        data["blob"] = blob
+        data["status"] = game.status  # for the lobby list, which doesn't wake games up
+        data["revisions"].compact()
+        del data["game"]
+        self._order_indexes.pop(game_id, None)
+        self.hibernation.stored(game_id, len(blob))
+    
+    def _rehydrate(self, game_id: str):
+        with self._game_lock(game_id):
+            data = self.games[game_id]
+            if data.get("game") is not None:
+                return data["game"]  # another thread got here first
+            start = time.perf_counter()
+            game = self._restore_meta(thaw(data["blob"]), {"players": data["players"], "status": data["status"]})
+            if data["revisions"] is None:
+                data["revisions"] = RevisionLog(game)
+            data["game"] = game
+            del data["blob"]
+            del data["status"]
+            self.hibernation.rehydrated(game_id, time.perf_counter() - start)
+            return game
+    
+    def _game_status(self, data: dict):
+        game = data.get("game")
+        return game.status if game is not None else data["status"]
+    
+    def get_hibernation_metrics(self):
+        return self.hibernation.get_metrics()
     
     # Maybe replace above with this? 
     # def get_game(self, game_id: str) -> Game:
     #     return self._get_game_data(game_id)["game"]
     
+    @per_game
     def get_unassigned_powers(self, game_id: str) -> list:
         """
         Returns a list of powers that do not have an assigned player
@@ -357,21 +988,16 @@ class GameManager:
         assigned_powers = set(player["power"] for player in data["players"].values())
         return [power for power in DIPLOMACY_POWERS if power not in assigned_powers]
     
+    @per_game
     def _create_bot_orders(self, game_id: str):
         """
-        Loops over dummy powers, gets a valid order for each power, and submits it. 
-        
-        Not perfect, skips a lot of units.. but good for now
+        Submits an order for every unit of every dummy power, picked by the bot policy
         """
         dummy_powers = self.get_unassigned_powers(game_id)
         game = self._get_game_object(game_id)
-        for power in dummy_powers:
-            possible_orders = self._get_power_orders(game_id, power)
-            if not possible_orders:
-                print(f"No valid orders for {power}")
-                continue
-            
-            chosen_order = random.choice(possible_orders)
-            print(f"Chosen random order {chosen_order} for dummy power: {power}")
-            
-            game.set_orders(power, chosen_order, expand=False, replace=True)
\ No newline at end of file
+        bot_orders = self.bots.create_orders(game, self._get_order_index(game_id), dummy_powers)
+        for power, orders in bot_orders.items():
+            game.set_orders(power, orders, expand=False, replace=True)
+        log.debug("bot orders submitted", extra={"game_id": game_id, "powers": len(bot_orders), "policy": self.bots.policy.name})
+        
+        self._game_changed(game_id)
\ No newline at end of file
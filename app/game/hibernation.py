@@ -0,0 +1,105 @@
+# Idle game hibernation
+#
+# Game objects are heavy (map caches, every phase's orders, results and messages) and
+# most games sit idle between phases. Only the most recently used games stay resident,
+# the others are kept as a compressed snapshot (see snapshot.py) and rebuilt when next touched.
+
+import threading
+from collections import OrderedDict, deque
+from diplomacy.engine.game import Game
+from .snapshot import encode_game, encode_saved_game, decode_game
+
+MAX_RESIDENT = 1000  # default budget, in games
+
+
+def freeze(game: Game):
+    """
+    Serializes a game to a compressed snapshot, WAIVE/VOID orders and engine fields included
+    """
+    return encode_game(game)
+
+
+def freeze_saved_game(saved_game: dict):
+    """
+    Blob for a game that is only available in the saved format (e.g. straight from the store)
+    """
+    return encode_saved_game(saved_game)
+
+
+def thaw(blob: bytes):
+    """
+    Rebuilds the game from a blob. Controllers and status aren't in it, see GameManager._restore_game.
+    """
+    return decode_game(blob)
+
+
+class Hibernation:
+    def __init__(self, max_resident: int = None):
+        """
+        max_resident: how many games stay in memory, None never hibernates anything
+        """
+        self.max_resident = max_resident
+        self.evictions = 0
+        self.rehydrations = 0
+        self.blob_bytes = 0
+        self._resident = OrderedDict()  # game_id -> None, least recently used first
+        self._blob_sizes = {}  # game_id -> size of its blob, for hibernated games
+        self._latencies = deque(maxlen=1024)  # recent rehydration times in seconds
+        self._lock = threading.Lock()
+
+    def touch(self, game_id: str):
+        """
+        Marks a resident game as just used
+        """
+        with self._lock:
+            self._resident[game_id] = None
+            self._resident.move_to_end(game_id)
+
+    def has_room(self):
+        return self.max_resident is None or len(self._resident) < self.max_resident
+
+    def over_budget(self):
+        return self.max_resident is not None and len(self._resident) > self.max_resident
+
+    def idle_games(self):
+        """
+        The least recently used games beyond the budget, oldest first
+        """
+        with self._lock:
+            excess = len(self._resident) - self.max_resident
+            return [game_id for game_id, _ in zip(self._resident, range(excess))]
+
+    def stored(self, game_id: str, blob_size: int, evicted: bool = True):
+        """
+        Records a game going into a blob, evicted=False for games that were never resident
+        """
+        with self._lock:
+            self._resident.pop(game_id, None)
+            self._blob_sizes[game_id] = blob_size
+            self.blob_bytes += blob_size
+            if evicted:
+                self.evictions += 1
+
+    def rehydrated(self, game_id: str, seconds: float):
+        with self._lock:
+            self.blob_bytes -= self._blob_sizes.pop(game_id, 0)
+            self.rehydrations += 1
+            self._latencies.append(seconds)
+
+    def get_metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = {
+                "max_resident": self.max_resident,
+                "resident": len(self._resident),
+                "hibernated": len(self._blob_sizes),
+                "blob_bytes": self.blob_bytes,
+                "evictions": self.evictions,
+                "rehydrations": self.rehydrations,
+            }
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e3, 3) if latencies else 0.0
+
+        metrics["rehydrate_ms"] = {"p50": pct(50), "p99": pct(99), "max": pct(100)}
+        return metrics
@@ -20,6 +20,11 @@ class SubmitOrdersRequest(BaseModel):
     player_id: str
     orders: List[str]
     
+class ForkGameRequest(BaseModel):
+    creator_id: str
+    game_name: Optional[str] = None
+    keep_players: bool = False
+
 class GetOrdersRequest(BaseModel):
     game_id: str
     
@@ -39,6 +44,7 @@ class SuccessResponse(BaseModel):
 class GameStateResponse(BaseModel):
     game_id: str
     state: Dict
+    revision: Optional[int] = None
     
 class GameRender(BaseModel):
     game_id: str
@@ -58,4 +64,6 @@ class GameSummaryResponse(BaseModel):
     game_id: str
     players: Dict[str, PlayerInfo]
     game_name: str
-    creator_id: str
\ No newline at end of file
+    creator_id: str
+    status: Optional[str] = None
+    open_seats: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,71 @@
+# Per-phase index of legal orders, grouped by power and unit
+#
+# Building it means running the engine's full move generation, so the game manager
+# builds it once per (game, phase) and serves every valid-orders request from it.
+
+from diplomacy.engine.game import Game
+from .validation import OrderValidator
+
+
+class OrderIndex:
+    def __init__(self, phase: str, by_unit: dict, adjustments: dict = None):
+        self.phase = phase
+        self.by_unit = by_unit  # power -> unit (or build location) -> list of legal orders
+        self.adjustments = adjustments or {}  # power -> builds (> 0) or disbands (< 0) due, adjustment phases only
+        self.orders = {
+            power: [order for unit_orders in units.values() for order in unit_orders]
+            for power, units in by_unit.items()
+        }
+        self._validators = {}  # power -> OrderValidator, compiled on first use
+
+    def power_orders(self, power: str):
+        """
+        Flat list of legal orders for a power, empty for unknown powers
+        """
+        return self.orders.get(power, [])
+
+    def unit_orders(self, power: str):
+        """
+        Legal orders for a power grouped by unit. Shared with the cache, don't mutate.
+        """
+        return self.by_unit.get(power, {})
+
+    def validator(self, power: str):
+        """
+        Validator for a power's orders this phase
+        """
+        validator = self._validators.get(power)
+        if validator is None:
+            validator = self._validators[power] = OrderValidator(
+                power, self.phase, self.unit_orders(power), self.adjustments.get(power)
+            )
+        return validator
+
+
+def build_order_index(game: Game):
+    """
+    Runs the engine's move generation once and groups the result by power and unit.
+    Locations are matched on the 3 letter province so coasted fleets (F STP/SC) are found.
+    Locations without a unit (builds during adjustments) are keyed by location.
+    """
+    possible_orders = game.get_all_possible_orders()
+    by_unit = {}
+    adjustments = {}
+
+    for power_name, locs in game.get_orderable_locations().items():
+        power = game.get_power(power_name)
+        units_by_loc = {unit[2:5]: unit for unit in power.units}
+        # dislodged units are the ones that get orders during retreats
+        units_by_loc.update({unit[2:5]: unit for unit in power.retreats})
+
+        power_orders = {}
+        for loc in locs:
+            orders = possible_orders.get(loc)
+            if not orders:
+                continue
+            power_orders[units_by_loc.get(loc[:3], loc)] = sorted(orders)
+        by_unit[power_name] = power_orders
+        if game.phase_type == "A":
+            adjustments[power_name] = len(power.centers) - len(power.units)
+
+    return OrderIndex(game.get_current_phase(), by_unit, adjustments)
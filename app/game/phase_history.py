@@ -0,0 +1,179 @@
+# History of a game's resolved phases, for scrubbing back through a game
+#
+# Every resolved phase keeps its board (the engine's state at the start of the phase),
+# the orders that were played and their results. Boards are stored as a keyframe every
+# KEYFRAME_INTERVAL phases and as the fields that changed since the previous phase in
+# between, so rebuilding any phase applies at most KEYFRAME_INTERVAL - 1 deltas to a
+# keyframe. Once a keyframe's segment is full it is packed into one compressed snapshot
+# blob (see snapshot.py), only the segment being filled stays as plain objects.
+#
+# The history is kept apart from the engine, so it answers without waking hibernated games.
+
+import threading
+from collections import OrderedDict
+from diplomacy.engine.game import Game
+from .snapshot import dumps, loads
+
+KEYFRAME_INTERVAL = 8  # phases per segment, the first one of each is a keyframe
+SEGMENT_CACHE = 64  # decoded segments kept, across all games, for scrubbing back and forth
+
+_KEY, _DELTA = "key", "delta"
+
+# (history id, segment) -> decoded entries
+_segments = OrderedDict()
+_segments_lock = threading.Lock()
+_next_id = 0
+
+
+def _state_delta(old: dict, new: dict):
+    """
+    The fields of new that differ from old, per power for the per-power fields.
+    Returns None if a field or a power was dropped, the state is then stored whole.
+    """
+    if old.keys() - new.keys():
+        return None
+    fields, powers = {}, {}
+    for key, value in new.items():
+        before = old.get(key)
+        if value == before:
+            continue
+        if isinstance(value, dict) and isinstance(before, dict):
+            if before.keys() - value.keys():
+                return None
+            powers[key] = {power: v for power, v in value.items() if before.get(power) != v}
+        else:
+            fields[key] = value
+    return {"fields": fields, "powers": powers}
+
+
+def _apply_delta(state: dict, delta: dict):
+    state = dict(state)
+    state.update(delta["fields"])
+    for key, changed in delta["powers"].items():
+        state[key] = {**state[key], **changed}
+    return state
+
+
+class PhaseHistory:
+    def __init__(self, interval: int = KEYFRAME_INTERVAL):
+        self.interval = interval
+        self._clear()
+
+    def _clear(self):
+        global _next_id
+        with _segments_lock:
+            _next_id += 1
+            self._id = _next_id  # a new id, so cached segments of what was cleared aren't used
+        self.phases = []  # phase names, oldest first
+        self._index = {}  # phase name -> position in phases
+        self._sealed = []  # packed segments, interval entries each
+        self._open = []  # entries of the segment being filled
+        self._last_state = None  # board of the latest phase, what the next delta is against
+
+    @classmethod
+    def from_game(cls, game: Game, interval: int = KEYFRAME_INTERVAL):
+        """
+        History of every phase the game already went through, e.g. for a game restored from the store
+        """
+        history = cls(interval)
+        history.sync(game)
+        return history
+
+    def fork(self):
+        """
+        A history with the same phases for a forked game. The packed segments and recorded
+        entries are shared, phases the fork resolves later only go into the fork's.
+        """
+        fork = PhaseHistory(self.interval)
+        fork.phases = list(self.phases)
+        fork._index = dict(self._index)
+        fork._sealed = list(self._sealed)
+        fork._open = list(self._open)
+        fork._last_state = self._last_state
+        return fork
+
+    def __len__(self):
+        return len(self.phases)
+
+    def __contains__(self, phase: str):
+        return phase in self._index
+
+    def sync(self, game: Game):
+        """
+        Records the phases the engine resolved since the last sync
+        """
+        new_phases = []
+        key = game.state_history.last_key() if game.state_history else None
+        latest = self.phases[-1] if self.phases else None
+        # walk back from the engine's latest phase to the last one recorded, usually one step
+        while key is not None and str(key) != latest:
+            new_phases.append(key)
+            key = game.state_history.get_previous_key(key)
+        if key is None and latest is not None:
+            # the engine's history doesn't go through our last phase, start over from it
+            self._clear()
+        for key in reversed(new_phases):
+            self._record(
+                str(key),
+                game.state_history[key],
+                game.order_history.get(key, {}),
+                game.result_history.get(key, {}),
+            )
+
+    def _record(self, phase: str, state: dict, orders: dict, results: dict):
+        orders = {power: list(power_orders) for power, power_orders in orders.items()}
+        results = {unit: [str(result) for result in unit_results] for unit, unit_results in results.items()}
+        delta = None
+        if self._open:
+            delta = _state_delta(self._last_state, state)
+        if delta is None:
+            entry = [phase, _KEY, dict(state), orders, results]
+        else:
+            entry = [phase, _DELTA, delta, orders, results]
+
+        self._index[phase] = len(self.phases)
+        self.phases.append(phase)
+        self._open.append(entry)
+        self._last_state = state
+        if len(self._open) == self.interval:
+            self._sealed.append(dumps(self._open))
+            self._open = []
+
+    def _segment(self, segment: int):
+        if segment == len(self._sealed):
+            return self._open
+        key = (self._id, segment)
+        with _segments_lock:
+            entries = _segments.get(key)
+            if entries is not None:
+                _segments.move_to_end(key)
+                return entries
+        entries = loads(self._sealed[segment])
+        with _segments_lock:
+            _segments[key] = entries
+            if len(_segments) > SEGMENT_CACHE:
+                _segments.popitem(last=False)
+        return entries
+
+    def get(self, phase: str):
+        """
+        The board, orders and results of a past phase, or None if it isn't in the history.
+        The returned values are shared with the history, don't modify them.
+        """
+        position = self._index.get(phase)
+        if position is None:
+            return None
+        segment, offset = divmod(position, self.interval)
+        entries = self._segment(segment)
+
+        state = None
+        for _, kind, value, _, _ in entries[:offset + 1]:
+            state = value if kind == _KEY else _apply_delta(state, value)
+        name, _, _, orders, results = entries[offset]
+        return {"phase": name, "index": position, "state": state, "orders": orders, "results": results}
+
+    def size(self):
+        """
+        Bytes of the packed segments, the open segment isn't counted
+        """
+        return sum(len(blob) for blob in self._sealed)
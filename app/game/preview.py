@@ -0,0 +1,68 @@
+# Adjudication previews: what would happen if the phase resolved right now
+#
+# The current board and orders are processed on a scratch copy without history (see
+# adjudication.scratch_game), the live game is never touched. Previews are cached by
+# fingerprint.board_key, so every player looking at the same board and the same set of
+# orders gets the one adjudication.
+
+import threading
+from collections import OrderedDict
+from diplomacy.engine.game import Game
+
+MAX_ENTRIES = 1024
+
+
+def summarize(game: Game, phase: str, processed):
+    """
+    What a scratch game looks like after processing a phase.
+    processed: the GamePhaseData returned by game.process()
+    """
+    state = game.get_state()
+    results = {unit: [str(result) for result in unit_results] for unit, unit_results in processed.results.items()}
+    dislodged = [
+        {"unit": unit, "power": power, "retreats": list(retreats)}
+        for power, power_retreats in state["retreats"].items()
+        for unit, retreats in power_retreats.items()
+    ]
+    return {
+        "phase": phase,
+        "next_phase": game.get_current_phase(),
+        "orders": processed.orders,
+        "results": results,
+        "bounces": sorted(unit for unit, unit_results in results.items() if "bounce" in unit_results),
+        "dislodged": dislodged,
+        "units": {power: [unit for unit in units if unit[0] != "*"] for power, units in state["units"].items()},
+        "centers": state["centers"],
+    }
+
+
+class PreviewCache:
+    """
+    LRU of preview results by board key
+    """
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> preview
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            preview = self._entries.get(key)
+            if preview is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return preview
+
+    def put(self, key: tuple, preview: dict):
+        with self._lock:
+            self._entries[key] = preview
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
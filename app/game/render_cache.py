@@ -0,0 +1,55 @@
+# LRU cache of rendered SVGs, bounded by total size
+#
+# Keys come from fingerprint.board_key so a game is only rendered again once its
+# board or its orders actually changed.
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def render_etag(key: tuple):
+    """
+    ETag for a render key, quoted as the header expects
+    """
+    return '"' + hashlib.sha1("|".join(key).encode()).hexdigest()[:20] + '"'
+
+
+class RenderCache:
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> svg
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            svg = self._entries.get(key)
+            if svg is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return svg
+
+    def put(self, key: tuple, svg: str):
+        if len(svg) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = svg
+            self.size += len(svg)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
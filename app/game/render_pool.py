@@ -0,0 +1,133 @@
+# Runs the engine's SVG renderer in a pool of worker processes
+#
+# Rendering is slow synchronous pure python, running it on the event loop stalls
+# every other request. Workers get a small payload (state + orders), rebuild the
+# board on their side and send back the SVG bytes.
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from diplomacy.engine.game import Game
+
+MAX_QUEUE = 64  # renders allowed to wait for a free worker
+RENDER_TIMEOUT = 10.0  # seconds a caller waits for one render
+
+
+class RenderPoolFull(Exception):
+    pass
+
+
+def render_payload(game: Game):
+    """
+    Everything a worker needs to redraw the board of a game
+    """
+    return {
+        "map_name": game.map_name,
+        "rules": list(game.rules),
+        "state": game.get_state(),
+        "orders": game.get_orders(),
+    }
+
+
+def render_from_payload(payload: dict):
+    """
+    Rebuilds the board from a render payload and renders it.
+    Runs inside the worker processes.
+
+    Returns: the SVG as utf-8 bytes
+    """
+    game = Game(map_name=payload["map_name"], rules=payload["rules"])
+    game.set_state(payload["state"])
+    for power, orders in payload["orders"].items():
+        if orders:
+            game.set_orders(power, orders, expand=False)
+    svg = game.render(incl_orders=True, incl_abbrev=False, output_format='svg')
+    return svg.encode("utf-8")
+
+
+def _warm_up():
+    # loads and caches the standard map so the first render doesn't pay for it
+    Game()
+
+
+class RenderPool:
+    def __init__(self, workers: int = None, max_queue: int = MAX_QUEUE, timeout: float = RENDER_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+
+        self.in_flight = 0  # queued + running
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._render_times = deque(maxlen=1024)
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn, not fork: the api process has threads (store writer, threadpool) that fork would copy mid-state
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up,
+            )
+        return self._executor
+
+    @property
+    def queue_depth(self):
+        return max(self.in_flight - self.workers, 0)
+
+    async def render(self, payload: dict):
+        """
+        Renders a payload on a worker and returns the SVG bytes.
+
+        Raises RenderPoolFull when too many renders are already waiting,
+        and asyncio.TimeoutError when the render takes longer than the timeout.
+        A timed out render keeps running on its worker, only the caller stops waiting.
+        """
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise RenderPoolFull(f"Render queue is full ({self.max_queue} waiting).")
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            future = loop.run_in_executor(self._get_executor(), render_from_payload, payload)
+            svg = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self._render_times.append(time.perf_counter() - start)
+        return svg
+
+    def get_metrics(self):
+        times = sorted(self._render_times)
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "render_ms_p50": times[len(times) // 2] * 1000 if times else None,
+            "render_ms_p99": times[int(len(times) * 0.99)] * 1000 if times else None,
+            "render_ms_max": times[-1] * 1000 if times else None,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
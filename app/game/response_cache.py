@@ -0,0 +1,140 @@
+# Encoded JSON responses, kept as bytes until the game changes
+#
+# Polling clients ask for the same state, orders and lobby entry over and over, and
+# building the pydantic model and JSON-encoding the nested dicts costs more than the
+# lookup behind it. Bodies are encoded once per game revision (see revisions.py) and
+# served as they are, with gzip/brotli variants compressed on first request.
+
+import gzip
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:  # optional, the standard json module does the same, slower
+    orjson = None
+    import json
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip is offered without it
+    brotli = None
+
+MAX_BYTES = 32 * 1024 * 1024
+MIN_COMPRESS = 1024  # smaller bodies aren't worth compressing
+
+
+def dump_json(value):
+    """
+    Compact UTF-8 JSON, the same bytes FastAPI's JSONResponse would send
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def parse_accept_encoding(header: str):
+    """
+    The codings of an Accept-Encoding header and their q-values, e.g. "gzip;q=0.5, br" -> {"gzip": 0.5, "br": 1.0}
+    """
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class Encoded:
+    """
+    A response body and its compressed variants, made on first use
+    """
+    def __init__(self, body: bytes, version=None):
+        self.body = body
+        self.version = version  # what the body was encoded from, e.g. the game's revision
+        self._variants = {}  # encoding -> compressed body
+
+    def variant(self, accept_encoding: str):
+        """
+        Picks the best encoding the client accepts.
+        Returns: (content encoding or None, body)
+        """
+        if len(self.body) < MIN_COMPRESS or not accept_encoding:
+            return None, self.body
+        accepted = parse_accept_encoding(accept_encoding)
+        offered = ("br", "gzip") if brotli is not None else ("gzip",)
+        # highest q wins, br over gzip on a tie
+        weights = {encoding: accepted.get(encoding, accepted.get("*", 0)) for encoding in offered}
+        encoding = max(offered, key=lambda encoding: weights[encoding])
+        if weights[encoding] <= 0:
+            return None, self.body
+        body = self._variants.get(encoding)
+        if body is None:
+            body = brotli.compress(self.body, quality=5) if encoding == "br" else gzip.compress(self.body, 6)
+            self._variants[encoding] = body
+        return encoding, body
+
+
+class ResponseCache:
+    """
+    LRU of encoded responses, bounded by the size of the uncompressed bodies.
+    One entry per key, e.g. ("state", game_id), tagged with the version it was encoded at.
+    """
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> Encoded
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, version=None):
+        """
+        The cached response for key, or None if there is none for this version
+        """
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is None or encoded.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return encoded
+
+    def put(self, key: tuple, value, version=None) -> Encoded:
+        """
+        Encodes value and keeps it in place of older versions, returns the Encoded
+        """
+        encoded = Encoded(dump_json(value), version)
+        if len(encoded.body) > self.max_bytes:
+            return encoded
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = encoded
+            self.size += len(encoded.body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.body)
+        return encoded
+
+    def discard(self, key: tuple):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: tuple):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old.body)
+
+    def __len__(self):
+        return len(self._entries)
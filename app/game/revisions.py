@@ -0,0 +1,94 @@
+# Revision log of a game's board
+#
+# Every mutation (orders submitted, phase resolved) bumps the game's revision and keeps
+# a small snapshot of the board. Pollers send the last revision they saw and only get
+# back what changed since then.
+#
+# Revisions start at 0 again in a new process (and for games restored from the store),
+# so revision numbers alone can't tell two boards apart. Every log has a random epoch
+# that pollers send back with their revision, a different epoch gets the full state.
+
+import secrets
+from collections import deque
+from diplomacy.engine.game import Game
+
+HISTORY = 64  # revisions kept per game, older ones get the full state
+
+
+def board_snapshot(game: Game):
+    """
+    The parts of the board that pollers care about: phase, units, centers and orders
+    """
+    return {
+        "phase": game.get_current_phase(),
+        "units": {
+            power.name: list(power.units) + ["*" + unit for unit in power.retreats]
+            for power in game.powers.values()
+        },
+        "centers": {power.name: list(power.centers) for power in game.powers.values()},
+        "orders": game.get_orders(),
+    }
+
+
+def _diff_sets(old: dict, new: dict):
+    changes = {}
+    for power in new.keys() | old.keys():
+        before, after = set(old.get(power, ())), set(new.get(power, ()))
+        if before != after:
+            changes[power] = {"added": sorted(after - before), "removed": sorted(before - after)}
+    return changes
+
+
+def diff_snapshots(old: dict, new: dict):
+    """
+    What changed between two board snapshots. Empty when nothing did.
+    """
+    changes = {}
+    if old["phase"] != new["phase"]:
+        changes["phase"] = new["phase"]
+    units = _diff_sets(old["units"], new["units"])
+    if units:
+        changes["units"] = units
+    centers = _diff_sets(old["centers"], new["centers"])
+    if centers:
+        changes["centers"] = centers
+    orders = {power: orders for power, orders in new["orders"].items() if old["orders"].get(power) != orders}
+    if orders:
+        changes["orders"] = orders
+    return changes
+
+
+class RevisionLog:
+    def __init__(self, game: Game, size: int = HISTORY):
+        self.revision = 0
+        self.epoch = secrets.token_hex(4)
+        self._snapshots = deque([(0, board_snapshot(game))], maxlen=size)
+
+    def bump(self, game: Game):
+        """
+        Records a new revision of the board
+        """
+        self.revision += 1
+        self._snapshots.append((self.revision, board_snapshot(game)))
+        return self.revision
+
+    def compact(self):
+        """
+        Drops every snapshot but the latest, older revisions then get the full state
+        """
+        self._snapshots = deque([self._snapshots[-1]], maxlen=self._snapshots.maxlen)
+
+    def changes_since(self, revision: int, epoch: str = None):
+        """
+        What changed since the given revision of the given epoch.
+        Returns None if that revision is unknown (too old, or from another epoch, e.g. before a restart).
+        """
+        if epoch != self.epoch:
+            return None
+        if revision == self.revision:
+            return {}
+        oldest = self._snapshots[0][0]
+        if revision < oldest or revision > self.revision:
+            return None
+        old = self._snapshots[revision - oldest][1]
+        return diff_snapshots(old, self._snapshots[-1][1])
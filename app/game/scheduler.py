@@ -1 +1,128 @@
-# PLACEHOLDER: APScheduler or Celery-based background runner
\ No newline at end of file
+# Single-threaded phase scheduler
+#
+# Keeps every game's next deadline in one heap and sleeps until the earliest one
+# is due, instead of running a sleeping thread per game. Due games are handed to a
+# small worker pool so one slow phase resolution doesn't delay the others.
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+WORKERS = 4
+
+
+class PhaseScheduler:
+    def __init__(self, callback, workers: int = WORKERS, batch_callback=None):
+        """
+        callback(game_id) is called on a worker thread every time a game's deadline is due.
+        If batch_callback is given, it's called instead with the list of all games due at once.
+        """
+        self.callback = callback
+        self.batch_callback = batch_callback
+        self.fired = 0
+
+        self._heap = []  # (deadline, seq, game_id), cancelled entries are skipped lazily
+        self._entries = {}  # game_id -> seq of its live heap entry
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phase-scheduler")
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="phase-scheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, game_id: str, delay: float):
+        """
+        Fires the callback for a game after delay seconds, replacing any deadline it already had
+        """
+        deadline = time.monotonic() + delay
+        with self._cond:
+            seq = next(self._seq)
+            self._entries[game_id] = seq
+            heapq.heappush(self._heap, (deadline, seq, game_id))
+            # only wake the timer thread if this is the new earliest deadline
+            if self._heap[0][1] == seq:
+                self._cond.notify()
+
+    def cancel(self, game_id: str):
+        """
+        Drops a game's deadline. Takes effect immediately, returns False if nothing was scheduled.
+        """
+        with self._cond:
+            return self._entries.pop(game_id, None) is not None
+
+    def next_deadline(self, game_id: str):
+        """
+        Seconds until the game is due, or None if it isn't scheduled
+        """
+        with self._cond:
+            seq = self._entries.get(game_id)
+            if seq is None:
+                return None
+            for deadline, entry_seq, _ in self._heap:
+                if entry_seq == seq:
+                    return max(deadline - time.monotonic(), 0.0)
+        return None
+
+    def __contains__(self, game_id: str):
+        return game_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def shutdown(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self):
+        while True:
+            due = []
+            with self._cond:
+                while self._running and not due:
+                    self._drop_cancelled()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait > 0:
+                        self._cond.wait(wait)
+                        continue
+                    now = time.monotonic()
+                    while self._heap and self._heap[0][0] <= now:
+                        _, seq, game_id = heapq.heappop(self._heap)
+                        if self._entries.get(game_id) == seq:
+                            del self._entries[game_id]
+                            due.append(game_id)
+                if not self._running:
+                    return
+
+            self.fired += len(due)
+            if self.batch_callback is not None:
+                self._executor.submit(self._fire_batch, due)
+                continue
+            for game_id in due:
+                self._executor.submit(self._fire, game_id)
+
+    def _drop_cancelled(self):
+        heap = self._heap
+        while heap and self._entries.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def _fire(self, game_id: str):
+        try:
+            self.callback(game_id)
+        except Exception:
+            log.exception("scheduled callback failed", extra={"game_id": game_id})
+
+    def _fire_batch(self, game_ids):
+        try:
+            self.batch_callback(game_ids)
+        except Exception:
+            log.exception("scheduled batch failed", extra={"games": len(game_ids)})
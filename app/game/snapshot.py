@@ -0,0 +1,347 @@
+# Compact binary snapshots of games
+#
+# The saved-game format repeats the same few hundred strings (locations, units, orders,
+# power names) in every phase, and every phase repeats the whole board. A snapshot
+# writes each distinct string once in a table and refers to it by index, and only keeps
+# the state fields that changed since the previous phase. The rest is a small tagged
+# binary encoding of the same structure.
+#
+# Games are read from and rebuilt into the engine's history containers directly,
+# going through GamePhaseData (to_saved_game_format / from_saved_game_format) validates
+# every field of every phase and costs far more than the encoding itself. Snapshots
+# also carry what the saved format drops (WAIVE/VOID orders, the engine's between-phase
+# fields), so a game comes back exactly as it was.
+#
+# Layout: magic, version, compression, then the (possibly compressed) body:
+# string ref width, string count, strings (varint length + utf-8), every string ref in
+# the order they're used (fixed width), then the tags, counts and numbers of the value.
+
+import struct
+import zlib
+from diplomacy.engine.game import Game
+from diplomacy.engine.message import Message
+from diplomacy.utils.common import StringableCode
+from diplomacy.utils.export import RULES_TO_SKIP, from_saved_game_format
+from diplomacy.utils.sorted_dict import SortedDict
+from .adjudication import power_orders, set_power_orders, engine_fields, set_engine_fields, extend_sorted
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+MAGIC = b"DSNP"
+VERSION = 1
+
+NONE, ZLIB, ZSTD = 0, 1, 2
+COMPRESSION = {"none": NONE, "zlib": ZLIB, "zstd": ZSTD}
+
+# value tags
+_NULL, _FALSE, _TRUE, _INT, _NEG, _FLOAT, _STR, _LIST, _DICT, _STRS = range(10)
+_DOUBLE = struct.Struct("<d")
+_REF_FORMATS = {1: "B", 2: "H", 4: "I"}  # width of a string ref -> struct format
+
+# what decoding a truncated or corrupt body runs into: reading past the end, a string ref
+# past the table or the refs, a list as a dict key, a broken utf-8 string or compressed stream
+_CORRUPT = (IndexError, StopIteration, TypeError, struct.error, UnicodeDecodeError, zlib.error)
+if zstandard is not None:
+    _CORRUPT += (zstandard.ZstdError,)
+
+_SAME = object()  # history state field unchanged since the previous phase
+_FULL = "__full__"  # marks a history state that doesn't build on the previous one
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+# === Codec ===
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode(value):
+    """
+    Body for a value: string table, string refs, then the structure
+    """
+    strings = {}  # string -> index
+    refs = []  # string refs, in order, packed once the width is known
+    out = bytearray()  # tags, counts and numbers
+
+    def ref(string: str):
+        index = strings.get(string)
+        if index is None:
+            index = strings[string] = len(strings)
+        return index
+
+    def encode(value):
+        # str, dict and list first, they are nearly everything. bool before int, bool is an int
+        kind = type(value)
+        if kind is str:
+            out.append(_STR)
+            refs.append(ref(value))
+        elif kind is dict:
+            out.append(_DICT)
+            _write_varint(out, len(value))
+            for key, item in value.items():
+                if type(key) is str:
+                    out.append(_STR)
+                    refs.append(ref(key))
+                else:
+                    encode(key)
+                if type(item) is str:
+                    out.append(_STR)
+                    refs.append(ref(item))
+                else:
+                    encode(item)
+        elif kind is list or kind is tuple:
+            if value and all(type(item) is str for item in value):
+                # units, centers, orders: one run of string refs
+                out.append(_STRS)
+                _write_varint(out, len(value))
+                refs.extend([ref(item) for item in value])
+            else:
+                out.append(_LIST)
+                _write_varint(out, len(value))
+                for item in value:
+                    encode(item)
+        elif value is None:
+            out.append(_NULL)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, int):
+            out.append(_INT if value >= 0 else _NEG)
+            _write_varint(out, abs(value))
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out.extend(_DOUBLE.pack(value))
+        elif isinstance(value, str):
+            encode(str(value))
+        elif isinstance(value, dict):
+            encode(dict(value))
+        elif isinstance(value, (list, tuple)):
+            encode(list(value))
+        else:
+            raise SnapshotError(f"Can't encode {type(value).__name__} in a snapshot")
+
+    encode(value)
+
+    count = len(strings)
+    width = 1 if count <= 0xFF else 2 if count <= 0xFFFF else 4
+    body = bytearray((width,))
+    _write_varint(body, count)
+    for string in strings:  # dicts keep insertion order, so this is index order
+        raw = string.encode("utf-8")
+        _write_varint(body, len(raw))
+        body += raw
+    _write_varint(body, len(refs))
+    body += struct.pack(f"<{len(refs)}{_REF_FORMATS[width]}", *refs)
+    body += out
+    return body
+
+
+def _decode(body: bytes):
+    width = body[0]
+    pos = 1
+
+    def varint():
+        nonlocal pos
+        byte = body[pos]
+        pos += 1
+        if byte < 0x80:
+            return byte
+        value, shift = byte & 0x7F, 7
+        while True:
+            byte = body[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    strings = []
+    for _ in range(varint()):
+        length = varint()
+        strings.append(body[pos:pos + length].decode("utf-8"))
+        pos += length
+
+    count = varint()
+    fmt = _REF_FORMATS.get(width)
+    if fmt is None:
+        raise SnapshotError(f"Invalid string ref width {width}")
+    refs = iter([strings[index] for index in struct.unpack_from(f"<{count}{fmt}", body, pos)])
+    pos += count * width
+    next_string = refs.__next__
+
+    def value():
+        nonlocal pos
+        tag = body[pos]
+        pos += 1
+        if tag == _STR:
+            return next_string()
+        if tag == _STRS:
+            return [next_string() for _ in range(varint())]
+        if tag == _DICT:
+            result = {}
+            for _ in range(varint()):
+                key = value()
+                result[key] = value()
+            return result
+        if tag == _LIST:
+            return [value() for _ in range(varint())]
+        if tag == _NULL:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            return varint()
+        if tag == _NEG:
+            return -varint()
+        if tag == _FLOAT:
+            result = _DOUBLE.unpack_from(body, pos)[0]
+            pos += _DOUBLE.size
+            return result
+        raise SnapshotError(f"Unknown tag {tag} at byte {pos - 1}")
+
+    return value()
+
+
+def dumps(value, compression: str = "zlib"):
+    """
+    Encodes a JSON-like value (dicts, lists, strings, numbers, bools, None).
+    compression: "none", "zlib" or "zstd" (needs the zstandard package)
+    """
+    if compression not in COMPRESSION:
+        raise SnapshotError(f"Unknown compression '{compression}'")
+    if compression == "zstd" and zstandard is None:
+        raise SnapshotError("zstd compression needs the zstandard package")
+
+    body = _encode(value)
+    if compression == "zlib":
+        body = zlib.compress(body)
+    elif compression == "zstd":
+        body = zstandard.ZstdCompressor().compress(bytes(body))
+    return MAGIC + bytes((VERSION, COMPRESSION[compression])) + bytes(body)
+
+
+def loads(blob: bytes):
+    """
+    Decodes a value written by dumps()
+    """
+    if blob[:len(MAGIC)] != MAGIC or len(blob) < len(MAGIC) + 2:
+        raise SnapshotError("Not a game snapshot")
+    version, compression = blob[len(MAGIC)], blob[len(MAGIC) + 1]
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    if compression == ZSTD and zstandard is None:
+        raise SnapshotError("zstd compression needs the zstandard package")
+    if compression not in COMPRESSION.values():
+        raise SnapshotError(f"Unknown compression {compression}")
+
+    body = memoryview(blob)[len(MAGIC) + 2:]
+    try:
+        if compression == ZLIB:
+            body = zlib.decompress(body)
+        elif compression == ZSTD:
+            body = zstandard.ZstdDecompressor().decompress(body)
+        return _decode(bytes(body))
+    except _CORRUPT as e:
+        raise SnapshotError(f"Corrupt snapshot ({type(e).__name__}: {e})") from e
+
+
+# === Games ===
+
+def _history(game: Game):
+    """
+    Every past phase as [name, state fields changed since the previous phase, orders, results, messages].
+    The changed fields are the whole state when a field was dropped.
+    """
+    phases = []
+    previous = {}
+    for phase in game.state_history.keys():
+        state = game.state_history[phase]
+        if previous.keys() <= state.keys():
+            changed = {key: value for key, value in state.items() if previous.get(key, _SAME) != value}
+        else:
+            changed = dict(state, **{_FULL: True})
+        previous = state
+        results = {unit: [str(result) for result in unit_results] for unit, unit_results in game.result_history[phase].items()}
+        messages = [message.to_dict() for message in game.message_history[phase].values()]
+        phases.append([str(phase), changed, game.order_history[phase], results, messages])
+    return phases
+
+
+def _set_history(game: Game, phases: list):
+    codes = {}  # results repeat a handful of codes, share them
+    state = {}
+    for name, changed, orders, results, messages in phases:
+        phase = game._phase_wrapper_type(name)
+        if changed.pop(_FULL, False):
+            state = changed
+        else:
+            state = {**state, **changed}  # unchanged fields are shared with the previous phase, history is never modified
+        for unit, unit_results in results.items():
+            for code in unit_results:
+                if code not in codes:
+                    codes[code] = StringableCode(code)
+            results[unit] = [codes[code] for code in unit_results]
+        message_history = SortedDict(int, Message)
+        for message in messages:
+            message = Message.from_dict(message)
+            message_history.put(message.time_sent, message)
+        # phases come out of a snapshot in order, see adjudication.extend_sorted
+        extend_sorted(game.state_history, ((phase, state),))
+        extend_sorted(game.order_history, ((phase, orders),))
+        extend_sorted(game.result_history, ((phase, results),))
+        extend_sorted(game.message_history, ((phase, message_history),))
+
+
+def encode_game(game: Game, compression: str = "zlib"):
+    """
+    Snapshot of a game, including what to_saved_game_format leaves out.
+    Controllers and status aren't part of the engine game, see GameManager._restore_game.
+    """
+    return dumps(
+        {
+            "id": game.game_id,
+            "map": game.map_name,
+            "rules": [rule for rule in game.rules if rule not in RULES_TO_SKIP],
+            "history": _history(game),
+            "state": game.get_state(),
+            "orders": power_orders(game),
+            "messages": [message.to_dict() for message in game.messages.values()],
+            "engine": engine_fields(game),
+        },
+        compression,
+    )
+
+
+def encode_saved_game(saved_game: dict, compression: str = "zlib"):
+    """
+    Snapshot of a game that is only available in the saved format (e.g. straight from the store)
+    """
+    return dumps({"saved_game": saved_game}, compression)
+
+
+def decode_game(blob: bytes):
+    snapshot = loads(blob)
+    if "saved_game" in snapshot:
+        return from_saved_game_format(snapshot["saved_game"])
+
+    game = Game(game_id=snapshot["id"], map_name=snapshot["map"], rules=snapshot["rules"])
+    _set_history(game, snapshot["history"])
+    Game.set_state(game, snapshot["state"], clear_history=False)
+    set_power_orders(game, snapshot["orders"])
+    set_engine_fields(game, snapshot["engine"])
+    for message in snapshot["messages"]:
+        message = Message.from_dict(message)
+        game.messages.put(message.time_sent, message)
+    return game
@@ -0,0 +1,266 @@
+# Durable game store, backed by a local SQLite file
+#
+# Every save appends a record for the game. The first record is a full keyframe
+# (to_saved_game_format), after that we only write small deltas: the phases that
+# were resolved since the last save plus the current phase. The writer thread
+# folds deltas back into a fresh keyframe every few records so reloads stay cheap.
+#
+# Writes are queued and flushed in batches by a background thread, callers never touch disk.
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from queue import Queue, Empty
+from diplomacy.engine.game import Game
+from diplomacy.utils.export import to_saved_game_format
+
+KEYFRAME_INTERVAL = 20  # deltas written before the writer compacts into a new keyframe
+BATCH_SIZE = 256  # max records written per transaction
+
+_STOP = object()
+
+log = logging.getLogger(__name__)
+
+
+class GameStore:
+    def __init__(self, path: str, keyframe_interval: int = KEYFRAME_INTERVAL, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.batch_size = batch_size
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn_lock = threading.Lock()
+        self._create_tables()
+
+        # game_id -> {"phases": history phases already persisted, "deltas": deltas since last keyframe}
+        self._cursors = {}
+        self._cursor_lock = threading.Lock()
+
+        self.records_written = 0
+        self.batches_written = 0
+
+        self._queue = Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="game-store-writer", daemon=True)
+        self._writer.start()
+
+    def _create_tables(self):
+        with self._conn_lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                "game_id TEXT PRIMARY KEY, meta TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, game_id TEXT NOT NULL, "
+                "kind TEXT NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS records_game ON records (game_id, id)")
+
+    # === Call side ===
+
+    def save(self, game_id: str, game: Game, meta: dict):
+        """
+        Snapshots what changed since the last save and queues it for the writer.
+        Only the new phases are captured, so this is cheap even for long games.
+        """
+        history_len = len(game.state_history)
+
+        with self._cursor_lock:
+            cursor = self._cursors.get(game_id)
+            if cursor is None:
+                kind = "keyframe"
+                payload = to_saved_game_format(game)
+                cursor = self._cursors[game_id] = {"phases": history_len, "deltas": 0}
+            else:
+                kind = "delta"
+                new_phases = []
+                if history_len > cursor["phases"]:
+                    new_phases = Game.get_phase_history(game, from_phase=cursor["phases"])
+                payload = {
+                    "history": [phase.to_dict() for phase in new_phases],
+                    "current": Game.get_phase_data(game).to_dict(),
+                }
+                cursor["phases"] = history_len
+                cursor["deltas"] += 1
+
+        self._queue.put((game_id, kind, payload, dict(meta), cursor))
+
+    def flush(self, timeout: float = None):
+        """
+        Blocks until everything queued so far has been written.
+        Returns False if the timeout ran out first.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """
+        Flushes pending writes and stops the writer thread.
+        """
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._conn_lock:
+            self._conn.close()
+
+    # === Loading ===
+
+    def load_all(self):
+        """
+        Rebuilds the saved game dict of every stored game.
+
+        Returns: a list of (game_id, meta, saved_game)
+        """
+        with self._conn_lock:
+            games = self._conn.execute("SELECT game_id, meta FROM games ORDER BY rowid").fetchall()
+
+        loaded = []
+        for game_id, meta in games:
+            saved_game, deltas = self._load_saved_game(game_id)
+            if saved_game is None:
+                continue
+            with self._cursor_lock:
+                self._cursors[game_id] = {"phases": len(saved_game["phases"]) - 1, "deltas": deltas}
+            loaded.append((game_id, json.loads(meta), saved_game))
+        return loaded
+
+    def load(self, game_id: str):
+        """
+        Rebuilds a single saved game dict, or None if the game was never saved.
+        """
+        saved_game, _ = self._load_saved_game(game_id)
+        return saved_game
+
+    def _load_saved_game(self, game_id: str):
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT kind, payload FROM records WHERE game_id = ? AND id >= "
+                "(SELECT MAX(id) FROM records WHERE game_id = ? AND kind = 'keyframe') ORDER BY id",
+                (game_id, game_id),
+            ).fetchall()
+        if not rows:
+            return None, 0
+
+        saved_game = json.loads(rows[0][1])
+        for _, payload in rows[1:]:
+            apply_delta(saved_game, json.loads(payload))
+        return saved_game, len(rows) - 1
+
+    # === Writer thread ===
+
+    def _run_writer(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            records = [entry for entry in batch if isinstance(entry, tuple)]
+            if records:
+                try:
+                    self._write_batch(records)
+                except Exception:
+                    log.exception("failed to write records", extra={"records": len(records)})
+                    # the cursors already count the lost phases, forget them so the next save
+                    # of each game writes a full keyframe instead of a delta with a gap
+                    with self._cursor_lock:
+                        for game_id, _, _, _, cursor in records:
+                            if self._cursors.get(game_id) is cursor:
+                                del self._cursors[game_id]
+
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    entry.set()
+            if any(entry is _STOP for entry in batch):
+                return
+
+    def _write_batch(self, records):
+        now = time.time()
+        compact = set()
+        compacted = {}  # game_id -> deltas folded into a new keyframe
+        written = 0
+
+        with self._conn_lock, self._conn:
+            for game_id, kind, payload, meta, cursor in records:
+                if kind == "delta" and self._cursors.get(game_id) is not cursor:
+                    # queued before an earlier batch of this game failed, the next save writes a keyframe
+                    continue
+                written += 1
+                if kind == "keyframe":
+                    # a new keyframe makes everything older redundant
+                    self._conn.execute("DELETE FROM records WHERE game_id = ?", (game_id,))
+                self._conn.execute(
+                    "INSERT INTO records (game_id, kind, payload) VALUES (?, ?, ?)",
+                    (game_id, kind, json.dumps(payload)),
+                )
+                self._conn.execute(
+                    "INSERT INTO games (game_id, meta, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(game_id) DO UPDATE SET meta = excluded.meta, updated_at = excluded.updated_at",
+                    (game_id, json.dumps(meta), now),
+                )
+
+            with self._cursor_lock:
+                for game_id, kind, _, _, _ in records:
+                    cursor = self._cursors.get(game_id)
+                    if kind == "delta" and cursor and cursor["deltas"] >= self.keyframe_interval:
+                        compact.add(game_id)
+
+            for game_id in compact:
+                compacted[game_id] = self._compact(game_id)
+
+        # only once committed, a failed batch leaves the counters as they were
+        with self._cursor_lock:
+            for game_id, deltas in compacted.items():
+                cursor = self._cursors.get(game_id)
+                if cursor:
+                    # deltas queued after this batch are still counted
+                    cursor["deltas"] = max(cursor["deltas"] - deltas, 0)
+
+        self.records_written += written
+        self.batches_written += 1
+
+    def _compact(self, game_id: str):
+        """
+        Folds the latest keyframe and its deltas into a single new keyframe.
+        Runs on the writer thread inside the batch transaction.
+
+        Returns: the number of deltas folded
+        """
+        rows = self._conn.execute(
+            "SELECT id, kind, payload FROM records WHERE game_id = ? AND id >= "
+            "(SELECT MAX(id) FROM records WHERE game_id = ? AND kind = 'keyframe') ORDER BY id",
+            (game_id, game_id),
+        ).fetchall()
+        if len(rows) < 2:
+            return 0
+
+        saved_game = json.loads(rows[0][2])
+        for _, _, payload in rows[1:]:
+            apply_delta(saved_game, json.loads(payload))
+
+        last_id = rows[-1][0]
+        self._conn.execute("DELETE FROM records WHERE game_id = ? AND id <= ?", (game_id, last_id))
+        self._conn.execute(
+            "INSERT INTO records (game_id, kind, payload) VALUES (?, 'keyframe', ?)",
+            (game_id, json.dumps(saved_game)),
+        )
+        return len(rows) - 1
+
+
+def apply_delta(saved_game: dict, delta: dict):
+    """
+    Applies a delta record to a saved game dict in place.
+    The old current phase is replaced by the newly resolved phases and the new current phase.
+    """
+    phases = saved_game["phases"][:-1]
+    phases.extend(delta["history"])
+    phases.append(delta["current"])
+    saved_game["phases"] = phases
+    return saved_game
@@ -0,0 +1,103 @@
+# Order validation against the phase's legal orders
+#
+# Player input is normalized (case, whitespace, coast notation) and looked up in a set
+# compiled from the order index, so checking a submission is a few dict lookups per
+# order instead of running the engine's move generation again.
+
+import re
+
+_COAST = re.compile(r"\b([A-Z]{3})\s*[/(]\s*([NSEW]C)\b\s*\)?")
+_DASH = re.compile(r"\s*-\s*")
+_COAST_SUFFIX = re.compile(r"/[NSEW]C\b")
+
+
+def normalize_order(order: str):
+    """
+    Puts an order in the engine's notation: "f stp(sc)->bot" becomes "F STP/SC - BOT"
+    """
+    order = order.upper().replace("->", "-")
+    order = _COAST.sub(r"\1/\2", order)
+    order = _DASH.sub(" - ", order)
+    return " ".join(order.split())
+
+
+def strip_coasts(order: str):
+    return _COAST_SUFFIX.sub("", order)
+
+
+def _province(key: str):
+    # units are keyed as "F STP/SC", build locations as "STP"
+    return key[2:5] if key[:2] in ("A ", "F ") else key[:3]
+
+
+class OrderValidator:
+    def __init__(self, power: str, phase: str, unit_orders: dict, adjustment: int = None):
+        """
+        unit_orders: unit (or build location) -> legal orders, as in OrderIndex.unit_orders()
+        adjustment: during adjustments, the builds (> 0) or disbands (< 0) the power is due
+        """
+        self.power = power
+        self.phase = phase
+        self.adjustment = adjustment
+        self.legal = {}  # order -> unit it belongs to
+        self.coastless = {}  # order with coasts left out -> legal orders it could mean
+        self.units = {}  # province -> unit (or build location)
+        for unit, orders in unit_orders.items():
+            self.units[_province(unit)] = unit
+            for order in orders:
+                self.legal[order] = unit
+                stripped = strip_coasts(order)
+                if stripped != order:
+                    self.coastless.setdefault(stripped, []).append(order)
+
+    def check(self, orders):
+        """
+        Checks a submission, one result per order, in order:
+        {"order": as submitted, "normalized": engine notation, "valid": bool, "reason": why not, or None}
+        A unit (or build province) given more than one order only keeps the first.
+        During adjustments, builds (WAIVE included) and disbands past what the power is due are
+        rejected, the engine would only carry out the first ones.
+        """
+        results = []
+        ordered = set()  # provinces, a build in STP and one in STP/NC are in the same one
+        adjusted = 0
+        for order in orders:
+            normalized, reason = self._check(order)
+            if reason is None and normalized != "WAIVE":
+                unit = self.legal[normalized]
+                if _province(unit) in ordered:
+                    reason = f"{unit} already has an order"
+                ordered.add(_province(unit))
+            if reason is None and self.adjustment is not None:
+                adjusted += 1
+                if adjusted > abs(self.adjustment):
+                    kind = "build" if self.adjustment > 0 else "disband"
+                    reason = f"{self.power} can only {kind} {abs(self.adjustment)} unit(s) during {self.phase}"
+            results.append({"order": order, "normalized": normalized, "valid": reason is None, "reason": reason})
+        return results
+
+    def _check(self, order):
+        if order in self.legal:
+            return order, None  # already in engine notation, the common case
+        if not isinstance(order, str) or not order.strip():
+            return order, "empty order"
+        normalized = normalize_order(order)
+        if normalized in self.legal:
+            return normalized, None
+
+        # coasts can be left out when only one of them is legal
+        candidates = self.coastless.get(strip_coasts(normalized))
+        if candidates:
+            if len(candidates) == 1:
+                return candidates[0], None
+            return normalized, f"ambiguous coast, one of: {', '.join(sorted(candidates))}"
+
+        words = normalized.split()
+        if len(words) >= 2 and words[0] in ("A", "F"):
+            province = words[1][:3]
+        else:
+            province = words[0][:3]
+        unit = self.units.get(province)
+        if unit is None:
+            return normalized, f"{self.power} has nothing to order in {province} during {self.phase}"
+        return normalized, f"not a legal order for {unit} during {self.phase}"
@@ -0,0 +1,65 @@
+# Warm-up of a fresh API process
+#
+# Parsing a map file takes ~100ms, and the engine only does it the first time a game on
+# that map is created, so the first create_game after a deploy paid for it. The engine
+# keeps parsed maps in diplomacy.engine.map.MAP_CACHE, shared by every game on the map,
+# so loading it once at startup is enough. A throwaway game then goes through what the
+# first requests do (move generation, order index, state encoding).
+
+import logging
+import threading
+import time
+from diplomacy.engine.game import Game
+from diplomacy.engine.map import Map
+from .order_index import build_order_index
+from .response_cache import dump_json
+
+log = logging.getLogger(__name__)
+
+MAPS = ("standard",)
+
+
+class Warmup:
+    """
+    Readiness of the process: set once warm_up() finished
+    """
+    def __init__(self, maps=MAPS):
+        self.maps = maps
+        self.timings = {}  # step -> seconds
+        self.error = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def warm_up(self):
+        """
+        Loads the maps and plays through one throwaway game per map. Never raises,
+        a failed warm-up leaves the process serving (cold) and reports the error.
+        """
+        start = time.perf_counter()
+        try:
+            for map_name in self.maps:
+                loaded = self._step(f"map:{map_name}", Map, map_name)
+                if loaded.error:
+                    # the engine keeps map errors instead of raising them
+                    raise ValueError(f"Map '{map_name}': {'; '.join(str(e) for e in loaded.error)}")
+                game = self._step(f"game:{map_name}", Game, map_name=map_name)
+                self._step(f"orders:{map_name}", build_order_index, game)
+                self._step(f"state:{map_name}", lambda: dump_json(game.get_state()))
+        except Exception as e:
+            self.error = str(e)
+            log.exception("warm-up failed")
+        self.timings["total"] = time.perf_counter() - start
+        log.info("warm-up done", extra={"seconds": round(self.timings["total"], 3)})
+        self._ready.set()
+
+    def status(self):
+        return {"ready": self.ready, "timings": dict(self.timings), "error": self.error}
+
+    def _step(self, name: str, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.timings[name] = time.perf_counter() - start
+        return result
@@ -1,10 +1,35 @@
 # The FastAPI entry point
 
-from fastapi import FastAPI
+import asyncio
+import hmac
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from app.services.logs import configure_logging
+from app.services.metrics import REGISTRY, MetricsMiddleware, render_text
+from app.services import profiling
+
+# LOG_LEVEL and LOG_FORMAT (text or json), see services/logs.py
+configure_logging()
+
 from app.routes import game_router, auth_router
+from app.game.warmup import Warmup, MAPS
+
+# WARMUP=0 skips loading the maps at startup, the first game on a map loads it instead
+warmup = Warmup(MAPS if os.getenv("WARMUP", "1") != "0" else ())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # warms up in the background so the server listens right away, /ready says when it's done
+    task = asyncio.create_task(run_in_threadpool(warmup.warm_up))
+    yield
+    await task
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -15,9 +40,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# per-route latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# requests with "X-Profile: <PROFILE_TOKEN>", and 1 in PROFILE_SAMPLE_RATE requests, are profiled.
+# Sampling needs PROFILE_TOKEN as well, /profiles is the only way to read the profiles.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN") or None
+profiles = profiling.ProfileStore(int(os.getenv("PROFILE_BUFFER", profiling.PROFILE_CAPACITY)))
+app.add_middleware(
+    profiling.ProfilingMiddleware,
+    store=profiles,
+    token=PROFILE_TOKEN,
+    sample_rate=int(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+)
+
 # Include routers
 app.include_router(game_router, prefix="/game")
+# the appwrite SDK and .env are only loaded on the first auth request, see services/appwrite_client.py
+app.include_router(auth_router, prefix="/auth")
 
 @app.get("/ping")
 def ping():
-    return {"message": "pong"}
\ No newline at end of file
+    return {"message": "pong"}
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness: 503 until the warm-up is done, /ping only says the process is up
+    """
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+@app.get("/metrics")
+def metrics(format: str = "text"):
+    """
+    Latency histograms, counters and gauges in the Prometheus text format, or format=json
+    """
+    families = REGISTRY.collect()
+    if format == "json":
+        return families
+    return PlainTextResponse(render_text(families), media_type="text/plain; version=0.0.4")
+
+def check_profile_token(token: Optional[str]):
+    # profiles show the code and the game data, so reading them needs the token
+    if PROFILE_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled, set PROFILE_TOKEN")
+    if token is None or not hmac.compare_digest(token, PROFILE_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+@app.get("/profiles")
+def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    """
+    The profiled requests still in the buffer, newest first
+    """
+    check_profile_token(x_profile_token)
+    return profiles.list()
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, format: str = "pstats", x_profile_token: Optional[str] = Header(None)):
+    """
+    format: pstats (a .prof file for pstats/snakeviz), folded (stacks for flamegraph.pl/speedscope) or text
+    """
+    check_profile_token(x_profile_token)
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
+    if format == "folded":
+        return PlainTextResponse(profiling.render_folded(profile))
+    if format == "text":
+        return PlainTextResponse(profiling.render_text(profile))
+    return Response(
+        profile["pstats"],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'},
+    )
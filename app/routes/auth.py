@@ -1,8 +1,23 @@
-from fastapi import APIRouter
-from appwrite.exception import AppwriteException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from app.game.models.pydantic import (
     SuccessResponse,
 )
+from app.services.appwrite_client import validate_session
+from app.services.sessions import InvalidSession, AuthUnavailable
 
 router = APIRouter(tags=["auth"])
 
+def current_user(x_appwrite_session: str = Header(...)):
+    """
+    The Appwrite user behind the request's session token, use with Depends()
+    """
+    try:
+        return validate_session(x_appwrite_session)
+    except InvalidSession as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except AuthUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/session", response_model=SuccessResponse)
+def get_session(user: dict = Depends(current_user)):
+    return SuccessResponse(message="Session is valid.", data={"user_id": user.get("$id"), "name": user.get("name")})
@@ -1,7 +1,9 @@
 # These are the actual endpoints that the frontend hits for game logic, auth is separate
 
-from typing import List
-from fastapi import APIRouter, HTTPException, Query, Path
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Path, Request, Response, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.game.models.pydantic import (
     CreateGameRequest,
     RegisterPlayerRequest,
@@ -10,24 +12,83 @@ from app.game.models.pydantic import (
     SuccessResponse,
     GameRender,
     CreateGameResponse,
+    ForkGameRequest,
     GameSummaryResponse,
     GetOrdersRequest,
     GetValidOrdersRequest,
 )
 from app.game.game_manager import GameManager
 from app.game.automation import GameAutomation
+from app.game.store import GameStore
+from app.game.render_pool import RenderPool, RenderPoolFull
+from app.game.adjudication import adjudication_pool
+from app.game.game_index import PAGE_SIZE, MAX_PAGE_SIZE
+from app.game.hibernation import MAX_RESIDENT
+from app.services.events import EventBus
+from app.services.metrics import REGISTRY
+from app.services.profiling import ProfiledRoute
+import asyncio
 import os
 from uuid import uuid4
 
-router = APIRouter(tags=["game"])
-manager = GameManager()
-automation = GameAutomation(manager)
+# games are persisted to a local SQLite file, set GAME_STORE_PATH="" to keep them in memory only
+STORE_PATH = os.getenv("GAME_STORE_PATH", "saves/games.db")
+
+# set by start_workers: requests come from the shard router, which picks new game ids (X-Game-Id).
+# Anywhere else the header is ignored, clients don't get to choose ids.
+SHARD_WORKER = os.getenv("SHARD_WORKER") == "1"
+
+# endpoints can be profiled per request, see services/profiling.py
+router = APIRouter(tags=["game"], route_class=ProfiledRoute)
+store = None
+if STORE_PATH:
+    os.makedirs(os.path.dirname(STORE_PATH) or ".", exist_ok=True)
+    store = GameStore(STORE_PATH)
+# submitted orders are checked against the legal orders of the phase, STRICT_ORDERS=0 turns that off
+# powers without a player are played by bots, BOT_POLICY is one of random, hold, greedy
+manager = GameManager(
+    store=store,
+    strict_orders=os.getenv("STRICT_ORDERS", "1") != "0",
+    bot_policy=os.getenv("BOT_POLICY", "random"),
+    # games kept in memory, the least recently used beyond that hibernate, 0 keeps every game resident
+    max_resident_games=int(os.getenv("MAX_RESIDENT_GAMES", MAX_RESIDENT)) or None,
+)
+manager.load_games()
+render_pool = RenderPool()
+event_bus = EventBus()
+manager.add_listener(event_bus.publish)
+
+def encoded_response(encoded, request: Request):
+    """
+    Sends a pre-encoded body (see response_cache.py) as it is, compressed if the client accepts it
+    """
+    encoding, body = encoded.variant(request.headers.get("accept-encoding", ""))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+EVENTS_KEEPALIVE = 15  # seconds between keepalive comments on idle event streams
+# games due at the same time are adjudicated on this many worker processes, 0 resolves them in-process
+ADJUDICATION_WORKERS = int(os.getenv("ADJUDICATION_WORKERS", "0"))
+automation = GameAutomation(manager, executor=adjudication_pool(ADJUDICATION_WORKERS) if ADJUDICATION_WORKERS else None)
+
+REGISTRY.gauge("diplomacy_games", "Games on this process", function=lambda: len(manager.games))
+REGISTRY.gauge(
+    "diplomacy_games_resident", "Games in memory, the rest are hibernated",
+    function=lambda: manager.get_hibernation_metrics()["resident"]
+)
+REGISTRY.gauge("diplomacy_automation_jobs", "Games with automation running", function=lambda: len(automation.running_games))
+REGISTRY.gauge("diplomacy_event_subscribers", "Open event streams", function=lambda: event_bus.subscriber_count())
 
 @router.post("/create", response_model=CreateGameResponse)
-def create_game(req: CreateGameRequest):
-    game_id = str(uuid4())
+def create_game(req: CreateGameRequest, x_game_id: Optional[str] = Header(None)):
+    # in sharded mode the router picks the id, so it knows which worker owns the game
+    game_id = (SHARD_WORKER and x_game_id) or str(uuid4())
     try:
-        manager.create_game(game_id=game_id, game_name=req.game_name, rules=req.rules, creator_id=req.creator_id)
+        result = manager.create_game(game_id=game_id, game_name=req.game_name, rules=req.rules, creator_id=req.creator_id)
+        if not result["success"]:
+            raise HTTPException(status_code=409, detail=result["error"])
         return {
             "message": f"Game '{game_id}' created.",
             "game_id": game_id,
@@ -37,12 +98,48 @@ def create_game(req: CreateGameRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
+@router.post("/{game_id}/fork", response_model=CreateGameResponse)
+def fork_game(game_id: str, req: ForkGameRequest, x_game_id: Optional[str] = Header(None)):
+    # in sharded mode the router picks an id owned by the parent's worker
+    fork_id = (SHARD_WORKER and x_game_id) or str(uuid4())
+    result = manager.fork_game(game_id, fork_id, req.creator_id, game_name=req.game_name, keep_players=req.keep_players)
+    if not result["success"]:
+        raise HTTPException(status_code=404 if game_id not in manager.games else 400, detail=result["error"])
+    return {
+        "message": f"Game '{game_id}' forked at {result['phase']}.",
+        "game_id": fork_id,
+        "game_name": manager.games[fork_id]["game_name"],
+        "creator_id": req.creator_id
+    }
+    
 @router.get("/list", response_model=List[GameSummaryResponse])
-def get_all_games():
-    return manager.get_all_games()
+def get_all_games(
+    response: Response,
+    creator_id: Optional[str] = None,
+    player_id: Optional[str] = None,
+    status: Optional[str] = None,
+    open_seats: Optional[bool] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Lobby list, newest games first. If there are more, the X-Next-Cursor header has the cursor for the next page.
+    """
+    try:
+        page = manager.list_games(
+            limit=limit, cursor=cursor, creator_id=creator_id, player_id=player_id, status=status, open_seats=open_seats
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["games"]
 
 @router.get("/list/{game_id}", response_model=GameSummaryResponse)
-def get_game(game_id):
+def get_game(game_id, request: Request):
+    encoded = manager.get_game_response(game_id)
+    if encoded is not None:
+        return encoded_response(encoded, request)
     return manager.get_game(game_id)
     
 @router.post("/register", response_model=SuccessResponse)
@@ -73,26 +170,33 @@ def submit_orders(
     req: SubmitOrdersRequest = ...
 ):
     try:
-        manager.submit_orders(game_id, req.player_id, req.orders)
-        return SuccessResponse(message="Orders submitted successfully.")
+        result = manager.submit_orders(game_id, req.player_id, req.orders)
+        if not result["success"]:
+            detail = result["error"]
+            if result.get("results"):
+                detail = {"error": result["error"], "results": result["results"]}
+            raise HTTPException(status_code=400, detail=detail)
+        return SuccessResponse(message="Orders submitted successfully.", data={"orders": result["orders_submitted"]})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 @router.get("/{game_id}/orders", response_model=SuccessResponse)
-def get_orders(req: GetOrdersRequest):
+def get_orders(req: GetOrdersRequest, request: Request):
     try:
-        orders = manager.get_orders(req.game_id)
-        return SuccessResponse(message=f"Orders for game: {req.game_id}", data={"orders": orders})
+        return encoded_response(manager.get_orders_response(req.game_id), request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 @router.get("/{game_id}/valid-orders", response_model=SuccessResponse)
-def get_valid_orders(game_id: str, power: str):
+def get_valid_orders(game_id: str, power: str, by_unit: bool = False):
     try:
         valid_orders = manager._get_power_orders(game_id, power)
+        data = {"valid_orders": valid_orders}
+        if by_unit:
+            data["unit_orders"] = manager.get_power_unit_orders(game_id, power)
         return SuccessResponse(
             message=f"Valid orders for power: {power}",
-            data={"valid_orders": valid_orders}
+            data=data
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -132,29 +236,114 @@ def resolve_phase(game_id: str):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
+@router.get("/{game_id}/preview", response_model=SuccessResponse)
+def preview_phase(game_id: str):
+    """
+    What resolving the phase now would do with the orders submitted so far, nothing is changed
+    """
+    result = manager.preview_phase(game_id)
+    if not result["success"]:
+        raise HTTPException(status_code=404 if game_id not in manager.games else 400, detail=result["error"])
+    del result["success"]
+    return SuccessResponse(message=f"Preview of {result['phase']} for game '{game_id}'", data=result)
+    
 @router.get("/{game_id}/state", response_model=GameStateResponse)
-def get_game_state(game_id: str):
+def get_game_state(game_id: str, request: Request, since: Optional[int] = None, epoch: Optional[str] = None):
+    """
+    The full state, or with since and the epoch of that revision, what changed since then
+    """
     try:
-        state = manager.get_game_state(game_id)
-        return GameStateResponse(game_id=game_id, state=state)
+        if since is None or epoch is None:
+            encoded = manager.get_state_response(game_id)
+            if encoded is not None:
+                return encoded_response(encoded, request)
+        state = manager.get_game_state(game_id, since=since, epoch=epoch)
+        # nothing changed since the revision the client already has
+        if since is not None and state.get("changed") is False:
+            return Response(
+                status_code=304, headers={"X-Revision": str(state["revision"]), "X-Revision-Epoch": state["epoch"]}
+            )
+        return GameStateResponse(game_id=game_id, state=state, revision=state.get("revision"))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     
-@router.get("/{game_id}/render", response_model=GameRender)
-async def render_game_svg(game_id: str):
-    try:
-        manager.render_game(game_id)
+@router.get("/{game_id}/history", response_model=SuccessResponse)
+def get_phase_history(game_id: str):
+    result = manager.get_phase_history(game_id)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return SuccessResponse(message=f"Phases of game '{game_id}'", data={"phases": result["phases"]})
+    
+@router.get("/{game_id}/history/{phase}", response_model=SuccessResponse)
+def get_history_phase(game_id: str, phase: str):
+    result = manager.get_history_phase(game_id, phase.upper())
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["error"])
+    del result["success"]
+    return SuccessResponse(message=f"Phase {result['phase']} of game '{game_id}'", data=result)
+    
+@router.get("/{game_id}/events")
+async def game_events(game_id: str):
+    """
+    Server-sent events for a game: orders_submitted, phase_resolved, game_over, 
+    and resync when the client fell behind and should refetch the state.
+    """
+    if game_id not in manager.games:
+        raise HTTPException(status_code=404, detail=f"Game '{game_id}' not found.")
+
+    subscriber = event_bus.subscribe(game_id)
 
-        svg_path = manager.render_game(game_id)
+    async def stream():
+        try:
+            yield b": connected\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.get(), EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            event_bus.unsubscribe(subscriber)
 
-        if not os.path.exists(svg_path):
-            raise HTTPException(status_code=500, detail="SVG not found after rendering")
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    
+@router.get("/render/metrics")
+def get_render_metrics():
+    cache = manager.render_cache
+    return {
+        "pool": render_pool.get_metrics(),
+        "cache": {"entries": len(cache), "bytes": cache.size, "hits": cache.hits, "misses": cache.misses, "evictions": cache.evictions},
+    }
+    
+@router.get("/hibernation/metrics")
+def get_hibernation_metrics():
+    return manager.get_hibernation_metrics()
+    
+@router.get("/{game_id}/render", response_model=GameRender)
+async def render_game_svg(game_id: str, request: Request, response: Response):
+    try:
+        # may wait on the game's lock, keep that off the event loop
+        key, etag, svg_content, payload = await run_in_threadpool(manager.prepare_render, game_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-        with open(svg_path, "r", encoding="utf-8") as f:
-            svg_content = f.read()
+    # the client already has this exact board and set of orders
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
 
-        return GameRender(game_id=game_id, svg=svg_content)
+    if svg_content is None:
+        try:
+            svg_content = (await render_pool.render(payload)).decode("utf-8")
+        except RenderPoolFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Render timed out.")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        manager.render_cache.put(key, svg_content)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
-    
\ No newline at end of file
+    response.headers["ETag"] = etag
+    return GameRender(game_id=game_id, svg=svg_content)
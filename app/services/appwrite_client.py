@@ -1,30 +1,64 @@
-from appwrite.client import Client
-from appwrite.services.users import Users
-from appwrite.services.account import Account
+# Appwrite clients, made on first use
+#
+# Importing appwrite and reading .env used to happen on import, which every process
+# paid for at startup whether it served auth requests or not.
+
+import functools
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
 
-# Admin client: used for creating users, listing users, etc.
-admin_client = Client()
-admin_client.set_endpoint(os.getenv("APPWRITE_ENDPOINT"))
-admin_client.set_project(os.getenv("APPWRITE_PROJECT_ID"))
-admin_client.set_key(os.getenv("APPWRITE_API_KEY"))
+def _client(admin: bool = False, session: str = None):
+    from appwrite.client import Client
+    from dotenv import load_dotenv
+    load_dotenv()
+    client = Client()
+    client.set_endpoint(os.getenv("APPWRITE_ENDPOINT"))
+    client.set_project(os.getenv("APPWRITE_PROJECT_ID"))
+    if admin:
+        client.set_key(os.getenv("APPWRITE_API_KEY"))
+    if session:
+        client.set_session(session)
+    return client
+
+
+@functools.lru_cache(maxsize=None)
+def _shared(name: str):
+    if name == "session_cache":
+        from dotenv import load_dotenv
+        from .sessions import SessionCache, SESSION_TTL
+        load_dotenv()
+        return SessionCache(
+            os.getenv("APPWRITE_ENDPOINT"), os.getenv("APPWRITE_PROJECT_ID"), ttl=float(os.getenv("SESSION_TTL", SESSION_TTL))
+        )
+    if name == "admin_client":
+        return _client(admin=True)
+    if name == "guest_client":
+        return _client()
+    if name == "admin_users":
+        from appwrite.services.users import Users
+        return Users(_shared("admin_client"))
+    from appwrite.services.account import Account
+    return Account(_shared("guest_client"))
+
+
+def __getattr__(name):
+    # Admin client (admin_client, admin_users): used for creating users, listing users, etc.
+    # Guest (unauthenticated) client (guest_client, guest_account): used for login
+    if name in ("admin_client", "admin_users", "guest_client", "guest_account"):
+        return _shared(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-admin_users = Users(admin_client)
 
-# Guest (unauthenticated) client: used for login
-guest_client = Client()
-guest_client.set_endpoint(os.getenv("APPWRITE_ENDPOINT"))
-guest_client.set_project(os.getenv("APPWRITE_PROJECT_ID"))
+def validate_session(session_token: str):
+    """
+    The user behind a session token, cached for SESSION_TTL seconds (see sessions.py).
+    Raises sessions.InvalidSession or sessions.AuthUnavailable.
+    """
+    return _shared("session_cache").validate(session_token)
 
-guest_account = Account(guest_client)
 
-# Authenticated client with session token
-def get_account_client(session_token: str) -> Account:
-    user_client = Client()
-    user_client.set_endpoint(os.getenv("APPWRITE_ENDPOINT"))
-    user_client.set_project(os.getenv("APPWRITE_PROJECT_ID"))
-    user_client.set_session(session_token)
-    return Account(user_client)
\ No newline at end of file
+# Authenticated client with session token, for calls made as the user.
+# Use validate_session to only check who the token belongs to.
+def get_account_client(session_token: str):
+    from appwrite.services.account import Account
+    return Account(_client(session=session_token))
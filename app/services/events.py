@@ -0,0 +1,89 @@
+# Per-game event fan-out for the server-sent events endpoint
+#
+# The game manager publishes events from whatever thread made the change. Each event
+# is encoded once and the same bytes are queued to every subscriber of that game on
+# the event loop. Subscribers that fall behind don't grow without bound: their queue
+# is dropped and replaced by a single "resync" event telling the client to refetch.
+
+import asyncio
+import itertools
+import json
+
+QUEUE_SIZE = 64  # events buffered per subscriber before it counts as lagging
+
+RESYNC = b'event: resync\ndata: {"reason": "subscriber fell behind"}\n\n'
+
+
+def encode_event(event_id: int, event: str, data: dict):
+    """
+    Encodes an event in the text/event-stream format
+    """
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class Subscriber:
+    def __init__(self, game_id: str, queue_size: int):
+        self.game_id = game_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def push(self, payload: bytes):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # too slow, throw away what it hasn't read and tell it to refetch the state
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class EventBus:
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.published = 0
+        self._subscribers = {}  # game_id -> set of Subscriber, only touched on the loop
+        self._ids = itertools.count(1)
+        self._loop = None
+
+    def subscribe(self, game_id: str):
+        """
+        Registers a new subscriber for a game. Must be called on the event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(game_id, self.queue_size)
+        self._subscribers.setdefault(game_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self._subscribers.get(subscriber.game_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.game_id]
+
+    def subscriber_count(self, game_id: str = None):
+        if game_id is not None:
+            return len(self._subscribers.get(game_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, game_id: str, event: str, data: dict):
+        """
+        Publishes an event to every subscriber of a game. Safe to call from any thread.
+        Costs nothing when nobody is listening to the game.
+        """
+        if self._loop is None or game_id not in self._subscribers:
+            return
+        payload = encode_event(next(self._ids), event, data)
+        self.published += 1
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, game_id, payload)
+        except RuntimeError:
+            pass  # loop closed, server is shutting down
+
+    def _fan_out(self, game_id: str, payload: bytes):
+        for subscriber in tuple(self._subscribers.get(game_id, ())):
+            subscriber.push(payload)
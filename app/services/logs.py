@@ -0,0 +1,63 @@
+# Logging setup
+#
+# Modules log through the standard logging module (logging.getLogger(__name__)), all
+# under the "app" logger. LOG_LEVEL picks the level (default INFO), LOG_FORMAT=json
+# writes one JSON object per line with the fields passed in extra=, for log collectors.
+# Messages use %-style arguments, so nothing is formatted for records below the level.
+
+import json
+import logging
+import os
+import sys
+
+# attributes every LogRecord has, anything else came in through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def _extra(record: logging.LogRecord):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(_extra(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Plain lines for humans, the extra fields as key=value at the end
+    """
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord):
+        line = super().format(record)
+        extra = _extra(record)
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+
+def configure_logging(level: str = None, format: str = None):
+    """
+    Sets up the "app" logger, level and format default to LOG_LEVEL and LOG_FORMAT
+    """
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    format = format or os.getenv("LOG_FORMAT", "text")
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if format == "json" else TextFormatter())
+    logger = logging.getLogger("app")
+    logger.handlers = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
@@ -0,0 +1,249 @@
+# In-process metrics for the /metrics endpoint
+#
+# Counters, gauges and latency histograms kept in plain python and rendered in the
+# Prometheus text format. Recording is a dict lookup, a bisect and a couple of additions
+# under a per-metric lock, cheap enough for every request and every GameManager call.
+
+import bisect
+import threading
+import time
+
+# seconds, request and GameManager latencies are mostly well under a second
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}  # label values -> count
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labels:
+            values = {(): 0}  # nothing happened yet is still a value
+        return [{"labels": dict(zip(self.labels, key)), "value": value} for key, value in values.items()]
+
+
+class Gauge:
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels=(), function=None):
+        """
+        function: called on every collect for the current value, instead of set().
+        With labels it returns a dict of label values -> value.
+        """
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.function = function
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def collect(self):
+        if self.function is not None:
+            values = self.function()
+            if not self.labels:
+                values = {(): values}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [{"labels": dict(zip(self.labels, key)), "value": value} for key, value in values.items()]
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [count per bucket (+inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def collect(self):
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        samples = []
+        for key, counts, total, count in series:
+            cumulative, buckets = 0, []
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                buckets.append([_format_value(bound), cumulative])  # "+Inf" as a string, it isn't valid JSON
+            samples.append({"labels": dict(zip(self.labels, key)), "buckets": buckets, "sum": total, "count": count})
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}  # name -> metric, in registration order
+        self._lock = threading.Lock()
+
+    def _register(self, kind, name: str, *args, **kwargs):
+        # asking twice for the same name gives the same metric, e.g. for several GameManagers in one process
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = kind(name, *args, **kwargs)
+            elif not isinstance(metric, kind):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labels=()):
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels=(), function=None):
+        gauge = self._register(Gauge, name, help, labels)
+        if function is not None:
+            gauge.function = function  # the latest owner wins, e.g. the manager the app serves
+        return gauge
+
+    def histogram(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, help, labels, buckets)
+
+    def collect(self):
+        """
+        Every metric as {"name", "help", "type", "samples"}, JSON-able
+        """
+        return [
+            {"name": metric.name, "help": metric.help, "type": metric.type, "samples": metric.collect()}
+            for metric in list(self._metrics.values())
+        ]
+
+
+REGISTRY = Registry()
+
+
+def add_labels(families: list, labels: dict):
+    """
+    Same families with extra labels on every sample, e.g. the worker they came from
+    """
+    return [
+        dict(family, samples=[dict(sample, labels={**labels, **sample["labels"]}) for sample in family["samples"]])
+        for family in families
+    ]
+
+
+def merge(family_lists):
+    """
+    Merges collect() results from several processes, samples of the same metric end up together
+    """
+    merged = {}
+    for families in family_lists:
+        for family in families:
+            if family["name"] in merged:
+                merged[family["name"]]["samples"].extend(family["samples"])
+            else:
+                merged[family["name"]] = dict(family, samples=list(family["samples"]))
+    return list(merged.values())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_text(families: list):
+    """
+    Prometheus text exposition format
+    """
+    lines = []
+    for family in families:
+        name = family["name"]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for sample in family["samples"]:
+            labels = sample["labels"]
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(sample['value'])}")
+                continue
+            for bound, count in sample["buckets"]:
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+    return "\n".join(lines) + "\n"
+
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time until the response starts, by route", ("method", "route")
+)
+HTTP_RESPONSES = REGISTRY.counter("http_responses_total", "Responses by route and status", ("method", "route", "status"))
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request by route template (/game/{game_id}/state, not the actual path),
+    up to the start of the response so streams like /events don't count their whole life.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = None
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start" and status is None:
+                status = message["status"]
+                self._record(scope, start, status)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            if status is None:
+                self._record(scope, start, 500)
+
+    def _record(self, scope, start: float, status: int):
+        # the router puts the matched route on the scope
+        route = scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], path)
+        HTTP_RESPONSES.inc(scope["method"], path, str(status))
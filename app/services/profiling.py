@@ -0,0 +1,291 @@
+# Opt-in profiling of single requests
+#
+# A request is profiled when it carries "X-Profile: <PROFILE_TOKEN>", or when it is the
+# 1 in PROFILE_SAMPLE_RATE request picked by sampling. Its endpoint runs under cProfile,
+# in the threadpool thread for the sync routes, and the result goes into a bounded ring
+# buffer that /profiles serves as pstats files or folded stacks for flamegraphs.
+#
+# Requests that aren't picked go straight through: the middleware counts and compares
+# a header, the endpoint wrapper does one context variable lookup.
+
+import cProfile
+import functools
+import hmac
+import inspect
+import io
+import itertools
+import logging
+import marshal
+import pstats
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from uuid import uuid4
+from fastapi.routing import APIRoute
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_CAPACITY = 20  # profiles kept, the oldest is dropped first
+
+log = logging.getLogger(__name__)
+
+# the profile of the request being handled, if it is profiled
+_current = ContextVar("profile", default=None)
+# one profile at a time, cProfile doesn't nest and a second profiler would steal the first one's calls
+_busy = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.route = None
+        self.status = None
+        self.started = time.time()
+        self.duration_ms = None
+        self.profiler = cProfile.Profile()
+        self.ran = False
+
+    def run(self, fn, *args, **kwargs):
+        # another request being profiled right now wins, this one runs unprofiled
+        if not _busy.acquire(blocking=False):
+            return fn(*args, **kwargs)
+        try:
+            self.ran = True
+            return self.profiler.runcall(fn, *args, **kwargs)
+        finally:
+            _busy.release()
+
+    async def run_async(self, fn, *args, **kwargs):
+        # async endpoints are profiled on the event loop thread, other requests the loop
+        # serves while this one awaits show up in the profile too
+        if not _busy.acquire(blocking=False):
+            return await fn(*args, **kwargs)
+        self.ran = True
+        self.profiler.enable()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            self.profiler.disable()
+            _busy.release()
+
+    def finish(self):
+        """
+        The stored profile: the summary plus the pstats data, marshalled like a .prof file
+        """
+        self.profiler.create_stats()
+        stats = _without_profiler(self.profiler.stats)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started": self.started,
+            "duration_ms": self.duration_ms,
+            "calls": sum(nc for _, nc, _, _, _ in stats.values()),
+            "pstats": marshal.dumps(stats),
+        }
+
+
+def _is_profiler(func):
+    filename, _, name = func
+    return filename in (__file__, cProfile.__file__) or "_lsprof.Profiler" in name
+
+
+def _without_profiler(stats: dict):
+    # the wrapper and runcall frames are the profiler's own, the endpoint is the root
+    return {
+        func: (cc, nc, tt, ct, {caller: edge for caller, edge in callers.items() if not _is_profiler(caller)})
+        for func, (cc, nc, tt, ct, callers) in stats.items()
+        if not _is_profiler(func)
+    }
+
+
+class ProfileStore:
+    """
+    Ring buffer of the latest profiles
+    """
+    def __init__(self, capacity: int = PROFILE_CAPACITY):
+        self._profiles = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self):
+        """
+        Summaries, newest first
+        """
+        with self._lock:
+            profiles = list(self._profiles)
+        return [{key: value for key, value in profile.items() if key != "pstats"} for profile in reversed(profiles)]
+
+    def get(self, profile_id: str):
+        with self._lock:
+            for profile in self._profiles:
+                if profile["id"] == profile_id:
+                    return profile
+        return None
+
+
+def profiled(endpoint):
+    """
+    Runs the endpoint under the request's profiler, if it has one
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            return await profile.run_async(endpoint, *args, **kwargs)
+    else:
+        # sync endpoints run in the threadpool, which gets a copy of the request's context
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return endpoint(*args, **kwargs)
+            return profile.run(endpoint, *args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route class for routers whose endpoints can be profiled: APIRouter(route_class=ProfiledRoute)
+    """
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+class ProfilingMiddleware:
+    """
+    Picks the requests to profile and stores their profiles. The response of a profiled
+    request carries X-Profile-Id with the id to download it by.
+
+    token: what X-Profile has to be to profile a request, None turns the header off
+    sample_rate: profile 1 in this many requests, 0 turns sampling off. Needs a token too,
+        reading the profiles back takes it (see /profiles), without one they'd pile up unread.
+    """
+    def __init__(self, app, store: ProfileStore, token: str = None, sample_rate: int = 0):
+        self.app = app
+        self.store = store
+        self.token = token.encode() if token else None
+        if sample_rate and self.token is None:
+            log.warning("profile sampling needs PROFILE_TOKEN to read the profiles, sampling is off")
+            sample_rate = 0
+        self.sample_rate = sample_rate
+        self._requests = itertools.count(1)
+
+    def _trigger(self, scope):
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if hmac.compare_digest(value, self.token):
+                        return "header"
+                    break
+        if self.sample_rate and next(self._requests) % self.sample_rate == 0:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.token is None and not self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+        token = _current.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start" and profile.ran:
+                profile.status = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile.id.encode())])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+            profile.duration_ms = round((time.perf_counter() - start) * 1e3, 3)
+            profile.route = getattr(scope.get("route"), "path", None)
+            profile.status = profile.status or 500
+            # nothing to keep if no endpoint ran (404s) or another profile had the profiler
+            if profile.ran:
+                self.store.add(profile.finish())
+
+
+def load_stats(profile: dict):
+    """
+    pstats.Stats for a stored profile
+    """
+    stats = pstats.Stats()
+    stats.stats = marshal.loads(profile["pstats"])
+    stats.get_top_level_stats()
+    return stats
+
+
+def render_text(profile: dict, limit: int = 40):
+    """
+    The top functions by cumulative time, like python -m pstats would print them
+    """
+    out = io.StringIO()
+    stats = load_stats(profile)
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name  # builtins, e.g. <built-in method builtins.len>
+    return f"{name} ({filename.rsplit('/', 1)[-1]}:{line})"
+
+
+def render_folded(profile: dict, min_us: float = 1.0):
+    """
+    Folded stacks ("a;b;c <microseconds>" per line) for flamegraph.pl or speedscope.
+
+    cProfile only records caller -> callee edges, so a function's time is split between
+    the stacks it appears under in proportion to the time each caller spent in it.
+    """
+    raw = marshal.loads(profile["pstats"])
+    callees = {func: {} for func in raw}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, ct) in callers.items():
+            if caller in callees:
+                callees[caller][func] = ct
+
+    folded = {}
+
+    def walk(func, stack, on_stack, scale):
+        _, _, tt, ct, _ = raw[func]
+        stack = stack + (_label(func),)
+        self_us = tt * scale * 1e6
+        if self_us >= min_us:
+            key = ";".join(stack)
+            folded[key] = folded.get(key, 0) + self_us
+        on_stack.add(func)
+        for callee, edge_ct in callees[func].items():
+            callee_ct = raw[callee][3]
+            # recursion is folded into the outermost call, tiny branches are dropped
+            if callee in on_stack or not callee_ct or edge_ct * scale * 1e6 < min_us:
+                continue
+            walk(callee, stack, on_stack, scale * edge_ct / callee_ct)
+        on_stack.discard(func)
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not any(caller in raw for caller in callers):
+            walk(func, (), set(), 1.0)
+    return "".join(f"{stack} {round(us)}\n" for stack, us in folded.items() if round(us))
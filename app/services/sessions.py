@@ -0,0 +1,147 @@
+# Appwrite session validation, cached
+#
+# Checking a session token is a GET /account against Appwrite with the token as
+# X-Appwrite-Session. The appwrite SDK builds a client per token and a new connection
+# per call, so every authenticated request paid a TLS handshake and a round trip. Here
+# one pooled httpx client is shared, the user behind a valid token is kept for a short
+# TTL (bounded LRU, tokens are stored hashed), and concurrent checks of the same token
+# wait for the one request already in flight.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import httpx
+from app.services.metrics import REGISTRY
+
+SESSION_TTL = 60.0  # seconds a validated session is trusted without asking Appwrite again
+INVALID_TTL = 5.0  # seconds a rejected token is remembered, so retries don't all reach Appwrite
+MAX_SESSIONS = 10000
+TIMEOUT = 5.0
+
+VALIDATIONS = REGISTRY.counter(
+    "diplomacy_session_validations_total", "Session token checks, by where the answer came from", ("source",)
+)
+
+
+class InvalidSession(Exception):
+    """
+    Appwrite rejected the token (expired, revoked or made up)
+    """
+
+
+class AuthUnavailable(Exception):
+    """
+    Appwrite couldn't be asked, the token is neither valid nor invalid
+    """
+
+
+class _Flight:
+    # a validation in progress, the callers asking for the same token wait on it
+    def __init__(self):
+        self.done = threading.Event()
+        self.user = None
+        self.error = None
+        self.invalidated = False  # invalidate() came in while it was out, the answer isn't kept
+
+
+def _token_key(token: str):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class SessionCache:
+    def __init__(self, endpoint: str, project: str, ttl: float = SESSION_TTL, invalid_ttl: float = INVALID_TTL,
+                 max_entries: int = MAX_SESSIONS, timeout: float = TIMEOUT, clock=time.monotonic):
+        self.ttl = ttl
+        self.invalid_ttl = invalid_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.http = httpx.Client(
+            base_url=endpoint.rstrip("/"), headers={"X-Appwrite-Project": project}, timeout=timeout
+        )
+        self._entries = OrderedDict()  # token hash -> (expires, user or None if invalid)
+        self._flights = {}  # token hash -> _Flight
+        self._lock = threading.Lock()
+
+    def validate(self, token: str):
+        """
+        The Appwrite user behind a session token.
+        Raises InvalidSession if Appwrite rejects it, AuthUnavailable if Appwrite can't be reached.
+        """
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                VALIDATIONS.inc("cache")
+                if entry[1] is None:
+                    raise InvalidSession("Invalid session")
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            VALIDATIONS.inc("shared")
+            flight.done.wait()
+            if flight.error is not None:
+                raise type(flight.error)(*flight.error.args)  # not the leader's instance, its traceback is the leader's
+            return flight.user
+
+        VALIDATIONS.inc("appwrite")
+        try:
+            flight.user = self._fetch(token)
+        except (InvalidSession, AuthUnavailable) as e:
+            flight.error = e
+        finally:
+            if flight.user is None and flight.error is None:
+                flight.error = AuthUnavailable("Session check failed")
+            with self._lock:
+                del self._flights[key]
+                # outages aren't cached, the next request asks again
+                if not isinstance(flight.error, AuthUnavailable) and not flight.invalidated:
+                    ttl = self.ttl if flight.error is None else self.invalid_ttl
+                    self._store(key, (self.clock() + ttl, flight.user))
+            flight.done.set()
+        if flight.error is not None:
+            raise flight.error
+        return flight.user
+
+    def invalidate(self, token: str):
+        """
+        Forgets a token, e.g. after logging it out. A check already in flight still answers
+        its callers, but its answer isn't cached.
+        """
+        key = _token_key(token)
+        with self._lock:
+            self._entries.pop(key, None)
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.invalidated = True
+
+    def close(self):
+        self.http.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _fetch(self, token: str):
+        try:
+            response = self.http.get("/account", headers={"X-Appwrite-Session": token})
+        except httpx.HTTPError as e:
+            raise AuthUnavailable(f"Appwrite unavailable: {e}")
+        if response.status_code in (401, 403):
+            raise InvalidSession("Invalid session")
+        if response.status_code != 200:
+            raise AuthUnavailable(f"Appwrite answered {response.status_code}")
+        try:
+            return response.json()
+        except ValueError:
+            raise AuthUnavailable("Appwrite answered with invalid JSON")
+
+    def _store(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,5 @@
+from .ring import HashRing, node_name
+from .router import create_router_app
+from .workers import start_workers, stop_workers
+
+__all__ = ["HashRing", "node_name", "create_router_app", "start_workers", "stop_workers"]
@@ -0,0 +1,33 @@
+# Runs the API in sharded mode: N worker processes behind a game_id router
+#
+# python -m app.shard --workers 4 --port 8080
+
+import argparse
+import os
+import tempfile
+import uvicorn
+from .router import create_router_app
+from .workers import start_workers, stop_workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded diplomacy backend")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--store-dir", default="saves", help="one store file per worker, empty to keep games in memory")
+    args = parser.parse_args()
+
+    if args.store_dir:
+        os.makedirs(args.store_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix="diplomacy-shards-") as socket_dir:
+        processes, socket_paths = start_workers(args.workers, socket_dir, os.path.abspath(args.store_dir) if args.store_dir else None)
+        try:
+            uvicorn.run(create_router_app(socket_paths), host=args.host, port=args.port)
+        finally:
+            stop_workers(processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Consistent hash ring, maps a game_id to the worker that owns it
+
+import bisect
+import hashlib
+
+VIRTUAL_NODES = 64  # points per worker on the ring, evens out the split
+
+
+def node_name(index: int):
+    """
+    The ring name of the index-th worker. Stable across restarts like the worker's store
+    (shard-{index}.db), unlike its socket path, which is in a new temp dir every start.
+    """
+    return f"worker-{index}"
+
+
+def _hash(key: str):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes: list, virtual_nodes: int = VIRTUAL_NODES):
+        self.nodes = list(nodes)
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(virtual_nodes)
+        )
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str):
+        """
+        The node owning a key: the first point clockwise from the key's hash
+        """
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[index]
@@ -0,0 +1,240 @@
+# Front router for sharded mode
+#
+# Every game lives in exactly one worker process. The router hashes the game_id onto
+# the ring to find that worker and forwards the request over the worker's unix socket.
+# Requests that aren't about a single game (the lobby list, metrics) go to every worker
+# and the answers are merged.
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from uuid import uuid4
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from app.game.game_index import PAGE_SIZE
+from app.services.metrics import REGISTRY, MetricsMiddleware, add_labels, merge, render_text
+from .ring import HashRing, node_name
+
+# headers that only make sense for a single connection, and X-Game-Id, which only the router sets
+REQUEST_SKIP_HEADERS = {"host", "content-length", "connection", "keep-alive", "transfer-encoding", "x-game-id"}
+RESPONSE_SKIP_HEADERS = {"connection", "keep-alive", "transfer-encoding"}
+
+FORWARD_TIMEOUT = 30.0
+
+# the lobby list cursor is one cursor per worker, "end" once a worker has no more games
+CURSOR_SEPARATOR = "."
+CURSOR_END = "end"
+
+
+def shard_key(path: str, body: bytes):
+    """
+    Finds the game a request is about.
+    Returns the game_id, or None if the request isn't about a single game.
+    """
+    parts = path.strip("/").split("/")
+    if len(parts) < 2 or parts[0] != "game":
+        return None
+    if parts[1] == "list":
+        return parts[2] if len(parts) > 2 else None
+    if parts[1] == "register":
+        try:
+            return json.loads(body or b"{}").get("game_id")
+        except (ValueError, AttributeError):
+            return None
+    if len(parts) > 2:
+        return parts[1]
+    return None
+
+
+def create_router_app(socket_paths: list, timeout: float = FORWARD_TIMEOUT):
+    """
+    Builds the front router for workers listening on the given unix sockets, in worker order
+    """
+    # the ring is keyed by worker name, socket paths change on every start
+    sockets = {node_name(i): path for i, path in enumerate(socket_paths)}
+    workers = list(sockets)
+    ring = HashRing(workers)
+    clients = {}  # worker name -> client
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        for worker, path in sockets.items():
+            clients[worker] = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=path), base_url="http://worker", timeout=timeout
+            )
+        yield
+        for client in clients.values():
+            await client.aclose()
+        clients.clear()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.ring = ring
+    app.add_middleware(MetricsMiddleware)
+
+    async def forward(worker: str, request: Request, body: bytes, extra_headers: dict = None):
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in REQUEST_SKIP_HEADERS]
+        headers.extend((extra_headers or {}).items())
+        upstream = clients[worker].build_request(
+            request.method, request.url.path, params=request.query_params, headers=headers, content=body
+        )
+        try:
+            response = await clients[worker].send(upstream, stream=True)
+        except httpx.TransportError as e:
+            return JSONResponse({"detail": f"Worker unavailable: {e}"}, status_code=502)
+
+        # streamed through so event streams and large renders aren't buffered here
+        forwarded = StreamingResponse(
+            response.aiter_raw(), status_code=response.status_code, background=BackgroundTask(response.aclose)
+        )
+        forwarded.raw_headers = [
+            (k.encode("latin-1"), v.encode("latin-1"))
+            for k, v in response.headers.multi_items()
+            if k.lower() not in RESPONSE_SKIP_HEADERS
+        ]
+        return forwarded
+
+    async def fan_out(request: Request, body: bytes):
+        async def ask(worker):
+            response = await clients[worker].request(
+                request.method, request.url.path, params=request.query_params, content=body
+            )
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            return await asyncio.gather(*(ask(worker) for worker in workers))
+        except httpx.HTTPError as e:
+            return JSONResponse({"detail": f"Worker unavailable: {e}"}, status_code=502)
+
+    @app.get("/game/list")
+    async def list_games(request: Request):
+        # every worker pages through its own games, the cursor holds one position per worker
+        cursor = request.query_params.get("cursor")
+        cursors = cursor.split(CURSOR_SEPARATOR) if cursor else [""] * len(workers)
+        if len(cursors) != len(workers):
+            return JSONResponse({"detail": f"Invalid cursor '{cursor}'"}, status_code=400)
+        try:
+            limit = int(request.query_params.get("limit", PAGE_SIZE))
+        except ValueError:
+            return JSONResponse({"detail": "Invalid limit"}, status_code=400)
+        params = {k: v for k, v in request.query_params.items() if k not in ("cursor", "limit")}
+        params["limit"] = max(1, -(-limit // len(workers)))
+
+        async def ask(worker, worker_cursor):
+            if worker_cursor == CURSOR_END:
+                return [], CURSOR_END
+            response = await clients[worker].get(
+                request.url.path, params={**params, "cursor": worker_cursor} if worker_cursor else params
+            )
+            response.raise_for_status()
+            return response.json(), response.headers.get("x-next-cursor", CURSOR_END)
+
+        try:
+            results = await asyncio.gather(*(ask(worker, c) for worker, c in zip(workers, cursors)))
+        except httpx.HTTPStatusError as e:
+            return JSONResponse(e.response.json(), status_code=e.response.status_code)
+        except httpx.HTTPError as e:
+            return JSONResponse({"detail": f"Worker unavailable: {e}"}, status_code=502)
+
+        response = JSONResponse([game for worker_games, _ in results for game in worker_games])
+        next_cursors = [next_cursor for _, next_cursor in results]
+        if any(next_cursor != CURSOR_END for next_cursor in next_cursors):
+            response.headers["X-Next-Cursor"] = CURSOR_SEPARATOR.join(next_cursors)
+        return response
+
+    @app.get("/game/render/metrics")
+    @app.get("/game/hibernation/metrics")
+    async def worker_metrics(request: Request):
+        results = await fan_out(request, b"")
+        if isinstance(results, JSONResponse):
+            return results
+        return dict(zip(workers, results))
+
+    @app.get("/metrics")
+    async def metrics(format: str = "text"):
+        # every worker's metrics labelled with the worker, plus the router's own
+        async def ask(worker):
+            response = await clients[worker].get("/metrics", params={"format": "json"})
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            results = await asyncio.gather(*(ask(worker) for worker in workers))
+        except httpx.HTTPError as e:
+            return JSONResponse({"detail": f"Worker unavailable: {e}"}, status_code=502)
+        families = merge(
+            [add_labels(REGISTRY.collect(), {"worker": "router"})]
+            + [add_labels(families, {"worker": str(i)}) for i, families in enumerate(results)]
+        )
+        if format == "json":
+            return families
+        return PlainTextResponse(render_text(families), media_type="text/plain; version=0.0.4")
+
+    @app.get("/ready")
+    async def ready():
+        # ready once every worker is warm
+        async def ask(worker):
+            try:
+                response = await clients[worker].get("/ready")
+            except httpx.HTTPError as e:
+                return {"ready": False, "error": f"Worker unavailable: {e}"}
+            return response.json()
+
+        statuses = await asyncio.gather(*(ask(worker) for worker in workers))
+        ready = all(status["ready"] for status in statuses)
+        body = {"ready": ready, "workers": dict(zip(workers, statuses))}
+        return JSONResponse(body, status_code=200 if ready else 503)
+
+    @app.get("/profiles")
+    async def list_profiles(request: Request):
+        # every worker profiles the requests it serves
+        headers = {k: v for k, v in request.headers.items() if k.lower() == "x-profile-token"}
+
+        async def ask(worker):
+            return await clients[worker].get("/profiles", headers=headers)
+
+        try:
+            responses = await asyncio.gather(*(ask(worker) for worker in workers))
+        except httpx.HTTPError as e:
+            return JSONResponse({"detail": f"Worker unavailable: {e}"}, status_code=502)
+        for response in responses:
+            if response.status_code != 200:
+                return JSONResponse(response.json(), status_code=response.status_code)
+        profiles = [dict(profile, worker=i) for i, response in enumerate(responses) for profile in response.json()]
+        return sorted(profiles, key=lambda profile: -profile["started"])
+
+    @app.get("/profiles/{profile_id}")
+    async def get_profile(request: Request, profile_id: str):
+        # a profile id doesn't say which worker has it, the one that doesn't answer 404 does
+        for worker in workers:
+            response = await forward(worker, request, b"")
+            if response.status_code != 404 or worker == workers[-1]:
+                return response
+            await response.background()
+
+    @app.post("/game/create")
+    async def create_game(request: Request):
+        # the router picks the id up front so it knows which worker will own the game
+        game_id = str(uuid4())
+        return await forward(ring.node_for(game_id), request, await request.body(), {"X-Game-Id": game_id})
+
+    @app.post("/game/{game_id}/fork")
+    async def fork_game(request: Request, game_id: str):
+        # the fork is built from the parent's game, so it has to live on the parent's worker
+        worker = ring.node_for(game_id)
+        fork_id = str(uuid4())
+        while ring.node_for(fork_id) != worker:
+            fork_id = str(uuid4())
+        return await forward(worker, request, await request.body(), {"X-Game-Id": fork_id})
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"])
+    async def route(request: Request, path: str):
+        body = await request.body()
+        game_id = shard_key(request.url.path, body)
+        # anything not tied to a game is answered the same by every worker
+        worker = ring.node_for(game_id) if game_id else workers[0]
+        return await forward(worker, request, body)
+
+    return app
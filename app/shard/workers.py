@@ -0,0 +1,69 @@
+# Starts and stops the worker processes used in sharded mode
+
+import os
+import subprocess
+import sys
+import time
+import httpx
+from .ring import node_name
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+READY_TIMEOUT = 30.0
+
+
+def start_workers(count: int, socket_dir: str, store_dir: str = None, app: str = "app.main:app"):
+    """
+    Starts count uvicorn workers, each on its own unix socket in socket_dir.
+    Each worker gets its own store file in store_dir, or keeps games in memory if store_dir is None.
+    Blocks until every worker answers /ready.
+
+    Returns: (processes, socket paths)
+    """
+    processes, socket_paths = [], []
+    for i in range(count):
+        socket_path = os.path.join(socket_dir, f"{node_name(i)}.sock")
+        env = dict(os.environ)
+        env["GAME_STORE_PATH"] = os.path.join(store_dir, f"shard-{i}.db") if store_dir else ""
+        # only reachable through the router, which picks game ids with X-Game-Id
+        env["SHARD_WORKER"] = "1"
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", app, "--uds", socket_path, "--log-level", "warning"],
+            cwd=ROOT,
+            env=env,
+        ))
+        socket_paths.append(socket_path)
+
+    try:
+        for process, socket_path in zip(processes, socket_paths):
+            _wait_ready(process, socket_path)
+    except Exception:
+        stop_workers(processes)
+        raise
+    return processes, socket_paths
+
+
+def stop_workers(processes: list):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _wait_ready(process: subprocess.Popen, socket_path: str):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Worker on {socket_path} exited with code {process.returncode}")
+        if os.path.exists(socket_path):
+            try:
+                with httpx.Client(transport=httpx.HTTPTransport(uds=socket_path), base_url="http://worker") as client:
+                    # /ready, so the router only starts forwarding to warm workers
+                    if client.get("/ready").status_code == 200:
+                        return
+            except httpx.TransportError:
+                pass
+        time.sleep(0.05)
+    raise RuntimeError(f"Worker on {socket_path} did not start in {READY_TIMEOUT}s")
@@ -0,0 +1,68 @@
+# Shared helpers for the tests: games with registered players, random play, the app
+# without a store. The benchmark scripts use them as well (see benchmarks/common.py).
+
+import contextlib
+import io
+import os
+import random
+from unittest import mock
+from app.game.game_manager import GameManager, DIPLOMACY_POWERS
+
+
+def import_app():
+    """
+    app.main, with games kept in memory. Importing app.routes opens GAME_STORE_PATH
+    (saves/games.db by default), tests and benchmarks shouldn't write to it.
+    """
+    with mock.patch.dict(os.environ, {"GAME_STORE_PATH": ""}):
+        import app.main
+    return app.main
+
+
+def random_orders(game, power: str, rng: random.Random):
+    """
+    Picks one random legal order for every orderable location of a power.
+    The engine returns orders in set order, they are sorted so a seed always plays the same game.
+    """
+    possible_orders = game.get_all_possible_orders()
+    orders = []
+    for loc in game.get_orderable_locations(power):
+        if possible_orders[loc]:
+            orders.append(rng.choice(sorted(possible_orders[loc])))
+    return orders
+
+
+def new_game(manager: GameManager, game_id: str, players: int = 7):
+    """
+    Creates a game and registers players for the first few powers
+    """
+    with quiet():
+        manager.create_game(game_id=game_id, game_name=game_id, creator_id="bench")
+        for power in DIPLOMACY_POWERS[:players]:
+            manager.register_player(game_id, f"{game_id}-{power}", power, power)
+
+
+def play_phases(manager: GameManager, game_id: str, phases: int, rng: random.Random):
+    """
+    Plays random orders for every registered power and resolves, phase after phase.
+    Stops early if the game ends.
+    """
+    data = manager._get_game_data(game_id)
+    with quiet():
+        for _ in range(phases):
+            game = manager._get_game_object(game_id)
+            if game.is_game_done:
+                break
+            for player_id, player in data["players"].items():
+                manager.submit_orders(game_id, player_id, random_orders(game, player["power"], rng))
+            manager.resolve_game_phase(game_id)
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Swallows what the engine prints to stdout (game.process() prints the order errors
+    it clears), so it doesn't clutter test output or skew timings
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
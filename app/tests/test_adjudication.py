@@ -0,0 +1,130 @@
+import random
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from app.game.game_manager import GameManager
+from app.game.automation import GameAutomation
+from app.game.adjudication import adjudication_pool
+from app.tests.helpers import new_game, random_orders, quiet
+
+class TestBatchResolve(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = adjudication_pool(workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def _play(self, manager, game_id, seed, phases, executor=None):
+        rng = random.Random(seed)
+        with quiet():
+            for _ in range(phases):
+                game = manager._get_game_object(game_id)
+                if game.is_game_done:
+                    break
+                for player_id, player in manager._get_game_data(game_id)["players"].items():
+                    manager.submit_orders(game_id, player_id, random_orders(game, player["power"], rng))
+                if executor is None:
+                    manager.resolve_game_phase(game_id)
+                else:
+                    result = manager.resolve_games([game_id], executor)[game_id]
+                    self.assertTrue(result["success"])
+
+    def test_matches_sequential_resolve(self):
+        for seed in (1, 2):
+            sequential, batched = GameManager(), GameManager()
+            new_game(sequential, "game")
+            new_game(batched, "game")
+            self._play(sequential, "game", seed, 40)
+            self._play(batched, "game", seed, 40, self.pool)
+
+            a, b = sequential._get_game_object("game"), batched._get_game_object("game")
+            self.assertEqual(b.get_current_phase(), a.get_current_phase())
+            self.assertEqual(b.get_state()["units"], a.get_state()["units"])
+            self.assertEqual(b.get_state()["centers"], a.get_state()["centers"])
+            self.assertEqual(list(b.order_history.keys()), list(a.order_history.keys()))
+            self.assertEqual(
+                {str(phase): {unit: [str(r) for r in res] for unit, res in results.items()} for phase, results in b.result_history.items()},
+                {str(phase): {unit: [str(r) for r in res] for unit, res in results.items()} for phase, results in a.result_history.items()},
+            )
+
+    def test_resolves_many_games_on_process_pool(self):
+        manager = GameManager()
+        game_ids = [f"game-{i}" for i in range(4)]
+        for game_id in game_ids:
+            new_game(manager, game_id, players=0)
+        with quiet():
+            results = manager.resolve_games(game_ids + ["missing"], self.pool)
+
+        self.assertFalse(results["missing"]["success"])
+        for game_id in game_ids:
+            self.assertEqual(results[game_id]["phase"], "S1901M")
+            self.assertEqual(results[game_id]["next_phase"], "F1901M")
+            self.assertEqual(manager.get_game_state(game_id)["revision"], 1)
+
+    def test_orders_changed_during_adjudication(self):
+        manager = GameManager()
+        new_game(manager, "game")
+        slow = ThreadPoolExecutor(max_workers=1)
+
+        class Interfering:
+            # a player submits while the phase is out on the pool
+            def submit(self, fn, payload):
+                with quiet():
+                    manager.submit_orders("game", "game-FRANCE", ["A PAR - BUR"])
+                return slow.submit(fn, payload)
+
+        with quiet():
+            result = manager.resolve_games(["game"], Interfering())["game"]
+        slow.shutdown()
+
+        self.assertTrue(result["success"])
+        game = manager._get_game_object("game")
+        self.assertIn("A BUR", game.get_units("FRANCE"))
+
+    def test_phase_resolved_during_adjudication(self):
+        manager = GameManager()
+        new_game(manager, "game")
+        slow = ThreadPoolExecutor(max_workers=1)
+
+        class Resolving:
+            # a /resolve comes in while the phase is out on the pool
+            def submit(self, fn, payload):
+                with quiet():
+                    manager.resolve_game_phase("game")
+                return slow.submit(fn, payload)
+
+        with quiet():
+            result = manager.resolve_games(["game"], Resolving())["game"]
+        slow.shutdown()
+
+        self.assertTrue(result["success"])
+        self.assertTrue(result["already_resolved"])
+        self.assertEqual(result["phase"], "S1901M")
+        self.assertEqual(result["next_phase"], "F1901M")
+        self.assertEqual(manager._get_game_object("game").get_current_phase(), "F1901M")
+        self.assertEqual(manager.get_game_state("game")["revision"], 1)
+
+    def test_automation_batches_due_games(self):
+        manager = GameManager()
+        for game_id in ("a", "b"):
+            new_game(manager, game_id, players=0)
+        automation = GameAutomation(manager, executor=self.pool)
+        with quiet():
+            automation.start_automation("a", interval=0.05)
+            automation.start_automation("b", interval=0.05)
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                if all(manager._get_game_object(g).get_current_phase() != "S1901M" for g in ("a", "b")):
+                    break
+                time.sleep(0.02)
+            automation.stop_automation("a")
+            automation.stop_automation("b")
+        automation.scheduler.shutdown()
+
+        for game_id in ("a", "b"):
+            self.assertNotEqual(manager._get_game_object(game_id).get_current_phase(), "S1901M")
+
+if __name__ == '__main__':
+    unittest.main()
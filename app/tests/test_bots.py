@@ -0,0 +1,61 @@
+import random
+import unittest
+from app.game.game_manager import GameManager
+from app.game.bots import BotEngine, POLICIES
+from app.tests.helpers import new_game, quiet
+
+class TestBotEngine(unittest.TestCase):
+    def _play(self, policy, phases):
+        """Plays a game with only dummy powers and checks every phase is fully ordered."""
+        manager = GameManager(bot_policy=policy)
+        manager.bots.rng = random.Random(1)
+        new_game(manager, "bots", players=0)
+        game = manager._get_game_object("bots")
+        with quiet():
+            for _ in range(phases):
+                if game.is_game_done:
+                    break
+                manager._create_bot_orders("bots")
+                index = manager._get_order_index("bots")
+                for power in game.powers.values():
+                    orders = game.get_orders(power.name)
+                    legal = set(index.power_orders(power.name))
+                    self.assertTrue(all(order in legal for order in orders), orders)
+                    if game.get_current_phase()[-1] == "A":
+                        self.assertLessEqual(len(orders), abs(len(power.centers) - len(power.units)))
+                    else:
+                        self.assertEqual(len(orders), len(index.unit_orders(power.name)))
+                manager.resolve_game_phase("bots")
+        return game
+
+    def test_every_unit_gets_an_order(self):
+        for policy in POLICIES:
+            with self.subTest(policy=policy):
+                self._play(policy, 25)
+
+    def test_only_dummy_powers(self):
+        manager = GameManager()
+        new_game(manager, "bots", players=3)
+        with quiet():
+            manager._create_bot_orders("bots")
+        orders = manager.get_orders("bots")
+        self.assertEqual(orders["AUSTRIA"], [])
+        self.assertEqual(len(orders["TURKEY"]), 3)
+
+    def test_greedy_takes_neutral_centers(self):
+        game = self._play("greedy", 2)
+        centers = sum(len(power.centers) for power in game.powers.values())
+        self.assertGreater(centers, 22)
+
+    def test_greedy_does_not_bounce_itself(self):
+        manager = GameManager()
+        new_game(manager, "bots", players=0)
+        game = manager._get_game_object("bots")
+        bots = BotEngine("greedy", random.Random(1))
+        orders = bots.create_orders(game, manager._get_order_index("bots"), game.powers)
+        for power_orders in orders.values():
+            moves = [order.split()[3][:3] for order in power_orders if order.split()[2] == "-"]
+            self.assertEqual(len(moves), len(set(moves)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import random
+import threading
+import unittest
+from app.game.game_manager import GameManager, DIPLOMACY_POWERS
+from app.tests.helpers import new_game, random_orders, quiet
+
+class TestPerGameSerialization(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.errors = []
+
+    def _hammer(self, game_id: str, seed: int, rounds: int):
+        rng = random.Random(seed)
+        try:
+            for _ in range(rounds):
+                action = rng.random()
+                power = rng.choice(DIPLOMACY_POWERS)
+                if action < 0.5:
+                    with self.manager._game_lock(game_id):
+                        orders = random_orders(self.manager._get_game_object(game_id), power, rng)
+                    self.manager.submit_orders(game_id, f"{game_id}-{power}", orders)
+                elif action < 0.6:
+                    self.manager.resolve_game_phase(game_id)
+                elif action < 0.7:
+                    self.manager._create_bot_orders(game_id)
+                elif action < 0.85:
+                    self.assertTrue(self.manager.get_game_state(game_id)["success"])
+                else:
+                    self.manager._get_power_orders(game_id, power)
+        except Exception as e:
+            self.errors.append(e)
+
+    def _check_board(self, game_id: str):
+        """No two units on the same province and no supply center owned twice."""
+        state = self.manager.get_game_state(game_id)["state"]
+        provinces = [unit[2:5] for units in state["units"].values() for unit in units if not unit.startswith("*")]
+        centers = [center for centers in state["centers"].values() for center in centers]
+        self.assertEqual(len(provinces), len(set(provinces)))
+        self.assertEqual(len(centers), len(set(centers)))
+
+    def _run(self, game_ids, threads_per_game: int, rounds: int):
+        threads = [
+            threading.Thread(target=self._hammer, args=(game_id, i * 100 + j, rounds))
+            for i, game_id in enumerate(game_ids)
+            for j in range(threads_per_game)
+        ]
+        with quiet():
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(self.errors, [])
+        for game_id in game_ids:
+            self._check_board(game_id)
+
+    def test_one_game_many_threads(self):
+        new_game(self.manager, "game", players=7)
+        self._run(["game"], threads_per_game=8, rounds=150)
+
+    def test_many_games_many_threads(self):
+        game_ids = [f"game-{i}" for i in range(8)]
+        for game_id in game_ids:
+            new_game(self.manager, game_id, players=7)
+        self._run(game_ids, threads_per_game=2, rounds=60)
+
+    def test_concurrent_create_is_exclusive(self):
+        results = []
+        def create():
+            results.append(self.manager.create_game("game", "game", "creator")["success"])
+        threads = [threading.Thread(target=create) for _ in range(8)]
+        with quiet():
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(results.count(True), 1)
+
+    def test_locks_are_not_kept(self):
+        new_game(self.manager, "game")
+        for i in range(100):
+            self.manager.get_game_state(f"made-up-{i}")
+        self.manager.get_game_state("game")
+        self.assertEqual(len(self.manager._locks), 0)
+        # while held, everyone gets the same lock
+        lock = self.manager._game_lock("game")
+        with lock:
+            self.assertIs(self.manager._game_lock("game"), lock)
+            self.assertEqual(len(self.manager._locks), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import unittest
+from app.game.game_manager import GameManager
+from app.services.events import EventBus, RESYNC
+from app.tests.helpers import new_game, quiet
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.bus = EventBus(queue_size=4)
+        self.manager.add_listener(self.bus.publish)
+        new_game(self.manager, "test_game", players=1)
+
+    def test_events_from_other_threads_reach_every_subscriber(self):
+        async def scenario():
+            first = self.bus.subscribe("test_game")
+            second = self.bus.subscribe("test_game")
+            other = self.bus.subscribe("other_game")
+
+            def play():
+                with quiet():
+                    self.manager.submit_orders("test_game", "test_game-AUSTRIA", ["A VIE - GAL"])
+                    self.manager.resolve_game_phase("test_game")
+            await asyncio.get_running_loop().run_in_executor(None, play)
+
+            events = [await asyncio.wait_for(first.get(), 1) for _ in range(2)]
+            self.assertIn(b"event: orders_submitted", events[0])
+            self.assertIn(b"event: phase_resolved", events[1])
+            self.assertIn(b'"next_phase": "F1901M"', events[1])
+            # encoded once, the same bytes go to every subscriber
+            self.assertIs(await second.get(), events[0])
+            self.assertTrue(other.queue.empty())
+
+        asyncio.run(scenario())
+
+    def test_slow_subscriber_gets_resync(self):
+        async def scenario():
+            slow = self.bus.subscribe("test_game")
+            for _ in range(10):
+                self.bus.publish("test_game", "orders_submitted", {})
+            await asyncio.sleep(0)
+            queued = [slow.queue.get_nowait() for _ in range(slow.queue.qsize())]
+            self.assertIn(RESYNC, queued)
+            self.assertLessEqual(len(queued), 4)
+
+            self.bus.unsubscribe(slow)
+            self.assertEqual(self.bus.subscriber_count(), 0)
+
+        asyncio.run(scenario())
+
+    def test_publish_without_subscribers_is_free(self):
+        self.bus.publish("test_game", "orders_submitted", {})
+        self.assertEqual(self.bus.published, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import random
+import unittest
+from app.game.game_manager import GameManager
+from app.tests.helpers import new_game, play_phases, quiet
+
+class TestForking(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id)
+        play_phases(self.manager, self.game_id, 10, random.Random(5))
+        self.parent = self.manager._get_game_object(self.game_id)
+        # the parent holds a unit, the fork will move it
+        possible = self.parent.get_all_possible_orders()
+        self.unit = sorted(self.parent.get_units("FRANCE"))[0]
+        loc = self.unit[2:5]
+        self.hold = f"{self.unit} H"
+        self.move = next(order for order in sorted(possible[loc]) if " - " in order)
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-FRANCE", [self.hold])
+
+    def test_fork_shares_history_and_copies_the_board(self):
+        result = self.manager.fork_game(self.game_id, "fork", "analyst")
+        self.assertTrue(result["success"])
+        fork = self.manager._get_game_object("fork")
+
+        self.assertEqual(result["phase"], self.parent.get_current_phase())
+        self.assertEqual(fork.get_state()["units"], self.parent.get_state()["units"])
+        self.assertEqual(fork.get_orders(), self.parent.get_orders())
+        for phase in self.parent.state_history.keys():
+            self.assertIs(fork.state_history[phase], self.parent.state_history[phase])
+            self.assertIs(fork.order_history[phase], self.parent.order_history[phase])
+        self.assertIs(fork.map, self.parent.map)
+
+        # the fork seats nobody unless asked to
+        self.assertEqual(self.manager.games["fork"]["players"], {})
+        self.assertEqual(len(self.manager.get_unassigned_powers("fork")), 7)
+        kept = self.manager.fork_game(self.game_id, "fork-2", "analyst", keep_players=True)
+        self.assertTrue(kept["success"])
+        self.assertEqual(self.manager.games["fork-2"]["players"], self.manager.games[self.game_id]["players"])
+
+    def test_branches_play_on_independently(self):
+        self.manager.fork_game(self.game_id, "fork", "analyst")
+        fork = self.manager._get_game_object("fork")
+        played = len(self.parent.state_history)
+        parent_phases = self.manager.get_phase_history(self.game_id)["phases"]
+
+        with quiet():
+            fork.set_orders("FRANCE", [self.move])
+            self.manager.resolve_game_phase("fork")
+        self.assertEqual(len(fork.state_history), played + 1)
+        self.assertEqual(len(self.parent.state_history), played)
+        self.assertNotEqual(fork.get_current_phase(), self.parent.get_current_phase())
+        self.assertEqual(self.manager.get_phase_history(self.game_id)["phases"], parent_phases)
+
+        with quiet():
+            self.manager.resolve_game_phase(self.game_id)
+        self.assertEqual(fork.get_current_phase(), self.parent.get_current_phase())
+        self.assertNotEqual(fork.get_state()["units"]["FRANCE"], self.parent.get_state()["units"]["FRANCE"])
+
+        # the fork's history is the parent's up to the fork, then its own
+        fork_phases = self.manager.get_phase_history("fork")["phases"]
+        self.assertEqual(fork_phases[:-1], parent_phases)
+        entry = self.manager.get_history_phase("fork", fork_phases[-1])
+        self.assertEqual(entry["orders"]["FRANCE"], [self.move])
+        entry = self.manager.get_history_phase(self.game_id, fork_phases[-1])
+        self.assertEqual(entry["orders"]["FRANCE"], [self.hold])
+
+    def test_errors(self):
+        self.assertFalse(self.manager.fork_game("missing", "fork", "analyst")["success"])
+        self.manager.fork_game(self.game_id, "fork", "analyst")
+        self.assertFalse(self.manager.fork_game(self.game_id, "fork", "analyst")["success"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from app.game.game_manager import GameManager
+from app.game.game_index import GameIndex
+from app.tests.helpers import new_game, quiet
+
+class TestGameListing(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        with quiet():
+            for i in range(25):
+                self.manager.create_game(game_id=f"game-{i}", game_name=f"game-{i}", creator_id="alice" if i % 2 else "bob")
+            for i in range(5):
+                for power in ("AUSTRIA", "ENGLAND", "FRANCE", "GERMANY", "ITALY", "RUSSIA", "TURKEY"):
+                    self.manager.register_player(f"game-{i}", f"{power}-{i}", power, power)
+            self.manager.register_player("game-20", "carol", "carol", "FRANCE")
+            self.manager.start_game("game-21")
+
+    def _all_pages(self, limit, **filters):
+        game_ids, cursor = [], None
+        while True:
+            page = self.manager.list_games(limit=limit, cursor=cursor, **filters)
+            self.assertLessEqual(len(page["games"]), limit)
+            game_ids.extend(game["game_id"] for game in page["games"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return game_ids
+
+    def test_pages_newest_first(self):
+        first = self.manager.list_games(limit=10)
+        self.assertEqual([game["game_id"] for game in first["games"]], [f"game-{i}" for i in range(24, 14, -1)])
+        self.assertEqual(self._all_pages(10), [f"game-{i}" for i in range(24, -1, -1)])
+
+    def test_filters(self):
+        self.assertEqual(self._all_pages(4, creator_id="alice"), [f"game-{i}" for i in range(23, 0, -2)])
+        self.assertEqual(self._all_pages(4, player_id="carol"), ["game-20"])
+        self.assertEqual(self._all_pages(4, status="active"), ["game-21"])
+        self.assertEqual(self._all_pages(4, open_seats=False), [f"game-{i}" for i in range(4, -1, -1)])
+        self.assertEqual(self._all_pages(3, creator_id="bob", open_seats=True), [f"game-{i}" for i in range(24, 5, -2)])
+        self.assertEqual(self._all_pages(3, creator_id="nobody"), [])
+
+    def test_summary(self):
+        game = self.manager.list_games(limit=1, player_id="carol")["games"][0]
+        self.assertEqual(game["open_seats"], 6)
+        self.assertEqual(game["status"], "forming")
+
+    def test_index_follows_resolve(self):
+        manager = GameManager()
+        new_game(manager, "done", players=0)
+        game = manager._get_game_object("done")
+        with quiet():
+            manager.start_game("done")
+            # a win needs 18 centers, and taking one that year: France sits in SPA with 17 others
+            for power in game.powers:
+                game.set_units(power, [], reset=True)
+            game.set_units("FRANCE", ["A SPA"])
+            game.set_centers("FRANCE", [center for center in game.map.scs if center != "SPA"][:17])
+            manager.resolve_game_phase("done")
+            manager.resolve_game_phase("done")
+        self.assertTrue(game.is_game_done)
+        self.assertEqual(manager.list_games(status="completed")["games"][0]["game_id"], "done")
+        self.assertEqual(manager.list_games(status="active")["games"], [])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.manager.list_games(cursor="abc")
+
+class TestGameIndex(unittest.TestCase):
+    def test_moves_between_indexes(self):
+        index = GameIndex()
+        index.update("a", "alice", [], "forming", 7)
+        index.update("b", "alice", ["p1"], "forming", 6)
+        index.update("a", "alice", ["p1"], "active", 0)
+        self.assertEqual(index.query(10, status="forming"), (["b"], None))
+        self.assertEqual(index.query(10, player_id="p1"), (["b", "a"], None))
+        self.assertEqual(index.query(10, open_seats=False), (["a"], None))
+        self.assertEqual(len(index), 2)
+
+if __name__ == '__main__':
+    unittest.main()
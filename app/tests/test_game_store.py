@@ -0,0 +1,85 @@
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from diplomacy.utils.export import to_saved_game_format
+from app.game.game_manager import GameManager
+from app.game.store import GameStore
+from app.tests.helpers import new_game, play_phases
+
+class TestGameStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "games.db")
+        self.store = GameStore(self.path, keyframe_interval=5)
+        self.manager = GameManager(store=self.store)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _reopen(self):
+        self.store.close()
+        self.store = GameStore(self.path, keyframe_interval=5)
+        manager = GameManager(store=self.store)
+        manager.load_games()
+        return manager
+
+    def test_restart_restores_games(self):
+        """Games, players and phases survive a restart, including compacted keyframes."""
+        new_game(self.manager, "g1", players=3)
+        play_phases(self.manager, "g1", 12, random.Random(1))
+        before = to_saved_game_format(self.manager._get_game_object("g1"))
+
+        manager = self._reopen()
+        after = to_saved_game_format(manager._get_game_object("g1"))
+        self.store.close()
+
+        # get_state() stamps the current phase with the time it was called
+        for saved_game in (before, after):
+            saved_game["phases"][-1]["state"].pop("timestamp")
+        self.assertEqual(before["phases"], after["phases"])
+        self.assertEqual(manager.get_game("g1"), self.manager.get_game("g1"))
+        game = manager._get_game_object("g1")
+        self.assertEqual(game.get_power("AUSTRIA").get_controller(), "g1-AUSTRIA")
+
+    def test_submitted_orders_are_saved(self):
+        new_game(self.manager, "g1", players=1)
+        self.manager.submit_orders("g1", "g1-AUSTRIA", ["A VIE - GAL"])
+
+        manager = self._reopen()
+        orders = manager.get_orders("g1")
+        self.store.close()
+        self.assertEqual(orders["AUSTRIA"], ["A VIE - GAL"])
+
+    def test_failed_write_loses_no_phases(self):
+        new_game(self.manager, "g1", players=3)
+        play_phases(self.manager, "g1", 1, random.Random(1))
+        self.store.flush()
+
+        write_batch = self.store._write_batch
+        def fail_once(records):
+            self.store._write_batch = write_batch
+            raise sqlite3.OperationalError("disk I/O error")
+        self.store._write_batch = fail_once
+        with self.assertLogs("app.game.store", "ERROR"):
+            play_phases(self.manager, "g1", 1, random.Random(2))
+            self.store.flush()
+        play_phases(self.manager, "g1", 1, random.Random(3))
+        self.store.flush()
+
+        game = self.manager._get_game_object("g1")
+        saved_game = self.store.load("g1")
+        self.store.close()
+        phases = [str(phase) for phase in game.state_history.keys()] + [game.get_current_phase()]
+        self.assertEqual([phase["name"] for phase in saved_game["phases"]], phases)
+
+    def test_save_game_without_store(self):
+        manager = GameManager()
+        new_game(manager, "g1", players=0)
+        self.assertFalse(manager.save_game("g1")["success"])
+        self.store.close()
+
+if __name__ == '__main__':
+    unittest.main()
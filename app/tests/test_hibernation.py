@@ -0,0 +1,116 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+from diplomacy.utils.export import to_saved_game_format
+from app.game.game_manager import GameManager
+from app.game.store import GameStore
+from app.tests.helpers import new_game, play_phases, random_orders, quiet
+
+def saved_phases(game):
+    saved_game = to_saved_game_format(game)
+    for phase in saved_game["phases"]:
+        phase["state"].pop("timestamp", None)
+    return saved_game["phases"]
+
+class TestHibernation(unittest.TestCase):
+    def test_hibernated_games_play_the_same(self):
+        """Games that hibernate between every call end up exactly where resident ones do."""
+        resident, hibernating = GameManager(), GameManager(max_resident_games=1)
+        for manager in (resident, hibernating):
+            manager.bots.rng = random.Random(1)
+            for game_id in ("a", "b"):
+                new_game(manager, game_id, players=4)
+            with quiet():
+                for game_id in ("a", "b"):
+                    rng = random.Random(game_id)
+                    for _ in range(12):
+                        # the other game is touched in between, so this one is always rebuilt
+                        manager._get_game_object("b" if game_id == "a" else "a")
+                        for player_id, player in manager._get_game_data(game_id)["players"].items():
+                            orders = random_orders(manager._get_game_object(game_id), player["power"], rng)
+                            manager._get_game_object("b" if game_id == "a" else "a")
+                            manager.submit_orders(game_id, player_id, orders)
+                        manager._get_game_object("b" if game_id == "a" else "a")
+                        manager._create_bot_orders(game_id)
+                        manager.resolve_game_phase(game_id)
+
+        for game_id in ("a", "b"):
+            self.assertEqual(saved_phases(hibernating._get_game_object(game_id)), saved_phases(resident._get_game_object(game_id)))
+            self.assertEqual(hibernating._get_game_object(game_id).get_power("AUSTRIA").controller.last_value(), f"{game_id}-AUSTRIA")
+        metrics = hibernating.get_hibernation_metrics()
+        self.assertEqual(metrics["resident"], 1)
+        self.assertEqual(metrics["hibernated"], 1)
+        self.assertGreater(metrics["evictions"], 50)
+        self.assertGreater(metrics["rehydrations"], 50)
+        self.assertGreater(metrics["rehydrate_ms"]["p50"], 0)
+
+    def test_listing_does_not_wake_games(self):
+        manager = GameManager(max_resident_games=1)
+        new_game(manager, "a")
+        new_game(manager, "b")
+        with quiet():
+            manager.start_game("a")
+            manager.start_game("b")
+        self.assertNotIn("game", manager.games["a"])
+        rehydrations = manager.get_hibernation_metrics()["rehydrations"]
+        page = manager.list_games(status="active")
+        self.assertEqual([game["game_id"] for game in page["games"]], ["b", "a"])
+        self.assertEqual(manager.get_hibernation_metrics()["rehydrations"], rehydrations)
+
+    def test_old_revisions_get_full_state(self):
+        manager = GameManager(max_resident_games=1)
+        new_game(manager, "a")
+        epoch = manager.get_game_state("a")["epoch"]
+        with quiet():
+            manager.submit_orders("a", "a-AUSTRIA", ["A VIE - GAL"])
+            manager.submit_orders("a", "a-FRANCE", ["A PAR - BUR"])
+        new_game(manager, "b")
+        state = manager.get_game_state("a", since=1, epoch=epoch)
+        self.assertEqual(state["revision"], 2)
+        self.assertIn("state", state)
+        self.assertFalse(manager.get_game_state("a", since=2, epoch=epoch)["changed"])
+
+    def test_busy_games_stay_resident(self):
+        manager = GameManager(max_resident_games=1)
+        new_game(manager, "a")
+        locked, release = threading.Event(), threading.Event()
+
+        def hold():
+            with manager._game_lock("a"):
+                locked.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        locked.wait(5)
+        new_game(manager, "b")
+        self.assertIn("game", manager.games["a"])
+        release.set()
+        thread.join()
+        new_game(manager, "c")
+        self.assertNotIn("game", manager.games["a"])
+
+    def test_load_beyond_budget_stays_hibernated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "games.db")
+            store = GameStore(path)
+            manager = GameManager(store=store)
+            for game_id in ("a", "b", "c"):
+                new_game(manager, game_id, players=2)
+                play_phases(manager, game_id, 3, random.Random(game_id))
+            before = saved_phases(manager._get_game_object("a"))
+            store.close()
+
+            store = GameStore(path)
+            manager = GameManager(store=store, max_resident_games=1)
+            self.assertEqual(manager.load_games(), 3)
+            self.assertEqual(manager.get_hibernation_metrics()["hibernated"], 2)
+            self.assertEqual(len(manager.list_games()["games"]), 3)
+            after = saved_phases(manager._get_game_object("a"))
+            store.close()
+        self.assertEqual(before, after)
+
+if __name__ == '__main__':
+    unittest.main()
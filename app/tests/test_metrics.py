@@ -0,0 +1,122 @@
+import asyncio
+import io
+import json
+import logging
+import unittest
+import httpx
+from fastapi import FastAPI
+from app.game.game_manager import GameManager, ORDER_SUBMISSIONS, ORDERS, RESOLUTIONS, METHOD_LATENCY
+from app.services.logs import JsonFormatter
+from app.services.metrics import Registry, MetricsMiddleware, HTTP_LATENCY, HTTP_RESPONSES, add_labels, merge, render_text
+from app.tests.helpers import new_game, quiet
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            latency.observe(value, "/a")
+        [family] = registry.collect()
+        [sample] = family["samples"]
+        self.assertEqual(sample["buckets"], [["0.1", 1], ["1.0", 3], ["+Inf", 4]])
+        self.assertEqual(sample["count"], 4)
+        self.assertAlmostEqual(sample["sum"], 6.05)
+
+        text = render_text(registry.collect())
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_count{route="/a"} 4', text)
+        # JSON-able, e.g. for the shard router
+        json.dumps(registry.collect(), allow_nan=False)
+
+    def test_counters_gauges_and_registration(self):
+        registry = Registry()
+        counter = registry.counter("things_total", "Things")
+        self.assertIn("things_total 0", render_text(registry.collect()))
+        counter.inc(amount=2)
+        self.assertIs(registry.counter("things_total", "Things"), counter)
+        with self.assertRaises(ValueError):
+            registry.gauge("things_total", "Things")
+
+        registry.gauge("games", "Games", ("state",), function=lambda: {("resident",): 3, ("hibernated",): 1})
+        text = render_text(registry.collect())
+        self.assertIn("things_total 2", text)
+        self.assertIn('games{state="resident"} 3', text)
+        self.assertIn('games{state="hibernated"} 1', text)
+
+    def test_merging_processes(self):
+        first, second = Registry(), Registry()
+        first.counter("hits_total", "Hits").inc()
+        second.counter("hits_total", "Hits").inc(amount=2)
+        families = merge([add_labels(first.collect(), {"worker": "0"}), add_labels(second.collect(), {"worker": "1"})])
+        text = render_text(families)
+        self.assertEqual(text.count("# TYPE hits_total counter"), 1)
+        self.assertIn('hits_total{worker="0"} 1', text)
+        self.assertIn('hits_total{worker="1"} 2', text)
+
+    def test_game_manager_calls_and_counters(self):
+        manager = GameManager()
+        new_game(manager, "test_game", players=1)
+        before = (ORDER_SUBMISSIONS.value("accepted"), ORDER_SUBMISSIONS.value("rejected"), ORDERS.value(), RESOLUTIONS.value())
+        resolves = METHOD_LATENCY.count("resolve_game_phase")
+        with quiet():
+            manager.submit_orders("test_game", "test_game-AUSTRIA", ["A VIE - GAL", "F TRI H"])
+            manager.submit_orders("test_game", "test_game-AUSTRIA", ["A VIE - PAR"])
+            manager.resolve_game_phase("test_game")
+        after = (ORDER_SUBMISSIONS.value("accepted"), ORDER_SUBMISSIONS.value("rejected"), ORDERS.value(), RESOLUTIONS.value())
+        self.assertEqual([b - a for a, b in zip(before, after)], [1, 1, 2, 1])
+        self.assertEqual(METHOD_LATENCY.count("resolve_game_phase"), resolves + 1)
+
+    def test_requests_are_timed_by_route(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/things/{thing_id}")
+        def get_thing(thing_id: str):
+            return {"thing_id": thing_id}
+
+        async def scenario():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await client.get("/things/a")
+                await client.get("/things/b")
+                await client.get("/missing")
+
+        before = HTTP_LATENCY.count("GET", "/things/{thing_id}")
+        asyncio.run(scenario())
+        self.assertEqual(HTTP_LATENCY.count("GET", "/things/{thing_id}"), before + 2)
+        self.assertGreaterEqual(HTTP_RESPONSES.value("GET", "unmatched", "404"), 1)
+
+class TestLogging(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        handler = logging.StreamHandler(self.stream)
+        handler.setFormatter(JsonFormatter())
+        self.logger = logging.getLogger("app.game.game_manager")
+        self.saved = (self.logger.handlers, self.logger.level, self.logger.propagate)
+        self.logger.handlers = [handler]
+        self.logger.propagate = False
+
+    def tearDown(self):
+        self.logger.handlers, self.logger.level, self.logger.propagate = self.saved
+
+    def test_json_lines_with_fields(self):
+        self.logger.setLevel(logging.INFO)
+        manager = GameManager()
+        manager.create_game(game_id="test_game", game_name="test", creator_id="me")
+        entry = json.loads(self.stream.getvalue().splitlines()[-1])
+        self.assertEqual(entry["message"], "game created")
+        self.assertEqual(entry["game_id"], "test_game")
+        self.assertEqual(entry["creator_id"], "me")
+        self.assertEqual(entry["level"], "INFO")
+
+    def test_orders_are_only_logged_at_debug(self):
+        manager = GameManager()
+        self.logger.setLevel(logging.INFO)
+        new_game(manager, "test_game", players=1)
+        manager.submit_orders("test_game", "test_game-AUSTRIA", ["A VIE - GAL"])
+        self.assertNotIn("orders submitted", self.stream.getvalue())
+
+        self.logger.setLevel(logging.DEBUG)
+        manager.submit_orders("test_game", "test_game-AUSTRIA", ["A VIE - GAL"])
+        entry = json.loads(self.stream.getvalue().splitlines()[-1])
+        self.assertEqual(entry["orders"], ["A VIE - GAL"])
+        self.assertEqual(entry["power"], "AUSTRIA")
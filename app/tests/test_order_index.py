@@ -0,0 +1,37 @@
+import unittest
+from app.game.game_manager import GameManager
+from app.tests.helpers import new_game, quiet
+
+class TestOrderIndex(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id, players=0)
+
+    def test_orders_belong_to_power_units(self):
+        """Only orders issued by the power's own units are returned, not orders that mention them."""
+        orders = self.manager._get_power_orders(self.game_id, "GERMANY")
+        self.assertIn("A MUN - BUR", orders)
+        self.assertIn("F KIE - HOL", orders)
+        self.assertTrue(all(order[:5] in ("A BER", "A MUN", "F KIE") for order in orders))
+
+    def test_orders_grouped_by_unit(self):
+        unit_orders = self.manager.get_power_unit_orders(self.game_id, "RUSSIA")
+        self.assertEqual(set(unit_orders), {"A MOS", "A WAR", "F SEV", "F STP/SC"})
+        self.assertIn("F STP/SC - BOT", unit_orders["F STP/SC"])
+
+    def test_unknown_power(self):
+        self.assertEqual(self.manager._get_power_orders(self.game_id, "NARNIA"), [])
+
+    def test_index_cached_until_phase_changes(self):
+        first = self.manager._get_order_index(self.game_id)
+        self.assertIs(first, self.manager._get_order_index(self.game_id))
+
+        with quiet():
+            self.manager.resolve_game_phase(self.game_id)
+        second = self.manager._get_order_index(self.game_id)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.phase, "F1901M")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+from app.game.game_manager import GameManager
+from app.game.phase_history import PhaseHistory
+from app.game.snapshot import decode_game, encode_game
+from app.tests.helpers import new_game, random_orders, quiet
+
+class TestPhaseHistory(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id)
+        self.game = self.manager._get_game_object(self.game_id)
+        players = self.manager._get_game_data(self.game_id)["players"]
+        rng = random.Random(3)
+        with quiet():
+            for _ in range(20):
+                for player_id, player in players.items():
+                    self.manager.submit_orders(self.game_id, player_id, random_orders(self.game, player["power"], rng))
+                self.manager.resolve_game_phase(self.game_id)
+
+    def assertMatchesEngine(self, entry, game):
+        phase = next(key for key in game.state_history.keys() if str(key) == entry["phase"])
+        self.assertEqual(entry["state"], game.state_history[phase])
+        self.assertEqual(entry["orders"], game.order_history[phase])
+        results = {unit: [str(result) for result in unit_results] for unit, unit_results in game.result_history[phase].items()}
+        self.assertEqual(entry["results"], results)
+
+    def test_every_phase_is_rebuilt(self):
+        result = self.manager.get_phase_history(self.game_id)
+        phases = [str(phase) for phase in self.game.state_history.keys()]
+        self.assertEqual(result["phases"], phases)
+        self.assertGreater(len(phases), 2 * PhaseHistory().interval)
+
+        for phase in reversed(phases):
+            entry = self.manager.get_history_phase(self.game_id, phase)
+            self.assertTrue(entry["success"])
+            self.assertMatchesEngine(entry, self.game)
+
+        missing = self.manager.get_history_phase(self.game_id, self.game.get_current_phase())
+        self.assertFalse(missing["success"])
+
+    def test_built_from_a_restored_game(self):
+        game = decode_game(encode_game(self.game))
+        history = PhaseHistory.from_game(game)
+        self.assertEqual(history.phases, self.manager.get_phase_history(self.game_id)["phases"])
+        self.assertMatchesEngine(history.get(history.phases[9]), game)
+        self.assertGreater(history.size(), 0)
+
+    def test_served_while_hibernated(self):
+        phase = self.manager.get_phase_history(self.game_id)["phases"][5]
+        self.manager._hibernate(self.game_id)
+        rehydrations = self.manager.hibernation.rehydrations
+        entry = self.manager.get_history_phase(self.game_id, phase)
+        self.assertEqual(entry["phase"], phase)
+        self.assertEqual(self.manager.hibernation.rehydrations, rehydrations)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import random
+import unittest
+from app.game.game_manager import GameManager
+from app.tests.helpers import new_game, play_phases, random_orders, quiet
+
+class TestPreview(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id)
+        self.game = self.manager._get_game_object(self.game_id)
+
+    def test_preview_leaves_the_game_alone(self):
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-FRANCE", ["A PAR - BUR", "A MAR - BUR"])
+            self.manager.submit_orders(self.game_id, "test_game-GERMANY", ["A MUN - BUR"])
+        # get_state() stamps the time it was called
+        board = lambda: {key: value for key, value in self.game.get_state().items() if key != "timestamp"}
+        state, orders = board(), self.game.get_orders()
+        revision = self.manager._get_game_data(self.game_id)["revisions"].revision
+
+        preview = self.manager.preview_phase(self.game_id)
+        self.assertTrue(preview["success"])
+        self.assertEqual(preview["phase"], "S1901M")
+        self.assertEqual(preview["next_phase"], "F1901M")
+        self.assertEqual(preview["bounces"], ["A MAR", "A MUN", "A PAR"])
+        self.assertEqual(sorted(preview["orders"]["ITALY"]), ["A ROM H", "A VEN H", "F NAP H"])
+
+        self.assertEqual(board(), state)
+        self.assertEqual(self.game.get_orders(), orders)
+        self.assertEqual(len(self.game.state_history), 0)
+        self.assertEqual(self.manager._get_game_data(self.game_id)["revisions"].revision, revision)
+
+    def test_preview_matches_resolution(self):
+        rng = random.Random(7)
+        play_phases(self.manager, self.game_id, 6, rng)
+        players = self.manager._get_game_data(self.game_id)["players"]
+        with quiet():
+            for player_id, player in players.items():
+                self.manager.submit_orders(self.game_id, player_id, random_orders(self.game, player["power"], rng))
+            preview = self.manager.preview_phase(self.game_id)
+            self.manager.resolve_game_phase(self.game_id)
+
+        state = self.game.get_state()
+        self.assertEqual(preview["next_phase"], self.game.get_current_phase())
+        self.assertEqual(preview["units"], {power: [u for u in units if u[0] != "*"] for power, units in state["units"].items()})
+        self.assertEqual(preview["centers"], state["centers"])
+        last = self.game.result_history.last_key()
+        self.assertEqual(preview["results"], {u: [str(r) for r in rs] for u, rs in self.game.result_history[last].items()})
+
+    def test_cached_by_board_and_orders(self):
+        first = self.manager.preview_phase(self.game_id)
+        self.manager.preview_phase(self.game_id)
+        self.assertEqual(self.manager.preview_cache.hits, 1)
+        self.assertEqual(self.manager.preview_cache.misses, 1)
+
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-FRANCE", ["A PAR - BUR"])
+        moved = self.manager.preview_phase(self.game_id)
+        self.assertEqual(self.manager.preview_cache.misses, 2)
+        self.assertNotEqual(first["units"]["FRANCE"], moved["units"]["FRANCE"])
+        self.assertIn("A BUR", moved["units"]["FRANCE"])
+
+if __name__ == '__main__':
+    unittest.main()
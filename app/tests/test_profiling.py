@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+import httpx
+from fastapi import APIRouter, FastAPI
+from app.game.game_manager import GameManager
+from app.services.profiling import ProfiledRoute, ProfileStore, ProfilingMiddleware, load_stats, render_folded
+from app.tests.helpers import new_game, quiet
+
+TOKEN = "secret"
+
+def build_app(store: ProfileStore, **kwargs):
+    manager = GameManager()
+    new_game(manager, "test_game", players=1)
+    router = APIRouter(route_class=ProfiledRoute)
+
+    @router.post("/{game_id}/resolve")
+    def resolve_phase(game_id: str):
+        manager.resolve_game_phase(game_id)
+        return {"phase": manager._get_game_object(game_id).get_current_phase()}
+
+    @router.get("/{game_id}/phase")
+    async def get_phase(game_id: str):
+        return {"phase": manager._get_game_object(game_id).get_current_phase()}
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, **kwargs)
+    app.include_router(router, prefix="/game")
+    return app
+
+def requests(app, calls):
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return [await client.request(method, url, headers=headers) for method, url, headers in calls]
+    with quiet():
+        return asyncio.run(scenario())
+
+class TestProfiling(unittest.TestCase):
+    def test_header_profiles_the_request(self):
+        store = ProfileStore()
+        app = build_app(store, token=TOKEN)
+        plain, wrong, profiled = requests(app, [
+            ("POST", "/game/test_game/resolve", {}),
+            ("POST", "/game/test_game/resolve", {"X-Profile": "guess"}),
+            ("POST", "/game/test_game/resolve", {"X-Profile": TOKEN}),
+        ])
+        self.assertEqual([r.status_code for r in (plain, wrong, profiled)], [200, 200, 200])
+        self.assertNotIn("x-profile-id", plain.headers)
+        self.assertNotIn("x-profile-id", wrong.headers)
+
+        [summary] = store.list()
+        self.assertEqual(profiled.headers["x-profile-id"], summary["id"])
+        self.assertEqual(summary["route"], "/game/{game_id}/resolve")
+        self.assertEqual(summary["trigger"], "header")
+        self.assertEqual(summary["status"], 200)
+
+        # the sync endpoint ran in the threadpool and was still profiled, down into the engine
+        profile = store.get(summary["id"])
+        functions = {name for _, _, name in load_stats(profile).stats}
+        self.assertIn("resolve_phase", functions)
+        self.assertIn("process", functions)
+
+        folded = render_folded(profile).splitlines()
+        self.assertTrue(folded)
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in folded))
+        self.assertTrue(any(line.startswith("resolve_phase (") for line in folded))
+
+    def test_sampling_and_ring_buffer(self):
+        store = ProfileStore(capacity=2)
+        app = build_app(store, token=TOKEN, sample_rate=2)
+        responses = requests(app, [("GET", "/game/test_game/phase", {})] * 8)
+        ids = [r.headers.get("x-profile-id") for r in responses]
+        self.assertEqual([profile_id is not None for profile_id in ids], [False, True] * 4)
+        # only the latest two are kept, newest first
+        self.assertEqual([summary["id"] for summary in store.list()], [ids[7], ids[5]])
+        self.assertIsNone(store.get(ids[1]))
+        self.assertEqual(store.list()[0]["trigger"], "sample")
+
+    def test_disabled_by_default(self):
+        store = ProfileStore()
+        app = build_app(store)
+        [response] = requests(app, [("GET", "/game/test_game/phase", {"X-Profile": TOKEN})])
+        self.assertNotIn("x-profile-id", response.headers)
+        self.assertEqual(store.list(), [])
+
+    def test_sampling_needs_a_token(self):
+        store = ProfileStore()
+        app = build_app(store, sample_rate=1)
+        # the middleware is built on the first request
+        with self.assertLogs("app.services.profiling", "WARNING"):
+            responses = requests(app, [("GET", "/game/test_game/phase", {})] * 3)
+        self.assertTrue(all("x-profile-id" not in r.headers for r in responses))
+        self.assertEqual(store.list(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from app.game.game_manager import GameManager
+from app.game.render_cache import RenderCache
+from app.tests.helpers import new_game
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id, players=1)
+
+    def test_render_is_cached_until_orders_change(self):
+        svg, etag = self.manager.render_game_with_etag(self.game_id)
+        self.assertTrue(svg.lstrip().startswith("<?xml") or "<svg" in svg)
+        self.assertEqual(self.manager.get_render_etag(self.game_id), etag)
+
+        again, _ = self.manager.render_game_with_etag(self.game_id)
+        self.assertIs(svg, again)
+        self.assertEqual(self.manager.render_cache.hits, 1)
+
+        self.manager.submit_orders(self.game_id, "test_game-AUSTRIA", ["A VIE - GAL"])
+        self.assertNotEqual(self.manager.get_render_etag(self.game_id), etag)
+        changed, _ = self.manager.render_game_with_etag(self.game_id)
+        self.assertNotEqual(svg, changed)
+
+    def test_lru_eviction_by_size(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put(("a",), "1234")
+        cache.put(("b",), "1234")
+        cache.get(("a",))
+        cache.put(("c",), "1234")
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(cache.get(("a",)), "1234")
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(cache.evictions, 1)
+
+if __name__ == '__main__':
+    unittest.main()
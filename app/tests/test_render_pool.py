@@ -0,0 +1,38 @@
+import asyncio
+import unittest
+from app.game.game_manager import GameManager
+from app.game.render_pool import RenderPool, RenderPoolFull, render_payload
+from app.tests.helpers import new_game
+
+class TestRenderPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = RenderPool(workers=1, max_queue=0, timeout=30)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        self.manager = GameManager()
+        new_game(self.manager, "test_game", players=1)
+        self.manager.submit_orders("test_game", "test_game-AUSTRIA", ["A VIE - GAL", "F TRI - ADR"])
+        self.game = self.manager._get_game_object("test_game")
+
+    def test_worker_render_matches_engine(self):
+        completed = self.pool.completed
+        svg = asyncio.run(self.pool.render(render_payload(self.game)))
+        self.assertEqual(svg.decode("utf-8"), self.manager.render_game("test_game"))
+        self.assertEqual(self.pool.get_metrics()["completed"], completed + 1)
+
+    def test_full_queue_rejects(self):
+        async def render_twice():
+            payload = render_payload(self.game)
+            return await asyncio.gather(self.pool.render(payload), self.pool.render(payload), return_exceptions=True)
+
+        results = asyncio.run(render_twice())
+        self.assertIsInstance(results[1], RenderPoolFull)
+        self.assertEqual(self.pool.in_flight, 0)
+
+if __name__ == '__main__':
+    unittest.main()
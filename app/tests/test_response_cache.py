@@ -0,0 +1,85 @@
+import gzip
+import json
+import unittest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.game.game_manager import GameManager
+from app.game.models.pydantic import GameStateResponse, GameSummaryResponse, SuccessResponse
+from app.game.response_cache import ResponseCache, brotli, parse_accept_encoding
+from app.tests.helpers import new_game, quiet
+
+def pydantic_body(model, body: bytes):
+    # what the route sent before, going through the response model
+    return JSONResponse(jsonable_encoder(model(**json.loads(body)))).body
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id)
+
+    def test_bodies_match_the_response_models(self):
+        state = self.manager.get_state_response(self.game_id).body
+        self.assertEqual(state, pydantic_body(GameStateResponse, state))
+        self.assertEqual(json.loads(state)["revision"], 0)
+        orders = self.manager.get_orders_response(self.game_id).body
+        self.assertEqual(orders, pydantic_body(SuccessResponse, orders))
+        summary = self.manager.get_game_response(self.game_id).body
+        self.assertEqual(summary, pydantic_body(GameSummaryResponse, summary))
+        self.assertIsNone(self.manager.get_state_response("missing"))
+        self.assertIsNone(self.manager.get_game_response("missing"))
+
+    def test_encoded_once_per_revision(self):
+        first = self.manager.get_state_response(self.game_id)
+        self.assertIs(self.manager.get_state_response(self.game_id), first)
+
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-FRANCE", ["A PAR - BUR"])
+        second = self.manager.get_state_response(self.game_id)
+        self.assertIsNot(second, first)
+        self.assertEqual(json.loads(second.body)["revision"], 1)
+        orders = json.loads(self.manager.get_orders_response(self.game_id).body)["data"]["orders"]
+        self.assertEqual(orders["FRANCE"], ["A PAR - BUR"])
+        # one entry per game and kind, the old revision is replaced
+        self.assertEqual(len(self.manager.response_cache), 2)
+
+    def test_summary_follows_players(self):
+        self.manager.create_game("lobby", "Lobby", "creator")
+        before = json.loads(self.manager.get_game_response("lobby").body)
+        self.assertEqual(before["players"], {})
+        self.manager.register_player("lobby", "p1", "Player 1", "ITALY")
+        after = json.loads(self.manager.get_game_response("lobby").body)
+        self.assertEqual(after["players"], {"p1": {"power": "ITALY", "name": "Player 1"}})
+
+    def test_compressed_variants(self):
+        encoded = self.manager.get_state_response(self.game_id)
+        encoding, body = encoded.variant("gzip, deflate")
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(gzip.decompress(body), encoded.body)
+        self.assertIs(encoded.variant("gzip")[1], body)
+        self.assertEqual(encoded.variant("identity"), (None, encoded.body))
+        self.assertEqual(encoded.variant(""), (None, encoded.body))
+        # refused codings are never sent, whatever else is in the header
+        self.assertEqual(encoded.variant("gzip;q=0"), (None, encoded.body))
+        self.assertEqual(encoded.variant("identity, gzip;q=0"), (None, encoded.body))
+        self.assertEqual(encoded.variant("*;q=0.5, gzip;q=0")[0], "br" if brotli else None)
+        self.assertEqual(encoded.variant("deflate, *;q=0.1")[0], "br" if brotli else "gzip")
+        self.assertEqual(encoded.variant("br;q=0.2, GZIP;q=0.8")[0], "gzip")
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding("gzip, br;q=0.5"), {"gzip": 1.0, "br": 0.5})
+        self.assertEqual(parse_accept_encoding(" gzip ; q=0 , identity"), {"gzip": 0.0, "identity": 1.0})
+        self.assertEqual(parse_accept_encoding("gzip;q=bad,,"), {"gzip": 0.0})
+
+    def test_bounded_by_size(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.put(("a",), "x" * 40)
+        cache.put(("b",), "x" * 40)
+        cache.put(("c",), "x" * 40)
+        self.assertIsNone(cache.get(("a",)))
+        self.assertIsNotNone(cache.get(("c",)))
+        self.assertLessEqual(cache.size, 100)
+        self.assertIsNone(cache.get(("c",), version=1))
+
+if __name__ == "__main__":
+    unittest.main()
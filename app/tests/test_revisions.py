@@ -0,0 +1,55 @@
+import unittest
+from app.game.game_manager import GameManager
+from app.tests.helpers import new_game, quiet
+
+class TestStateRevisions(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id, players=1)
+        self.epoch = self.manager.get_game_state(self.game_id)["epoch"]
+
+    def test_full_state_without_since(self):
+        result = self.manager.get_game_state(self.game_id)
+        self.assertEqual(result["revision"], 0)
+        self.assertIn("units", result["state"])
+
+    def test_unchanged_since_current_revision(self):
+        result = self.manager.get_game_state(self.game_id, since=0, epoch=self.epoch)
+        self.assertFalse(result["changed"])
+
+    def test_orders_since_revision(self):
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-AUSTRIA", ["A VIE - GAL"])
+        result = self.manager.get_game_state(self.game_id, since=0, epoch=self.epoch)
+        self.assertEqual(result["revision"], 1)
+        self.assertEqual(result["changes"], {"orders": {"AUSTRIA": ["A VIE - GAL"]}})
+
+    def test_units_and_phase_since_revision(self):
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-AUSTRIA", ["A VIE - GAL"])
+            self.manager.resolve_game_phase(self.game_id)
+        changes = self.manager.get_game_state(self.game_id, since=1, epoch=self.epoch)["changes"]
+        self.assertEqual(changes["phase"], "F1901M")
+        self.assertEqual(changes["units"]["AUSTRIA"], {"added": ["A GAL"], "removed": ["A VIE"]})
+        self.assertEqual(changes["orders"]["AUSTRIA"], [])
+
+    def test_unknown_revision_gets_full_state(self):
+        result = self.manager.get_game_state(self.game_id, since=42, epoch=self.epoch)
+        self.assertIn("state", result)
+
+    def test_revision_from_another_epoch_gets_full_state(self):
+        # e.g. a client that polled this game before a restart, its revision 0 was another board
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-AUSTRIA", ["A VIE - GAL"])
+        for epoch in (None, "00000000"):
+            result = self.manager.get_game_state(self.game_id, since=1, epoch=epoch)
+            self.assertIn("state", result)
+            self.assertEqual(result["epoch"], self.epoch)
+        other = GameManager()
+        new_game(other, self.game_id, players=1)
+        self.assertNotEqual(other.get_game_state(self.game_id)["epoch"], self.epoch)
+        self.assertIn("state", other.get_game_state(self.game_id, since=0, epoch=self.epoch))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import threading
+import time
+import unittest
+from app.game.game_manager import GameManager
+from app.game.automation import GameAutomation
+from app.game.scheduler import PhaseScheduler
+from app.tests.helpers import new_game, quiet
+
+class TestPhaseScheduler(unittest.TestCase):
+    def setUp(self):
+        self.fired = []
+        self.event = threading.Event()
+        self.scheduler = PhaseScheduler(self._on_due, workers=1)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def _on_due(self, game_id):
+        self.fired.append(game_id)
+        self.event.set()
+
+    def test_fires_in_deadline_order(self):
+        self.scheduler.schedule("late", 0.06)
+        self.scheduler.schedule("early", 0.02)
+        time.sleep(0.15)
+        self.assertEqual(self.fired, ["early", "late"])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_cancel_is_immediate(self):
+        self.scheduler.schedule("game", 0.05)
+        self.assertIn("game", self.scheduler)
+        self.assertTrue(self.scheduler.cancel("game"))
+        self.assertFalse(self.event.wait(0.15))
+        self.assertFalse(self.scheduler.cancel("game"))
+
+    def test_reschedule_replaces_deadline(self):
+        self.scheduler.schedule("game", 5)
+        self.scheduler.schedule("game", 0.01)
+        self.assertTrue(self.event.wait(1))
+        self.assertEqual(self.fired, ["game"])
+
+class TestGameAutomation(unittest.TestCase):
+    def test_resolves_phases_until_stopped(self):
+        manager = GameManager()
+        new_game(manager, "test_game", players=0)
+        automation = GameAutomation(manager)
+        with quiet():
+            automation.start_automation("test_game", interval=0.02)
+            time.sleep(0.3)
+            automation.stop_automation("test_game")
+            phase = manager._get_game_object("test_game").get_current_phase()
+            time.sleep(0.1)
+        automation.scheduler.shutdown()
+
+        self.assertNotEqual(phase, "S1901M")
+        self.assertEqual(manager._get_game_object("test_game").get_current_phase(), phase)
+        self.assertNotIn("test_game", automation.running_games)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.sessions import SessionCache, InvalidSession, AuthUnavailable
+from app.tests.helpers import import_app
+
+VALID = {"good-token": {"$id": "user-1", "name": "Player 1"}, "other-token": {"$id": "user-2", "name": "Player 2"}}
+
+class StubAppwrite(BaseHTTPRequestHandler):
+    # GET /v1/account the way Appwrite answers it, counting the calls and connections
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+    wbufsize = 65536  # headers and body in one write, or delayed acks stall every reused connection
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.calls += 1
+            server.connections.add(self.client_address)
+        time.sleep(server.delay)
+        user = VALID.get(self.headers.get("X-Appwrite-Session"))
+        if self.path != "/v1/account" or self.headers.get("X-Appwrite-Project") != "project":
+            status, body = 404, {"message": "not found"}
+        elif server.down:
+            status, body = 500, {"message": "down"}
+        elif user is None:
+            status, body = 401, {"message": "User (role: guests) missing scope (account)"}
+        else:
+            status, body = 200, user
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class TestSessionCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubAppwrite)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.calls = 0
+        self.server.connections = set()
+        self.server.delay = 0
+        self.server.down = False
+        self.now = 0.0
+        self.sessions = SessionCache(self.endpoint, "project", ttl=60, invalid_ttl=5, max_entries=2, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.sessions.close()
+
+    def test_valid_sessions_are_cached(self):
+        for _ in range(5):
+            self.assertEqual(self.sessions.validate("good-token")["$id"], "user-1")
+        self.assertEqual(self.server.calls, 1)
+
+        self.now = 61
+        self.sessions.validate("good-token")
+        self.assertEqual(self.server.calls, 2)
+        self.sessions.invalidate("good-token")
+        self.sessions.validate("good-token")
+        self.assertEqual(self.server.calls, 3)
+        # every call went over the one pooled connection
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_invalid_sessions(self):
+        for _ in range(3):
+            with self.assertRaises(InvalidSession):
+                self.sessions.validate("made-up")
+        self.assertEqual(self.server.calls, 1)
+        self.now = 6
+        with self.assertRaises(InvalidSession):
+            self.sessions.validate("made-up")
+        self.assertEqual(self.server.calls, 2)
+
+    def test_outages_are_not_cached(self):
+        self.server.down = True
+        with self.assertRaises(AuthUnavailable):
+            self.sessions.validate("good-token")
+        self.server.down = False
+        self.assertEqual(self.sessions.validate("good-token")["$id"], "user-1")
+        self.assertEqual(self.server.calls, 2)
+
+        unreachable = SessionCache("http://127.0.0.1:1/v1", "project")
+        with self.assertRaises(AuthUnavailable):
+            unreachable.validate("good-token")
+        unreachable.close()
+
+    def test_least_recently_used_go_first(self):
+        self.sessions.validate("good-token")
+        self.sessions.validate("other-token")
+        self.sessions.validate("good-token")
+        with self.assertRaises(InvalidSession):
+            self.sessions.validate("made-up")
+        self.assertEqual(len(self.sessions), 2)
+        self.sessions.validate("good-token")
+        self.assertEqual(self.server.calls, 3)
+        self.sessions.validate("other-token")
+        self.assertEqual(self.server.calls, 4)
+
+    def test_concurrent_checks_share_one_request(self):
+        self.server.delay = 0.2
+        users, errors = [], []
+
+        def check(token):
+            try:
+                users.append(self.sessions.validate(token)["$id"])
+            except InvalidSession:
+                errors.append(token)
+
+        threads = [threading.Thread(target=check, args=(token,)) for token in ["good-token"] * 10 + ["made-up"] * 5]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(users, ["user-1"] * 10)
+        self.assertEqual(errors, ["made-up"] * 5)
+        self.assertEqual(self.server.calls, 2)
+
+    def test_invalidate_during_check(self):
+        self.server.delay = 0.2
+        checking = threading.Thread(target=self.sessions.validate, args=("good-token",))
+        checking.start()
+        deadline = time.monotonic() + 5
+        while self.server.calls == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.sessions.invalidate("good-token")
+        checking.join()
+        self.assertEqual(len(self.sessions), 0)
+        self.server.delay = 0
+        self.sessions.validate("good-token")
+        self.assertEqual(self.server.calls, 2)
+
+    def test_session_route(self):
+        from fastapi.testclient import TestClient
+        from app.services import appwrite_client
+        app = import_app().app
+        env = {"APPWRITE_ENDPOINT": self.endpoint, "APPWRITE_PROJECT_ID": "project"}
+        with mock.patch.dict(os.environ, env), TestClient(app) as client:
+            appwrite_client._shared.cache_clear()
+            try:
+                for _ in range(3):
+                    response = client.get("/auth/session", headers={"X-Appwrite-Session": "good-token"})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json()["data"]["user_id"], "user-1")
+                response = client.get("/auth/session", headers={"X-Appwrite-Session": "made-up"})
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(client.get("/auth/session").status_code, 422)
+            finally:
+                appwrite_client._shared("session_cache").close()
+                appwrite_client._shared.cache_clear()
+        self.assertEqual(self.server.calls, 2)
+
+if __name__ == "__main__":
+    unittest.main()
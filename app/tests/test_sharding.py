@@ -0,0 +1,166 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+import httpx
+from fastapi.testclient import TestClient
+from app.tests.helpers import import_app
+from app.shard import HashRing, create_router_app, node_name, start_workers, stop_workers
+from app.shard.router import shard_key
+
+class TestHashRing(unittest.TestCase):
+    def test_stable_and_balanced(self):
+        ring = HashRing(["a", "b", "c"])
+        owners = [ring.node_for(f"game-{i}") for i in range(3000)]
+        self.assertEqual(owners, [ring.node_for(f"game-{i}") for i in range(3000)])
+        for node in ("a", "b", "c"):
+            self.assertGreater(owners.count(node), 600)
+
+    def test_adding_a_node_moves_few_games(self):
+        before = HashRing(["a", "b", "c"])
+        after = HashRing(["a", "b", "c", "d"])
+        moved = sum(before.node_for(f"game-{i}") != after.node_for(f"game-{i}") for i in range(3000))
+        self.assertLess(moved, 1200)
+
+    def test_ring_survives_new_socket_dirs(self):
+        # sockets are in a new temp dir every start, games must still go to the worker with their store
+        before = create_router_app([f"/tmp/shards-a/worker-{i}.sock" for i in range(4)]).state.ring
+        after = create_router_app([f"/tmp/shards-b/worker-{i}.sock" for i in range(4)]).state.ring
+        for i in range(1000):
+            self.assertEqual(before.node_for(f"game-{i}"), after.node_for(f"game-{i}"))
+
+    def test_shard_key(self):
+        self.assertEqual(shard_key("/game/abc/state", b""), "abc")
+        self.assertEqual(shard_key("/game/list/abc", b""), "abc")
+        self.assertEqual(shard_key("/game/register", b'{"game_id": "abc"}'), "abc")
+        self.assertIsNone(shard_key("/game/list", b""))
+        self.assertIsNone(shard_key("/ping", b""))
+
+class TestGameIds(unittest.TestCase):
+    def test_single_process_ignores_x_game_id(self):
+        with TestClient(import_app().app) as client:
+            first = client.post("/game/create", json={"game_name": "first", "creator_id": "a"}).json()["game_id"]
+            response = client.post("/game/create", json={"game_name": "second", "creator_id": "b"}, headers={"X-Game-Id": first})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.json()["game_id"], first)
+            self.assertEqual(client.get(f"/game/list/{first}").json()["game_name"], "first")
+
+    def test_duplicate_id_from_the_router(self):
+        from app.routes import game
+        with TestClient(import_app().app) as client, mock.patch.object(game, "SHARD_WORKER", True):
+            response = client.post("/game/create", json={"game_name": "g", "creator_id": "a"}, headers={"X-Game-Id": "taken"})
+            self.assertEqual(response.json()["game_id"], "taken")
+            response = client.post("/game/create", json={"game_name": "g2", "creator_id": "b"}, headers={"X-Game-Id": "taken"})
+            self.assertEqual(response.status_code, 409)
+            self.assertIn("already exists", response.json()["detail"])
+
+class TestShardedWorkers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.socket_dir = tempfile.TemporaryDirectory()
+        os.environ["PROFILE_TOKEN"] = "test-token"
+        try:
+            cls.processes, cls.socket_paths = start_workers(2, cls.socket_dir.name)
+        finally:
+            del os.environ["PROFILE_TOKEN"]
+
+    @classmethod
+    def tearDownClass(cls):
+        stop_workers(cls.processes)
+        cls.socket_dir.cleanup()
+
+    async def _scenario(self):
+        app = create_router_app(self.socket_paths)
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://router") as client:
+                game_ids = []
+                for i in range(6):
+                    response = await client.post("/game/create", json={"game_name": f"g{i}", "creator_id": "me"})
+                    self.assertEqual(response.status_code, 200)
+                    game_ids.append(response.json()["game_id"])
+
+                for game_id in game_ids:
+                    response = await client.post("/game/register", json={
+                        "game_id": game_id, "player_id": "p1", "player_name": "p1", "power": "FRANCE"
+                    })
+                    self.assertEqual(response.status_code, 200)
+                    response = await client.post(f"/game/{game_id}/orders", json={"player_id": "p1", "orders": ["A PAR - BUR"]})
+                    self.assertEqual(response.status_code, 200)
+                    response = await client.get(f"/game/list/{game_id}")
+                    self.assertEqual(response.json()["players"]["p1"]["power"], "FRANCE")
+
+                # ids are the router's to pick, a client's X-Game-Id doesn't get through
+                response = await client.post(
+                    "/game/create", json={"game_name": "mine", "creator_id": "me"}, headers={"X-Game-Id": game_ids[0]}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response.json()["game_id"], game_ids[0])
+                game_ids.append(response.json()["game_id"])
+
+                listed = await client.get("/game/list")
+                self.assertEqual(sorted(game["game_id"] for game in listed.json()), sorted(game_ids))
+
+                # paging through the router visits every game once
+                paged, cursor = [], None
+                while True:
+                    params = {"limit": 2, "cursor": cursor} if cursor else {"limit": 2}
+                    response = await client.get("/game/list", params=params)
+                    self.assertLessEqual(len(response.json()), 2)
+                    paged.extend(game["game_id"] for game in response.json())
+                    cursor = response.headers.get("x-next-cursor")
+                    if cursor is None:
+                        break
+                self.assertEqual(sorted(paged), sorted(game_ids))
+
+                # a fork lives on its parent's worker and is routed there
+                response = await client.post(f"/game/{game_ids[0]}/fork", json={"creator_id": "me"})
+                self.assertEqual(response.status_code, 200)
+                fork_id = response.json()["game_id"]
+                self.assertEqual(app.state.ring.node_for(fork_id), app.state.ring.node_for(game_ids[0]))
+                response = await client.get(f"/game/{fork_id}/state")
+                self.assertEqual(response.status_code, 200)
+                game_ids.append(fork_id)
+
+                # the profile lives on the worker that served the request
+                response = await client.post(f"/game/{game_ids[-1]}/resolve", headers={"X-Profile": "test-token"})
+                profile_id = response.headers["x-profile-id"]
+                response = await client.get("/profiles", headers={"X-Profile-Token": "test-token"})
+                self.assertEqual([profile["id"] for profile in response.json()], [profile_id])
+                response = await client.get(f"/profiles/{profile_id}", headers={"X-Profile-Token": "test-token"})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.content)
+                response = await client.get("/profiles", headers={"X-Profile-Token": "wrong"})
+                self.assertEqual(response.status_code, 403)
+
+                # workers are only handed back by start_workers once warm
+                response = await client.get("/ready")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(sorted(response.json()["workers"]), ["worker-0", "worker-1"])
+
+                # metrics from every worker, labelled with the worker
+                response = await client.get("/metrics")
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('diplomacy_games{worker="0"}', response.text)
+                self.assertIn('diplomacy_games{worker="1"}', response.text)
+                self.assertEqual(response.text.count("# TYPE diplomacy_games gauge"), 1)
+
+        # each game lives only on the worker the ring picked
+        ring = app.state.ring
+        for i, socket_path in enumerate(self.socket_paths):
+            async with httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=socket_path), base_url="http://worker") as worker:
+                local = {game["game_id"] for game in (await worker.get("/game/list")).json()}
+            self.assertEqual(local, {game_id for game_id in game_ids if ring.node_for(game_id) == node_name(i)})
+
+        # a worker refuses an id it already has instead of reporting it created
+        async with httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=self.socket_paths[0]), base_url="http://worker") as worker:
+            taken = next(game_id for game_id in game_ids if ring.node_for(game_id) == node_name(0))
+            response = await worker.post("/game/create", json={"game_name": "again", "creator_id": "someone"}, headers={"X-Game-Id": taken})
+            self.assertEqual(response.status_code, 409)
+
+    def test_games_are_routed_to_their_owner(self):
+        asyncio.run(self._scenario())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import random
+import unittest
+from diplomacy.engine.game import Game
+from diplomacy.utils.export import to_saved_game_format
+from app.game import snapshot
+from app.game.adjudication import power_orders, engine_fields
+from app.game.game_manager import GameManager
+from app.tests.helpers import new_game, play_phases
+
+def saved(game):
+    # the current phase's state is built on the fly, with a fresh timestamp
+    saved_game = to_saved_game_format(game)
+    saved_game["phases"][-1]["state"].pop("timestamp")
+    return saved_game
+
+def played_game(phases, seed=1):
+    manager = GameManager()
+    manager.bots.rng = random.Random(seed)
+    new_game(manager, "g")
+    play_phases(manager, "g", phases, random.Random(seed))
+    return manager._get_game_object("g")
+
+class TestSnapshot(unittest.TestCase):
+    def test_values_round_trip(self):
+        value = {
+            "text": "A PAR - BUR",
+            "unicode": "Österreich ⚔",
+            "empty": "",
+            "ints": [0, 1, -1, 63, -64, 2**40, -(2**70)],
+            "floats": [0.5, -1e300],
+            "flags": [True, False, None],
+            "nested": {"a": [{"b": []}, {}], "A PAR": "A PAR"},
+            1: "int key",
+        }
+        for compression in ("none", "zlib"):
+            self.assertEqual(snapshot.loads(snapshot.dumps(value, compression)), value)
+        # bools don't come back as ints
+        self.assertIs(snapshot.loads(snapshot.dumps([True]))[0], True)
+
+    def test_strings_are_stored_once(self):
+        units = ["A PAR", "F BRE", "A MAR"] * 200
+        self.assertLess(len(snapshot.dumps(units, "none")), len(units) * 2 + 40)
+
+    def test_games_round_trip_exactly(self):
+        for phases in (0, 7, 25):
+            game = played_game(phases)
+            for compression in ("none", "zlib"):
+                copy = snapshot.decode_game(snapshot.encode_game(game, compression))
+                self.assertEqual(saved(copy), saved(game))
+                self.assertEqual(power_orders(copy), power_orders(game))
+                self.assertEqual(engine_fields(copy), engine_fields(game))
+                self.assertEqual(copy.get_hash(), game.get_hash())
+
+    def test_waived_builds_survive(self):
+        game = Game()
+        game.set_current_phase("W1901A")
+        game.set_units("FRANCE", [])
+        game.set_orders("FRANCE", ["A PAR B", "WAIVE"])
+        copy = snapshot.decode_game(snapshot.encode_game(game))
+        self.assertEqual(power_orders(copy)["FRANCE"], power_orders(game)["FRANCE"])
+        self.assertIn("WAIVE", copy.get_power("FRANCE").adjust)
+
+    def test_saved_games_decode(self):
+        game = played_game(5)
+        copy = snapshot.decode_game(snapshot.encode_saved_game(to_saved_game_format(game)))
+        self.assertEqual(saved(copy), saved(game))
+
+    def test_bad_input(self):
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.loads(b"{}")
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.dumps({}, "lzma")
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.dumps({"game": object()})
+
+        # truncated or corrupt blobs, compressed or not
+        game = snapshot.encode_game(played_game(2), "none")
+        for blob in (game[:len(game) // 2], game[:9], game[:5], snapshot.encode_game(played_game(2))[:-10]):
+            with self.assertRaises(snapshot.SnapshotError):
+                snapshot.loads(blob)
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.loads(snapshot.MAGIC + bytes((snapshot.VERSION, snapshot.ZLIB)) + b"not zlib")
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.loads(snapshot.dumps("\u00e9", "none").replace("\u00e9".encode(), b"\xff\xfe"))
+
+    @unittest.skipIf(snapshot.zstandard is None, "zstandard not installed")
+    def test_zstd(self):
+        game = played_game(7)
+        copy = snapshot.decode_game(snapshot.encode_game(game, "zstd"))
+        self.assertEqual(saved(copy), saved(game))
+
+    @unittest.skipIf(snapshot.zstandard is not None, "zstandard installed")
+    def test_zstd_needs_zstandard(self):
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.dumps({}, "zstd")
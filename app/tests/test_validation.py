@@ -0,0 +1,116 @@
+import unittest
+from app.game.game_manager import GameManager
+from app.game.validation import normalize_order
+from app.tests.helpers import new_game, quiet
+
+class TestOrderValidation(unittest.TestCase):
+    def setUp(self):
+        self.manager = GameManager()
+        self.game_id = "test_game"
+        new_game(self.manager, self.game_id)
+
+    def _check(self, power, orders):
+        return self.manager.check_orders(self.game_id, power, orders)
+
+    def test_normalize(self):
+        self.assertEqual(normalize_order("  f stp(sc)->bot "), "F STP/SC - BOT")
+        self.assertEqual(normalize_order("a par-bur"), "A PAR - BUR")
+        self.assertEqual(normalize_order("F MAO - SPA (nc)"), "F MAO - SPA/NC")
+        self.assertEqual(normalize_order("a   mun s a par -  bur"), "A MUN S A PAR - BUR")
+
+    def test_accepts_loose_notation(self):
+        results = self._check("RUSSIA", ["f stp(sc) -> bot", "a mos  h", "A WAR-GAL"])
+        self.assertTrue(all(result["valid"] for result in results))
+        self.assertEqual([result["normalized"] for result in results], ["F STP/SC - BOT", "A MOS H", "A WAR - GAL"])
+
+    def test_coast_can_be_left_out_when_unambiguous(self):
+        result = self._check("RUSSIA", ["F STP - BOT"])[0]
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["normalized"], "F STP/SC - BOT")
+
+    def test_ambiguous_coast(self):
+        with quiet():
+            self.manager._get_game_object(self.game_id).set_units("FRANCE", ["F MAO"], reset=True)
+        result = self._check("FRANCE", ["F MAO - SPA"])[0]
+        self.assertFalse(result["valid"])
+        self.assertIn("F MAO - SPA/NC", result["reason"])
+        self.assertTrue(self._check("FRANCE", ["F MAO - SPA/SC"])[0]["valid"])
+
+    def test_reject_reasons(self):
+        results = self._check("GERMANY", ["A PAR - BUR", "A MUN - SPA", "", "A BER - KIE", "A BER H"])
+        self.assertEqual([result["valid"] for result in results], [False, False, False, True, False])
+        self.assertIn("nothing to order in PAR", results[0]["reason"])
+        self.assertIn("not a legal order for A MUN", results[1]["reason"])
+        self.assertEqual(results[2]["reason"], "empty order")
+        self.assertEqual(results[4]["reason"], "A BER already has an order")
+
+    def test_submit_rejects_invalid_orders(self):
+        with quiet():
+            result = self.manager.submit_orders(self.game_id, "test_game-GERMANY", ["a mun-bur", "A KIE - MOS"])
+        self.assertFalse(result["success"])
+        self.assertEqual([r["valid"] for r in result["results"]], [True, False])
+        self.assertEqual(self.manager.get_orders(self.game_id)["GERMANY"], [])
+
+    def test_submit_stores_normalized_orders(self):
+        with quiet():
+            result = self.manager.submit_orders(self.game_id, "test_game-GERMANY", ["a mun-bur", "f kie - hol"])
+        self.assertTrue(result["success"])
+        self.assertEqual(sorted(self.manager.get_orders(self.game_id)["GERMANY"]), ["A MUN - BUR", "F KIE - HOL"])
+
+    def test_builds(self):
+        game = self.manager._get_game_object(self.game_id)
+        with quiet():
+            game.set_current_phase("W1901A")
+            game.set_units("GERMANY", ["A HOL", "A DEN", "F SWE"], reset=True)
+            game.set_centers("GERMANY", ["BER", "KIE", "MUN", "SWE", "DEN", "HOL"], reset=True)
+        results = self._check("GERMANY", ["a kie b", "WAIVE", "WAIVE", "F MUN B"])
+        self.assertEqual([result["valid"] for result in results], [True, True, True, False])
+
+    def test_one_build_per_province(self):
+        game = self.manager._get_game_object(self.game_id)
+        with quiet():
+            game.set_current_phase("W1901A")
+            game.set_units("RUSSIA", ["A WAR"], reset=True)
+            game.set_centers("RUSSIA", ["MOS", "SEV", "STP", "WAR", "RUM"], reset=True)
+        results = self._check("RUSSIA", ["F STP/NC B", "A STP B", "F SEV B"])
+        self.assertEqual([result["valid"] for result in results], [True, False, True])
+        self.assertEqual(results[1]["reason"], "STP already has an order")
+
+        # a resubmission replaces the earlier builds, it doesn't add to them
+        with quiet():
+            self.manager.submit_orders(self.game_id, "test_game-RUSSIA", ["A STP B", "A SEV B"])
+            self.manager.submit_orders(self.game_id, "test_game-RUSSIA", ["F STP/SC B"])
+        self.assertEqual(self.manager.get_orders(self.game_id)["RUSSIA"], ["F STP/SC B"])
+
+    def test_adjustment_count(self):
+        game = self.manager._get_game_object(self.game_id)
+        with quiet():
+            game.set_current_phase("W1901A")
+            game.set_units("GERMANY", ["A HOL", "A DEN", "F SWE"], reset=True)
+            game.set_centers("GERMANY", ["BER", "KIE", "MUN", "SWE"], reset=True)
+            game.set_units("FRANCE", ["A PAR", "A MAR", "F BRE", "A BUR"], reset=True)
+            game.set_centers("FRANCE", ["PAR", "MAR"], reset=True)
+        # one build due, a WAIVE uses it up as well
+        results = self._check("GERMANY", ["A KIE B", "A BER B"])
+        self.assertEqual([result["valid"] for result in results], [True, False])
+        self.assertEqual(results[1]["reason"], "GERMANY can only build 1 unit(s) during W1901A")
+        self.assertFalse(self._check("GERMANY", ["WAIVE", "A MUN B"])[1]["valid"])
+        # two disbands due
+        results = self._check("FRANCE", ["A BUR D", "F BRE D", "A PAR D"])
+        self.assertEqual([result["valid"] for result in results], [True, True, False])
+        self.assertIn("can only disband 2", results[2]["reason"])
+
+        with quiet():
+            result = self.manager.submit_orders(self.game_id, "test_game-GERMANY", ["A KIE B", "A BER B"])
+        self.assertFalse(result["success"])
+        self.assertEqual(self.manager.get_orders(self.game_id)["GERMANY"], [])
+
+    def test_not_strict(self):
+        manager = GameManager(strict_orders=False)
+        new_game(manager, "loose")
+        with quiet():
+            result = manager.submit_orders("loose", "loose-GERMANY", ["A MUN - MOS"])
+        self.assertTrue(result["success"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+from diplomacy.engine.map import MAP_CACHE
+from app.game.warmup import Warmup
+from app.tests.helpers import import_app
+
+class TestWarmup(unittest.TestCase):
+    def test_loads_the_maps(self):
+        warmup = Warmup()
+        self.assertFalse(warmup.ready)
+        warmup.warm_up()
+        self.assertTrue(warmup.ready)
+        self.assertIn("standard", MAP_CACHE)
+        status = warmup.status()
+        self.assertIsNone(status["error"])
+        self.assertIn("map:standard", status["timings"])
+
+    def test_failure_still_gets_ready(self):
+        warmup = Warmup(maps=("no_such_map",))
+        warmup.warm_up()
+        self.assertTrue(warmup.ready)
+        self.assertIsNotNone(warmup.error)
+
+    def test_readiness_endpoint(self):
+        from fastapi.testclient import TestClient
+        main = import_app()
+        app, warmup = main.app, main.warmup
+        from app.routes import game
+        self.assertIsNone(game.store)  # nothing written to saves/
+        with TestClient(app) as client:
+            self.assertEqual(client.get("/ping").status_code, 200)
+            deadline = time.monotonic() + 10
+            while not warmup.ready and time.monotonic() < deadline:
+                time.sleep(0.01)
+            response = client.get("/ready")
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()["ready"])
+
+    def test_auth_is_imported_lazily(self):
+        code = "import sys, app.main; print('appwrite' in sys.modules, 'dotenv' in sys.modules)"
+        env = dict(os.environ, GAME_STORE_PATH="")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+        self.assertEqual(result.stdout.split(), ["False", "False"])
+
+if __name__ == "__main__":
+    unittest.main()